@@ -0,0 +1,132 @@
+"""
+command-line interface
+
+Reads a frequency table (file or standard input), calculates association
+measures chunk by chunk and writes them to a file (or standard output).
+NumPy, pandas and SciPy are only imported once arguments are parsed, so
+that `--help` and argument errors return immediately.
+
+"""
+
+import argparse
+import os
+import sys
+
+from .version import __version__
+
+
+def _none(value):
+    """argument type for optional strings ("none" for None)"""
+
+    return None if value.lower() == 'none' else value
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments.
+
+    :param list argv: arguments (default: sys.argv[1:])
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='association-measures',
+        description="Calculate association measures on a frequency table. Columns must follow one of the notations "
+        "O11, O12, O21, O22 (contingency table), f, f1, f2, N (frequency signature) or f1, N1, f2, N2 "
+        "(corpus frequencies); constant f1 and N (or N1 and N2) can be passed as options instead."
+    )
+    parser.add_argument('input', nargs='?', default='-',
+                        help='frequency table (.csv, .tsv, .parquet, .feather, .arrow; default: standard input)')
+    parser.add_argument('output', nargs='?', default='-',
+                        help='output file (.csv, .tsv, .parquet, .feather, .arrow; default: standard output)')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+
+    io = parser.add_argument_group('input and output')
+    io.add_argument('--index', help='column of input to use as index (e.g. item)')
+    io.add_argument('--input-format', choices=['csv', 'tsv', 'parquet', 'feather'],
+                    help='format of input (default: according to extension, csv for standard input)')
+    io.add_argument('--output-format', choices=['csv', 'tsv', 'parquet', 'feather'],
+                    help='format of output (default: according to extension, csv for standard output)')
+    io.add_argument('--chunksize', type=int, default=10**6, help='number of rows per chunk (default: %(default)s)')
+    io.add_argument('--jobs', type=int, default=None,
+                    help='number of processes (threads with --engine cython) per chunk; negative: number of CPUs + 1 + jobs')
+    io.add_argument('--engine', choices=['numpy', 'cython'], default='numpy', help='default: %(default)s')
+    io.add_argument('--no-freq', dest='freq', action='store_false', help='do not output observed and expected frequencies')
+    io.add_argument('--instances', dest='per_million', action='store_false',
+                    help='output instances instead of instances per million')
+    io.add_argument('--digits', type=int, default=6, help='round scores (default: %(default)s)')
+    io.add_argument('--wide', dest='dtype', action='store_const', const=None, default='compact',
+                    help='output int64 / float64 instead of compact types (Parquet and Feather; text output is never compact)')
+
+    notation = parser.add_argument_group('notation (constant marginals)')
+    notation.add_argument('--f1', type=int, help='frequency signature: marginal frequency of node')
+    notation.add_argument('--N', type=int, help='frequency signature: sample size')
+    notation.add_argument('--N1', type=int, help='corpus frequencies: size of corpus 1')
+    notation.add_argument('--N2', type=int, help='corpus frequencies: size of corpus 2')
+
+    measures = parser.add_argument_group('measures and their parameters')
+    measures.add_argument('-m', '--measures', nargs='+', metavar='MEASURE', help='measures (default: all but fisher_exact)')
+    measures.add_argument('--disc', type=float, default=.001,
+                          help='discounting (or smoothing) parameter for O11 == 0 (default: %(default)s)')
+    measures.add_argument('--discounting', choices=['Walter1975', 'Hardie2014'], default='Walter1975',
+                          help='log-ratio: discounting strategy (default: %(default)s)')
+    measures.add_argument('--unsigned', dest='signed', action='store_false',
+                          help='do not enforce negative values for rows with O11 < E11')
+    measures.add_argument('--alpha', type=float, default=.001,
+                          help='conservative log-ratio: significance level (default: %(default)s)')
+    measures.add_argument('--correct', type=_none, choices=['Bonferroni', 'Sidak', None], default='Bonferroni',
+                          help='conservative log-ratio: correction for repeated tests (Bonferroni, Sidak, none; default: %(default)s)')
+    measures.add_argument('--boundary', choices=['poisson', 'normal'], default='poisson',
+                          help='conservative log-ratio: confidence interval boundary (default: %(default)s)')
+    measures.add_argument('--vocab', type=int,
+                          help='conservative log-ratio: size of vocabulary (default: number of rows; required for standard input)')
+    measures.add_argument('--one-sided', action='store_true',
+                          help='conservative log-ratio / Fisher: one-sided confidence interval (p-value)')
+    measures.add_argument('--log', action='store_true',
+                          help='likelihoods: natural logarithm; Fisher: -log10 of p-value')
+
+    args = parser.parse_args(argv)
+    args.parser = parser
+
+    return args
+
+
+def main(argv=None):
+    """Entry point of `association-measures`.
+
+    :param list argv: arguments (default: sys.argv[1:])
+    :return: exit status
+    :rtype: int
+    """
+
+    args = parse_args(argv)
+
+    # heavy imports only after parsing
+    from .files import score_file
+    from .measures import list_measures
+
+    if args.measures is not None:
+        unknown = [m for m in args.measures if m not in list_measures(optional=True)]
+        if unknown:
+            args.parser.error(f'unknown measures: {", ".join(unknown)} (available: {", ".join(list_measures(optional=True))})')
+
+    try:
+        score_file(
+            args.input, args.output, measures=args.measures, f1=args.f1, N=args.N, N1=args.N1, N2=args.N2,
+            index=args.index, chunksize=args.chunksize, vocab=args.vocab, correct=args.correct, dtype=args.dtype,
+            input_format=args.input_format, output_format=args.output_format,
+            freq=args.freq, per_million=args.per_million, digits=args.digits, disc=args.disc,
+            discounting=args.discounting, signed=args.signed, alpha=args.alpha, boundary=args.boundary,
+            one_sided=args.one_sided, log=args.log, n_jobs=args.jobs, engine=args.engine
+        )
+    except BrokenPipeError:
+        # output closed early (e.g. piped into head): silence flushing at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, ImportError, OSError) as error:
+        args.parser.exit(1, f'{args.parser.prog}: error: {error}\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,241 @@
 """
 comparison of ranked lists
 
+Rankings are given as sequences of items in order of rank (e.g. the
+index of a DataFrame sorted by a measure, see `rankings()`). Each
+candidate ranking is converted to an array of positions of its items in
+the reference ranking, on which all metrics are calculated without
+looping over items. Several candidate rankings (a list or a dict of
+rankings) can be compared to one reference ranking in one call.
+
 """
 
+import numpy as np
+from pandas import DataFrame, Index, Series
+
+
+def rankings(df, columns=None, ascending=False):
+    """Rankings of the rows of df according to its columns (e.g. scores
+    of association measures), highest scores first (NaN last, ties in
+    order of rows).
+
+    :param DataFrame df: scores
+    :param list columns: columns (default: all)
+    :param bool ascending: lowest scores first?
+    :return: rankings (column: index of df in order of rank)
+    :rtype: dict
+    """
+
+    columns = df.columns if columns is None else columns
+    ranked = dict()
+    for column in columns:
+        values = df[column].to_numpy(dtype='float64')
+        key = values if ascending else -values
+        ranked[column] = df.index[np.argsort(np.where(np.isnan(key), np.inf, key), kind='stable')]
+
+    return ranked
+
+
+def _items(ranking):
+    """Items of a ranking (Index, DataFrame or Series: its index, or
+    sequence of items) as unique Index.
+
+    """
+
+    if isinstance(ranking, (DataFrame, Series)):
+        ranking = ranking.index
+    items = Index(ranking)
+    if not items.is_unique:
+        raise ValueError('rankings must not contain items more than once')
+
+    return items
+
+
+def _candidates(candidates):
+    """Candidate rankings as dict (name: ranking) and whether a single
+    ranking was given.
+
+    """
+
+    if isinstance(candidates, dict):
+        return candidates, False
+    if isinstance(candidates, (list, tuple)) and len(candidates) > 0 and \
+       isinstance(candidates[0], (Index, DataFrame, Series, np.ndarray, list, tuple)):
+        return dict(enumerate(candidates)), False
+
+    return {None: candidates}, True
+
+
+def _positions(reference, candidates):
+    """Positions of the items of candidate rankings in the reference
+    ranking (-1: not in reference).
+
+    :return: length of reference, candidate positions (name: array), single candidate given?
+    :rtype: tuple
+    """
+
+    reference = _items(reference)
+    candidates, single = _candidates(candidates)
+    positions = {name: reference.get_indexer(_items(ranking)) for name, ranking in candidates.items()}
+
+    return len(reference), positions, single
+
+
+def _overlap(n, positions, depth):
+    """Overlap X_d of the top d items of both rankings for d = 1..depth.
+
+    An item at rank t of the candidate and rank r of the reference is in
+    both top d lists from depth max(t, r) on.
+
+    :param int n: length of reference
+    :param array positions: positions of candidate items in reference (-1: not in reference)
+    :param int depth: maximum depth
+    :rtype: array
+    """
+
+    positions = positions[:depth]
+    ranks = np.maximum(np.arange(1, len(positions) + 1), positions + 1)
+    ranks = ranks[(positions >= 0) & (positions < min(n, depth))]
+
+    return np.cumsum(np.bincount(ranks, minlength=depth + 1)[1:depth + 1])
+
+
+def _output(values, single, index=None):
+    """Result of a single candidate (as is), or of several candidates
+    (Series or DataFrame with one column per candidate).
+
+    """
+
+    if single:
+        values = values[None]
+        return values if index is None else Series(values, index=index)
+    if index is None:
+        return Series(values)
+
+    return DataFrame(values, index=index)
+
+
+def topk_overlap(reference, candidates, depth=None, relative=False):
+    """Overlap of the top k items of the reference and candidate rankings
+    for k = 1..depth.
+
+    :param reference: ranking (Index, DataFrame, Series or sequence of items)
+    :param candidates: ranking, or list or dict of rankings
+    :param int depth: maximum k (default: length of longest ranking)
+    :param bool relative: return proportion of overlap (agreement X_k / k)?
+    :return: overlap (index: k; one column per candidate)
+    :rtype: Series or DataFrame
+    """
+
+    n, positions, single = _positions(reference, candidates)
+    depth = max([n] + [len(p) for p in positions.values()]) if depth is None else depth
+    k = np.arange(1, depth + 1)
+
+    overlap = {name: _overlap(n, p, depth) for name, p in positions.items()}
+    if relative:
+        overlap = {name: X / k for name, X in overlap.items()}
+
+    return _output(overlap, single, index=Index(k, name='k'))
+
+
+def topk_jaccard(reference, candidates, depth=None):
+    """Jaccard similarity of the sets of top k items of the reference and
+    candidate rankings for k = 1..depth.
+
+    :param reference: ranking (Index, DataFrame, Series or sequence of items)
+    :param candidates: ranking, or list or dict of rankings
+    :param int depth: maximum k (default: length of longest ranking)
+    :return: Jaccard similarity (index: k; one column per candidate)
+    :rtype: Series or DataFrame
+    """
+
+    n, positions, single = _positions(reference, candidates)
+    depth = max([n] + [len(p) for p in positions.values()]) if depth is None else depth
+    k = np.arange(1, depth + 1)
+
+    jaccard = dict()
+    for name, p in positions.items():
+        X = _overlap(n, p, depth)
+        with np.errstate(invalid='ignore'):
+            jaccard[name] = X / (np.minimum(k, n) + np.minimum(k, len(p)) - X)
+
+    return _output(jaccard, single, index=Index(k, name='k'))
+
+
+def rbo(reference, candidates, p=.9, depth=None, extrapolate=True):
+    """Rank-biased overlap (Webber, Moffat & Zobel 2010) of the reference
+    and candidate rankings (evaluated up to depth).
+
+    Without extrapolation, the (lower bound) sum of agreements up to the
+    evaluated depth is returned. With extrapolation, the agreement at the
+    evaluated depth is assumed to continue (RBO_ext, see equation 32 of
+    Webber et al. for rankings of different lengths).
+
+    :param reference: ranking (Index, DataFrame, Series or sequence of items)
+    :param candidates: ranking, or list or dict of rankings
+    :param float p: persistence (weight of depth d: p ** (d - 1))
+    :param int depth: only evaluate top depth items of both rankings
+    :param bool extrapolate: extrapolate agreement beyond the evaluated depth?
+    :return: rank-biased overlap (one value per candidate)
+    :rtype: float or Series
+    """
+
+    if not 0 < p < 1:
+        raise ValueError('parameter "p" should be in (0, 1).')
+
+    n, positions, single = _positions(reference, candidates)
+
+    values = dict()
+    for name, positions_ in positions.items():
+        lengths = [n, len(positions_)] if depth is None else [min(n, depth), min(len(positions_), depth)]
+        s, L = min(lengths), max(lengths)
+        if s == 0:
+            values[name] = 0.
+            continue
+        d = np.arange(1, L + 1)
+        weights = p ** d
+        X = _overlap(lengths[0], positions_[:lengths[1]], L)
+        if not extrapolate:
+            values[name] = (1 - p) / p * np.sum(X / d * weights)
+            continue
+        # items of the shorter ranking beyond its length are assumed to agree as much as the ones seen
+        seen = X[s - 1]
+        beyond = np.sum((seen * (d[s:] - s) / (s * d[s:])) * weights[s:])
+        values[name] = (1 - p) / p * (np.sum(X / d * weights) + beyond) + ((X[-1] - seen) / L + seen / s) * p ** L
+
+    return values[None] if single else Series(values)
 
-# from rbo import RankingSimilarity
 
+def gwets_ac1(reference, candidates, k=100, n=None):
+    """Gwet's AC1 of the top k items: agreement of the reference and
+    candidate rankings on which items of the vocabulary are among the top
+    k, corrected for chance agreement (Gwet 2008).
 
-# def compare_rbo(df1, df2, p):
+    :param reference: ranking (Index, DataFrame, Series or sequence of items)
+    :param candidates: ranking, or list or dict of rankings
+    :param int k: number of top items (or list of numbers)
+    :param int n: size of vocabulary (default: number of items in reference or candidate)
+    :return: AC1 (one value per candidate; index: k if several are given)
+    :rtype: float, Series or DataFrame
+    """
 
-#     return RankingSimilarity(df1.index, df2.index).rbo(p=p)
+    n_reference, positions, single = _positions(reference, candidates)
+    ks = np.atleast_1d(k)
 
+    values = dict()
+    for name, p in positions.items():
+        X = _overlap(n_reference, p, int(ks.max()))[ks - 1]
+        size = n_reference + np.sum(p < 0) if n is None else n
+        k_reference, k_candidate = np.minimum(ks, n_reference), np.minimum(ks, len(p))
+        # observed agreement: items in both or in neither top k
+        agreement = (size - (k_reference - X) - (k_candidate - X)) / size
+        # chance agreement (two categories)
+        pi = (k_reference + k_candidate) / (2 * size)
+        chance = 2 * pi * (1 - pi)
+        values[name] = (agreement - chance) / (1 - chance)
 
-# def compare_gwets_ac1(df1, df2):
+    if np.ndim(k) == 0:
+        values = {name: value[0] for name, value in values.items()}
+        return values[None] if single else Series(values)
 
-#     pass
+    return _output(values, single, index=Index(ks, name='k'))
@@ -0,0 +1,79 @@
+"""
+distributed scoring of Dask DataFrames
+
+Partitions are scored with `map_partitions`, but with the semantics of
+scoring the whole table at once: the size of the vocabulary (for
+correcting the significance level of the conservative log-ratio) is
+the number of rows of the whole table, and each unique frequency
+signature is scored only once across all partitions.
+
+Dask itself is only needed for passing a Dask DataFrame.
+
+"""
+
+from pandas import MultiIndex
+
+from .files import FREQUENCY_COLUMNS
+from .measures import _select_measures
+from .measures import score as _score
+
+
+def _lookup(partition, keys, scores, columns):
+    """Scores of rows of a partition according to their frequency
+    signature (keys: unique signatures, scores: their scores).
+
+    """
+
+    positions = keys.get_indexer(MultiIndex.from_frame(partition[columns]))
+    if (positions < 0).any():
+        raise ValueError('partition contains frequency signatures that are not in the table (non-deterministic input?)')
+
+    return scores.iloc[positions].set_axis(partition.index)
+
+
+def score(ddf, measures=None, f1=None, N=None, N1=None, N2=None,
+          vocab=None, correct='Bonferroni', dedup=True, **kwargs):
+    """Calculate association measures on a Dask DataFrame, partition by
+    partition.
+
+    With `dedup=True`, unique frequency signatures are determined across
+    all partitions first, scored once (on the client, e.g. with `n_jobs`)
+    and looked up in each partition; they thus have to fit into memory
+    (unlike the table itself). With `dedup=False`, each partition is
+    scored on its own.
+
+    :param dask.dataframe.DataFrame ddf: Dask DataFrame with reasonably-named frequency columns
+    :param list measures: names of measures (or measures)
+    :param int vocab: CLR: size of vocabulary (default: number of rows of the whole table)
+    :param str correct: CLR: correction type repeated tests (None|"Bonferroni"|"Sidak")
+    :param bool dedup: score each unique frequency signature only once?
+
+    Integers f1, N, N1, N2 and further keyword arguments will be passed
+    to `score()`.
+
+    :return: association measures (partitioned like ddf)
+    :rtype: dask.dataframe.DataFrame
+    """
+
+    import dask
+
+    kwargs = dict(kwargs, measures=measures, f1=f1, N=N, N1=N1, N2=N2, correct=correct)
+    needs_vocab = vocab is None and correct is not None and any(
+        measure.__name__ == 'conservative_log_ratio' for measure in _select_measures(measures)
+    )
+
+    if not dedup:
+        if needs_vocab:
+            vocab = len(ddf)
+        return ddf.map_partitions(_score, vocab=vocab, **kwargs)
+
+    # global vocabulary and unique frequency signatures in one pass
+    columns = [c for c in ddf.columns if c in FREQUENCY_COLUMNS]
+    rows, uniques = dask.compute(ddf.shape[0], ddf[columns].drop_duplicates())
+    vocab = rows if vocab is None else vocab
+    uniques = uniques.reset_index(drop=True)
+
+    scores = _score(uniques, vocab=vocab, **kwargs)
+    keys = MultiIndex.from_frame(uniques)
+
+    return ddf.map_partitions(_lookup, keys, scores, columns, meta=scores.iloc[:0])
@@ -0,0 +1,271 @@
+"""
+out-of-core scoring of frequency tables stored in files
+
+Frequency tables are read in chunks (CSV via pandas, Parquet and
+Feather via pyarrow), scored chunk by chunk, and each scored chunk is
+appended to the output file right away, so that neither the input nor
+the output table ever has to fit into memory as a whole.
+
+"""
+
+import os
+import sys
+from inspect import signature
+
+from pandas import read_csv
+
+from .frequencies import compact_bound, integer_dtype, observed_arrays
+from .measures import FLOAT32, OBSERVED, _select_measures, score, score_iter
+
+# frequency columns of all notations (see frequencies.observed_frequencies)
+FREQUENCY_COLUMNS = ['O11', 'O12', 'O21', 'O22', 'f', 'f1', 'f2', 'N', 'N1', 'N2']
+
+# file formats (by extension, compression suffixes are ignored)
+FORMATS = {
+    '.csv': 'csv', '.tsv': 'tsv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.feather': 'feather', '.arrow': 'feather'
+}
+COMPRESSIONS = ['.gz', '.bz2', '.xz', '.zst', '.zip']
+
+
+def _pyarrow():
+    """Import pyarrow (optional dependency for Parquet and Feather files)."""
+
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            'Parquet and Feather files require pyarrow: pip install "association-measures[arrow]"'
+        )
+
+    return pyarrow
+
+
+def _format(path, fmt=None):
+    """Return format of file according to its extension (unless given;
+    standard input and output ("-") default to CSV)."""
+
+    if fmt is not None:
+        if fmt not in FORMATS.values():
+            raise ValueError(f'unknown file format: {fmt} (expected one of {", ".join(sorted(set(FORMATS.values())))})')
+        return fmt
+    if str(path) == '-':
+        return 'csv'
+
+    root, ext = os.path.splitext(str(path))
+    if ext in COMPRESSIONS:
+        root, ext = os.path.splitext(root)
+    try:
+        return FORMATS[ext.lower()]
+    except KeyError:
+        raise ValueError(f'unknown file format: {path} (expected one of {", ".join(FORMATS)})')
+
+
+def _columns(path, fmt=None):
+    """Return names of columns of a file."""
+
+    fmt = _format(path, fmt)
+    if fmt in ['csv', 'tsv']:
+        return list(read_csv(path, sep='\t' if fmt == 'tsv' else ',', nrows=0).columns)
+
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        return pa.parquet.ParquetFile(str(path)).schema_arrow.names
+
+    return pa.ipc.open_file(pa.memory_map(str(path))).schema.names
+
+
+def read_chunks(path, chunksize=10**6, index=None, columns=None, fmt=None):
+    """Read a table from a CSV, Parquet or Feather file (or from standard
+    input) in chunks.
+
+    :param str path: path to file (.csv, .tsv, .parquet, .feather, .arrow; CSV may be compressed) or "-"
+    :param int chunksize: number of rows per chunk
+    :param str index: column to use as index
+    :param list columns: only read these columns (and the index)
+    :param str fmt: format of file (default: according to extension)
+    :return: chunks of the table
+    :rtype: generator
+    """
+
+    fmt = _format(path, fmt)
+    stdin = str(path) == '-'
+    if columns is not None and index is not None:
+        columns = [index] + [c for c in columns if c != index]
+
+    if fmt in ['csv', 'tsv']:
+        yield from read_csv(sys.stdin if stdin else path, sep='\t' if fmt == 'tsv' else ',',
+                            chunksize=chunksize, index_col=index, usecols=columns)
+        return
+
+    # NB: Parquet and Feather files are read from their footer, i.e.
+    # standard input has to be buffered
+    pa = _pyarrow()
+    source = pa.BufferReader(sys.stdin.buffer.read()) if stdin else None
+    if fmt == 'parquet':
+        batches = pa.parquet.ParquetFile(source if stdin else str(path)).iter_batches(
+            batch_size=chunksize, columns=columns, use_pandas_metadata=True
+        )
+    else:
+        # memory-mapped, i.e. only the batches converted to pandas are read
+        table = pa.ipc.open_file(source if stdin else pa.memory_map(str(path))).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        batches = table.to_batches(max_chunksize=chunksize)
+
+    for batch in batches:
+        df = batch.to_pandas()
+        if index is not None and index in df.columns:
+            df = df.set_index(index)
+        yield df
+
+
+def _scan(path, chunksize, f1=None, N=None, N1=None, N2=None, fmt=None):
+    """Count rows and determine the bound of compact integer frequencies
+    (see frequencies.compact_bound) in one pass over the frequency
+    columns of a file.
+
+    """
+
+    columns = [c for c in _columns(path, fmt) if c in FREQUENCY_COLUMNS]
+    rows, bound = 0, 0
+    for chunk in read_chunks(path, chunksize, columns=columns, fmt=fmt):
+        rows += len(chunk)
+        if bound is not None:
+            b = compact_bound(observed_arrays(chunk, f1=f1, N=N, N1=N1, N2=N2))
+            bound = None if b is None else max(bound, b)
+
+    return rows, bound
+
+
+def _conform(df, integer, digits):
+    """Convert a scored chunk to the types of the output file: observed
+    frequencies and marginals to the integer type of the whole file,
+    all other float columns to float32 if rounding keeps them within its
+    range (float64 otherwise).
+
+    """
+
+    floats = 'float32' if digits is not None and 10.0 ** -digits >= FLOAT32.tiny else 'float64'
+    dtypes = dict()
+    for column, dtype in df.dtypes.items():
+        if column in OBSERVED:
+            if integer is not None:
+                dtypes[column] = integer
+        elif dtype.kind == 'f':
+            dtypes[column] = floats
+
+    return df.astype(dtypes, copy=False)
+
+
+def write_chunks(chunks, path, fmt=None):
+    """Write chunks of a table to a CSV, Parquet or Feather file (or to
+    standard output), one after the other. All chunks must have the same
+    columns and types.
+
+    :param iterable chunks: DataFrames
+    :param str path: path to file (.csv, .tsv, .parquet, .feather, .arrow; CSV may be compressed) or "-"
+    :param str fmt: format of file (default: according to extension)
+    :return: number of rows written
+    :rtype: int
+    """
+
+    fmt = _format(path, fmt)
+    stdout = str(path) == '-'
+    rows = 0
+
+    if fmt in ['csv', 'tsv']:
+        for df in chunks:
+            df.to_csv(sys.stdout if stdout else path, sep='\t' if fmt == 'tsv' else ',',
+                      mode='a' if rows else 'w', header=not rows)
+            rows += len(df)
+        return rows
+
+    pa = _pyarrow()
+    writer = None
+    try:
+        for df in chunks:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            if writer is None:
+                schema = table.schema
+                sink = sys.stdout.buffer if stdout else str(path)
+                if fmt == 'parquet':
+                    writer = pa.parquet.ParquetWriter(sink, schema)
+                else:
+                    writer = pa.ipc.new_file(sink, schema)
+            else:
+                # pandas metadata (e.g. of a range index) differs between chunks
+                table = table.cast(schema)
+            writer.write_table(table)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows
+
+
+def score_file(input_path, output_path, measures=None, f1=None, N=None, N1=None, N2=None,
+               index=None, chunksize=10**6, vocab=None, correct='Bonferroni', dtype='compact',
+               input_format=None, output_format=None, **kwargs):
+    """Calculate association measures on a frequency table stored in a
+    file without loading it into memory: the table is read, scored and
+    written in chunks. Columns must follow one of the notations
+    accepted by `score()`. Use "-" for standard input or output.
+
+    If the conservative log-ratio is corrected for repeated tests and
+    `vocab` is not given, or if compact types are written to Parquet or
+    Feather, a first pass over the frequency columns counts the rows and
+    determines one integer type for all chunks (standard input can only
+    be read once: pass `vocab`; integers are then written as int64).
+    Other floats are written to Parquet and Feather as float32 (with
+    `dtype="compact"` and rounded scores). Text output (CSV, TSV) is
+    always written from the types of `score()`, i.e. without loss.
+
+    :param str input_path: path to frequency table (.csv, .tsv, .parquet, .feather, .arrow) or "-"
+    :param str output_path: path to output file (.csv, .tsv, .parquet, .feather, .arrow) or "-"
+    :param list measures: names of measures (or measures)
+    :param str index: column of input to use as index
+    :param int chunksize: number of rows per chunk
+    :param int vocab: CLR: size of vocabulary (number of comparisons for correcting alpha)
+    :param str correct: CLR: correction type repeated tests (None|"Bonferroni"|"Sidak")
+    :param str dtype: write compact types to Parquet and Feather ("compact") or the types of `score()` (None)
+    :param str input_format: format of input (default: according to extension, CSV for "-")
+    :param str output_format: format of output (default: according to extension, CSV for "-")
+
+    Integers f1, N, N1, N2 and further keyword arguments will be passed
+    to `score()`.
+
+    :return: number of rows written
+    :rtype: int
+    """
+
+    needs_vocab = vocab is None and correct is not None and any(
+        measure.__name__ == 'conservative_log_ratio' for measure in _select_measures(measures)
+    )
+    if dtype == 'compact' and _format(output_path, output_format) not in ['parquet', 'feather']:
+        # text output does not get smaller, float32 would only print wrong digits
+        dtype = None
+    # one integer type for all chunks (only relevant for typed output)
+    typed = dtype == 'compact'
+    stdin = str(input_path) == '-'
+    if needs_vocab and stdin:
+        raise ValueError('standard input can only be read once: pass vocab')
+    integer = 'int64' if typed and stdin else None
+    if needs_vocab or (typed and not stdin):
+        rows, bound = _scan(input_path, chunksize, f1=f1, N=N, N1=N1, N2=N2, fmt=input_format)
+        vocab = rows if needs_vocab else vocab
+        integer = None if bound is None else integer_dtype(bound)
+
+    chunks = score_iter(
+        read_chunks(input_path, chunksize, index=index, fmt=input_format), measures=measures,
+        vocab=vocab, correct=correct, f1=f1, N=N, N1=N1, N2=N2, dtype=dtype, **kwargs
+    )
+    if dtype == 'compact':
+        digits = kwargs.get('digits', signature(score).parameters['digits'].default)
+        chunks = (_conform(df, integer, digits) for df in chunks)
+
+    return write_chunks(chunks, output_path, output_format)
@@ -3,63 +3,236 @@ observed (O11, O12, O21, O22) and expected (E11, E12, E21, E22) frequencies
 
 """
 
-from pandas import DataFrame
+import numpy as np
+from pandas import DataFrame, factorize
 
 
-def observed_frequencies(df, f1=None, N=None, N1=None, N2=None, marginals=False):
-    """Return observed frequencies in contingency table notation
-    (O11..O22). Raises a Value Error if columns are not reasonably
-    named.
+def _add(a, b):
+    return a + b
 
-    Notation for marginals (Evert 2008):
-    - rows: R1 = O11 + O12, R2 = O21 + O22
-    - columns: C1 = O11 + O21, C2 = O12 + O22
-    - size: N = O11 + O12 + O21 + O22 = R1 + R2 = C1 + C2
 
-    Possible input formats:
-    - frequency signature (cf. Evert 2008: Figure 8):
-      f  = O11                    # co-occurrence freq. of token and node / freq. in corpus 1
-      f1 =  R1 <int>              # number of tokens in W(node) / size of corpus 1
-      f2 =  C1                    # marginal freq. of token / freq. in corpus 1 + 2
-      N  =   N <int>              # size of corpus without nodes / size of corpus 1 + 2
-    - corpus frequencies ("keyword friendly"):
-      f1 = O11                    # number of occurrences in corpus 1
-      f2 = O21                    # number of occurrences in corpus 2
-      N1 =  R1 <int>              # size of corpus 1
-      N2 =  R2 <int>              # size of corpus 2
+def _subtract(a, b):
+    return a - b
 
-    Integers can also be passed as scalar arguments.
 
-    :param DataFrame df: DataFrame with reasonably-named frequency columns
-    :param bool marginals: add marginals? (R1, R2, C1, C2, N)
-    :return: df with same index and columns O11, O12, O21, O22
-    :rtype: DataFrame
+def _max_abs(a):
+    return max(-int(a.min()), int(a.max())) if a.size else 0
+
+
+def _multiply(a, b):
+    """a * b; integer products that might overflow the common integer
+    type of a and b are calculated in a wider type (int64, or float64
+    beyond).
 
     """
 
+    a, b = np.asarray(a), np.asarray(b)
+    dtype = np.result_type(a, b)
+    if dtype.kind in 'iu':
+        bound = _max_abs(a) * _max_abs(b)
+        if bound > np.iinfo(dtype).max:
+            wider = 'int64' if bound <= np.iinfo('int64').max else 'float64'
+            # convert the smaller operand (e.g. a scalar marginal)
+            if a.size <= b.size:
+                a = a.astype(wider)
+            else:
+                b = b.astype(wider)
+
+    return a * b
+
+
+def _expected(R, C, N):
+    return _multiply(R, C) / N
+
+
+# derived frequencies (name: (dependencies, formula)); marginals may be
+# scalars (e.g. constant corpus sizes), which are broadcast
+FORMULAS = {
+    # observed frequencies (if marginals R1 and R2 are given instead)
+    'O12': (('R1', 'O11'), _subtract),
+    'O22': (('R2', 'O21'), _subtract),
+    # marginals
+    'R1': (('O11', 'O12'), _add),
+    'R2': (('O21', 'O22'), _add),
+    'C1': (('O11', 'O21'), _add),
+    'C2': (('O12', 'O22'), _add),
+    'N': (('R1', 'R2'), _add),
+    # expected frequencies
+    'E11': (('R1', 'C1', 'N'), _expected),
+    'E12': (('R1', 'C2', 'N'), _expected),
+    'E21': (('R2', 'C1', 'N'), _expected),
+    'E22': (('R2', 'C2', 'N'), _expected),
+}
+
+
+class Frequencies:
+    """Lazily evaluated frequencies on plain NumPy arrays.
+
+    Starting from the given columns (usually observed frequencies
+    O11..O22), all further columns (marginals, expected frequencies,
+    intermediate terms of association measures) are calculated on
+    first access according to their formula and cached, so that only
+    what is actually needed is calculated, and each column at most
+    once.
+
+    Row marginals R1 and R2 can be given as scalars instead of O12 and
+    O22 (e.g. for constant corpus sizes); they are then broadcast
+    instead of being materialised as constant columns.
+
+    :param dict data: given columns (name: array)
+    :param dict formulas: derived columns (name: (dependencies, formula))
+    :param Profile profile: record calculation of derived columns (see profiling.Profile)
+    """
+
+    def __init__(self, data, formulas=None, profile=None):
+        self.given = dict(data)
+        self.cache = dict()
+        self.formulas = FORMULAS if formulas is None else formulas
+        self.profile = profile
+
+    def __getitem__(self, name):
+        if name in self.given:
+            return self.given[name]
+        if name not in self.cache:
+            try:
+                dependencies, formula = self.formulas[name]
+            except KeyError:
+                raise KeyError(name)
+            if self.profile is None:
+                self.cache[name] = formula(*(self[d] for d in dependencies))
+            else:
+                # dependencies are recorded on their own
+                values = [self[d] for d in dependencies]
+                with self.profile.stage('frequency', name, len(self)):
+                    self.cache[name] = formula(*values)
+        return self.cache[name]
+
+    def __contains__(self, name):
+        return name in self.given or name in self.formulas
+
+    def __len__(self):
+        return len(next(v for v in self.given.values() if np.ndim(v) > 0))
+
+    def closure(self, name):
+        """Return all columns required for calculating a column (including
+        the column itself).
+
+        :param str name: column
+        :rtype: set
+        """
+
+        required = {name}
+        if name not in self.given and name in self.formulas:
+            for dependency in self.formulas[name][0]:
+                required |= self.closure(dependency)
+
+        return required
+
+    def release(self, names):
+        """Release cached columns (given columns are kept).
+
+        :param iterable names: columns
+        """
+
+        for name in names:
+            self.cache.pop(name, None)
+
+
+def _container(df):
+    """Type of table: "pandas", "arrow" (pyarrow Table or RecordBatch) or
+    "polars" (DataFrame). Detected by module, i.e. without importing the
+    optional libraries.
+
+    """
+
+    module = type(df).__module__.split('.')[0]
+    if module == 'pyarrow':
+        return 'arrow'
+    if module == 'polars':
+        return 'polars'
+
+    return 'pandas'
+
+
+def _column_names(df):
+    """Names of columns of a pandas, Arrow or Polars table."""
+
+    if _container(df) == 'arrow':
+        return list(df.schema.names)
+
+    return list(df.columns)
+
+
+def _column(df, name):
+    """Column of a pandas, Arrow or Polars table as NumPy array (without
+    copying numeric columns without missing values stored in one chunk).
+
+    """
+
+    container = _container(df)
+    if container == 'arrow':
+        column = df.column(name)
+        if hasattr(column, 'chunks'):
+            if column.num_chunks != 1:
+                return column.to_numpy()
+            column = column.chunk(0)
+        return column.to_numpy(zero_copy_only=False)
+    if container == 'polars':
+        return df.get_column(name).to_numpy()
+
+    return df[name].to_numpy()
+
+
+def _table(data, like, copy=True):
+    """Table of the same type as `like` (with the same index for pandas)
+    from columns (name: array). With copy=False, pandas DataFrames hold
+    the arrays themselves (instead of a consolidated copy).
+
+    """
+
+    container = _container(like)
+    if container == 'arrow':
+        import pyarrow as pa
+        return pa.record_batch(data) if type(like).__name__ == 'RecordBatch' else pa.table(data)
+    if container == 'polars':
+        import polars as pl
+        return pl.DataFrame(data)
+
+    return DataFrame(index=like.index, data=data, copy=copy)
+
+
+def observed_arrays(df, f1=None, N=None, N1=None, N2=None):
+    """Return observed frequencies as NumPy arrays (see
+    `observed_frequencies()` for notations). If integers are passed as
+    scalar arguments, the (constant) row marginals R1 and R2 are
+    returned as scalars instead of O12 and O22.
+
+    :param DataFrame df: DataFrame (or pyarrow Table / Polars DataFrame) with reasonably-named frequency columns
+    :return: observed frequencies O11, O12, O21, O22 (or O11, O21, R1, R2)
+    :rtype: dict
+    """
+
+    columns = set(_column_names(df))
+
     # integer parameters instead of columns?
     if all(v is None for v in [f1, N1, N2, N]):
         pass
 
     elif f1 is not None and N is not None:
-        try:
-            df = df[['f', 'f2']].copy()
-            df['f1'] = f1
-            df['N'] = N
-        except KeyError:
+        if not {'f', 'f2'}.issubset(columns):
             raise ValueError(
                 'frequency signature notation: (f1, N) are given, but (f, f2) are not'
             )
+        O11 = _column(df, 'f')
+        O21 = _column(df, 'f2') - O11
+        return {'O11': O11, 'O21': O21, 'R1': np.asarray(f1), 'R2': np.asarray(N - f1)}
 
     elif N1 is not None and N2 is not None:
-        try:
-            df = df[['f1', 'f2']].copy()
-            df['N1'] = N1
-            df['N2'] = N2
-        except KeyError:
+        if not {'f1', 'f2'}.issubset(columns):
             raise ValueError(
                 'corpus frequency notation: (N1, N2) are given, but (f1, f2) are not'
             )
+        return {'O11': _column(df, 'f1'), 'O21': _column(df, 'f2'), 'R1': np.asarray(N1), 'R2': np.asarray(N2)}
 
     else:
         raise ValueError(
@@ -67,49 +240,145 @@ def observed_frequencies(df, f1=None, N=None, N1=None, N2=None, marginals=False)
         )
 
     # already in contingency notation?
-    if set(['O11', 'O12', 'O21', 'O22']).issubset(df.columns):
-        O11 = df['O11']
-        O12 = df['O12']
-        O21 = df['O21']
-        O22 = df['O22']
+    if {'O11', 'O12', 'O21', 'O22'}.issubset(columns):
+        O11 = _column(df, 'O11')
+        O12 = _column(df, 'O12')
+        O21 = _column(df, 'O21')
+        O22 = _column(df, 'O22')
 
     # frequency signature:
-    elif set(['f', 'f1', 'f2', 'N']).issubset(df.columns):
-        O11 = df['f']
-        O12 = df['f1'] - O11
-        O21 = df['f2'] - O11
-        O22 = df['N'] - O11 - O12 - O21
+    elif {'f', 'f1', 'f2', 'N'}.issubset(columns):
+        O11 = _column(df, 'f')
+        O12 = _column(df, 'f1') - O11
+        O21 = _column(df, 'f2') - O11
+        O22 = _column(df, 'N') - O11 - O12 - O21
 
     # corpus frequencies:
-    elif set(['f1', 'N1', 'f2', 'N2']).issubset(df.columns):
-        O11 = df['f1']
-        O12 = df['N1'] - O11
-        O21 = df['f2']
-        O22 = df['N2'] - O21
+    elif {'f1', 'N1', 'f2', 'N2'}.issubset(columns):
+        O11 = _column(df, 'f1')
+        O12 = _column(df, 'N1') - O11
+        O21 = _column(df, 'f2')
+        O22 = _column(df, 'N2') - O21
 
     else:
-        raise ValueError(f'columns are not reasonably named: {str(df.columns)}')
+        raise ValueError(f'columns are not reasonably named: {str(_column_names(df))}')
 
-    # construct dataframe
-    obs = DataFrame(
-        index=df.index,
-        data={
-            'O11': O11,
-            'O12': O12,
-            'O21': O21,
-            'O22': O22
+    return {'O11': O11, 'O12': O12, 'O21': O21, 'O22': O22}
+
+
+def integer_dtype(bound):
+    """Return the smallest signed integer type holding -bound..bound
+    (None if even int64 does not).
+
+    :param int bound: maximum absolute value
+    :rtype: str
+    """
+
+    for dtype in ['int8', 'int16', 'int32', 'int64']:
+        if bound <= np.iinfo(dtype).max:
+            return dtype
+
+    return None
+
+
+def compact_bound(observed):
+    """Return an upper bound of twice the sample size of integer (or
+    integral float) observed frequencies, i.e. of the values that have
+    to fit into a compact integer type (see `compact_observed()`).
+    Returns None if frequencies are not integral.
+
+    :param dict observed: observed frequencies (name: array or scalar)
+    :rtype: int
+    """
+
+    bound = 0
+    for array in observed.values():
+        array = np.asarray(array)
+        if array.dtype.kind == 'f':
+            with np.errstate(invalid='ignore'):
+                if not (array == np.floor(array)).all():
+                    return None
+        elif array.dtype.kind not in 'iu':
+            return None
+        bound += _max_abs(array)
+
+    return 2 * bound
+
+
+def compact_observed(observed):
+    """Convert integer (or integral float) observed frequencies (O11..O22,
+    or O11, O21 and scalar marginals R1, R2) to the smallest signed
+    integer type that holds twice the sample size, so that marginals
+    (and sums such as 2 * O11 + O12 + O21) cannot overflow. Products of
+    frequencies are widened where necessary (see `_multiply()`). Other
+    frequencies (e.g. weighted counts or NaN) are returned as is.
+
+    :param dict observed: observed frequencies (name: array or scalar)
+    :return: observed frequencies (name: array or scalar)
+    :rtype: dict
+    """
+
+    observed = {name: np.asarray(O) for name, O in observed.items()}
+    bound = compact_bound(observed)
+    dtype = None if bound is None else integer_dtype(bound)
+    if dtype is None:
+        return observed
+
+    return {name: O.astype(dtype, copy=False) for name, O in observed.items()}
+
+
+def observed_frequencies(df, f1=None, N=None, N1=None, N2=None, marginals=False):
+    """Return observed frequencies in contingency table notation
+    (O11..O22). Raises a Value Error if columns are not reasonably
+    named.
+
+    Notation for marginals (Evert 2008):
+    - rows: R1 = O11 + O12, R2 = O21 + O22
+    - columns: C1 = O11 + O21, C2 = O12 + O22
+    - size: N = O11 + O12 + O21 + O22 = R1 + R2 = C1 + C2
+
+    Possible input formats:
+    - frequency signature (cf. Evert 2008: Figure 8):
+      f  = O11                    # co-occurrence freq. of token and node / freq. in corpus 1
+      f1 =  R1 <int>              # number of tokens in W(node) / size of corpus 1
+      f2 =  C1                    # marginal freq. of token / freq. in corpus 1 + 2
+      N  =   N <int>              # size of corpus without nodes / size of corpus 1 + 2
+    - corpus frequencies ("keyword friendly"):
+      f1 = O11                    # number of occurrences in corpus 1
+      f2 = O21                    # number of occurrences in corpus 2
+      N1 =  R1 <int>              # size of corpus 1
+      N2 =  R2 <int>              # size of corpus 2
+
+    Integers can also be passed as scalar arguments.
+
+    Besides pandas DataFrames, pyarrow Tables (and RecordBatches) and
+    Polars DataFrames are accepted; numeric columns are then read
+    without copying, and a table of the same type is returned.
+
+    :param DataFrame df: DataFrame with reasonably-named frequency columns
+    :param bool marginals: add marginals? (R1, R2, C1, C2, N)
+    :return: df with same index and columns O11, O12, O21, O22
+    :rtype: DataFrame
+
+    """
+
+    observed = observed_arrays(df, f1=f1, N=N, N1=N1, N2=N2)
+    if 'R1' in observed:
+        R1, R2 = observed.pop('R1'), observed.pop('R2')
+        observed = {
+            'O11': observed['O11'], 'O12': R1 - observed['O11'],
+            'O21': observed['O21'], 'O22': R2 - observed['O21']
         }
-    )
 
     # add marginals
     if marginals:
-        obs['R1'] = obs['O11'] + obs['O12']
-        obs['R2'] = obs['O21'] + obs['O22']
-        obs['C1'] = obs['O11'] + obs['O21']
-        obs['C2'] = obs['O12'] + obs['O22']
-        obs['N'] = obs['R1'] + obs['R2']
+        observed['R1'] = observed['O11'] + observed['O12']
+        observed['R2'] = observed['O21'] + observed['O22']
+        observed['C1'] = observed['O11'] + observed['O21']
+        observed['C2'] = observed['O12'] + observed['O22']
+        observed['N'] = observed['R1'] + observed['R2']
 
-    return obs
+    return _table(observed, df)
 
 
 def expected_frequencies(df, observed=False):
@@ -147,3 +416,48 @@ def expected_frequencies(df, observed=False):
     df = obs.join(expected) if observed else expected
 
     return df
+
+
+def factorize_tables(*columns):
+    """Encode the rows of frequency columns (e.g. O11, O12, O21, O22) as
+    compact integer codes. Integer columns are combined arithmetically
+    into a single int64 key, other columns are factorized first; the
+    key is then hashed once.
+
+    :param array columns: frequency columns of equal length
+    :return: codes (index of unique row for each row), positions of first occurrences of unique rows
+    :rtype: tuple
+    """
+
+    key, size = None, 1
+    for column in columns:
+        column = np.asarray(column)
+        cardinality = None
+        if column.dtype.kind in 'iu' and len(column) > 0:
+            low = column.min()
+            cardinality = int(column.max()) - int(low) + 1
+        if cardinality is not None and cardinality < 2**31:
+            codes = (column - low).astype(np.int64)
+        else:
+            codes, uniques = factorize(column, use_na_sentinel=False)
+            cardinality = len(uniques)
+        if key is None:
+            key, size = codes, cardinality
+            continue
+        if size * cardinality >= 2**63:
+            # re-encode to stay within int64
+            key, uniques = factorize(key)
+            size = len(uniques)
+        key = key * cardinality + codes
+        size *= cardinality
+
+    codes, _ = factorize(key)
+    if len(codes) == 0:
+        return codes, np.arange(0)
+
+    # codes are assigned in order of appearance, i.e. first occurrences
+    # are exactly where the running maximum increases
+    running = np.maximum.accumulate(codes)
+    first = np.flatnonzero(np.concatenate([[True], running[1:] > running[:-1]]))
+
+    return codes, first
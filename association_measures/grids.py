@@ -1,9 +1,19 @@
+import os
 from itertools import product
 
+import numpy as np
 from numpy import exp, linspace, log
 from pandas import DataFrame
 
-from .measures import score
+from .measures import score, score_arrays
+
+# iso-lines refined by topography_adaptive() (measure: levels): critical
+# values of log-likelihood (p = .05, .001) and the boundary of
+# (non-)significant conservative log-ratios
+LEVELS = {
+    'log_likelihood': [-10.83, -3.84, 3.84, 10.83],
+    'conservative_log_ratio': [0],
+}
 
 
 def expand_grid(dictionary):
@@ -28,14 +38,23 @@ def log_seq(to=10e6, length=200, exact=50):
     return list(range(exact + 1)) + [int(exp(s)) for s in sorted([x for x in linspace(log(exact), log(to), length)])]
 
 
+def log_axis(to=10e6, length=200, exact=50):
+    """Create a logarithmically scaled sequence without duplicates (axis
+    of a grid)
+
+    """
+
+    return np.unique(log_seq(to, length, exact))
+
+
 def log_grid(N1=10e6, N2=10e6, length1=200, length2=200, exact1=50, exact2=50):
     """Create a logarithmically-scaled grid
 
     """
-    return expand_grid({
-        'f1': log_seq(N1, length1, exact=exact1),
-        'f2': log_seq(N2, length2, exact=exact2)
-    }).drop_duplicates().reset_index(drop=True)
+
+    f1, f2 = np.meshgrid(log_axis(N1, length1, exact1), log_axis(N2, length2, exact2), indexing='ij')
+
+    return DataFrame({'f1': f1.ravel(), 'f2': f2.ravel()})
 
 
 def topography(N1=10e6, N2=10e6, length=200, length1=None, length2=None, exact=50, exact1=None, exact2=None):
@@ -51,15 +70,199 @@ def topography(N1=10e6, N2=10e6, length=200, length1=None, length2=None, exact=5
     # support
     g = log_grid(N1=N1, N2=N2, length1=length1, length2=length2, exact1=exact1, exact2=exact2)
 
-    # add scores
-    scores = score(g, N1=N1, N2=N2)
-    # .. add alternative for CLR
-    scores['clr_normal'] = score(
-        g, N1=N1, N2=N2, boundary='normal', measures=['conservative_log_ratio']
-    )['conservative_log_ratio']
-    # .. add alternative for log-ratio
-    scores['log_ratio_hardie'] = score(
-        g, N1=N1, N2=N2, discounting='Hardie2014', measures=['log_ratio']
-    )['log_ratio']
-
-    return scores
+    # add scores, incl. alternatives for CLR and log-ratio (in one pass)
+    scores = score(g, N1=N1, N2=N2, boundary=['poisson', 'normal'], discounting=['Walter1975', 'Hardie2014'])
+    scores = scores.rename(columns={
+        'conservative_log_ratio_boundary=poisson': 'conservative_log_ratio',
+        'conservative_log_ratio_boundary=normal': 'clr_normal',
+        'log_ratio_discounting=Walter1975': 'log_ratio',
+        'log_ratio_discounting=Hardie2014': 'log_ratio_hardie',
+    })
+    alternatives = ['clr_normal', 'log_ratio_hardie']
+
+    return scores[[c for c in scores.columns if c not in alternatives] + alternatives]
+
+
+def topography_arrays(N1=10e6, N2=10e6, length=200, length1=None, length2=None, exact=50, exact1=None, exact2=None,
+                      measures=None, chunksize=10**6, directory=None, dtype='float64', **kwargs):
+    """Calculate scores on a logarithmically scaled grid as 2-D arrays
+    (one per measure, rows: f1, columns: f2), e.g. for contour plots via
+    `plt.contour(f2, f1, scores[measure])`.
+
+    The grid is scored in chunks of rows; scores are written into arrays
+    in memory or into memory-mapped .npy files in a directory (which can
+    be loaded via `np.load(path, mmap_mode='r')`), so that the size of
+    the grid is only limited by the size of the arrays.
+
+    :param list measures: names of measures (or measures)
+    :param int chunksize: number of grid points per chunk
+    :param str directory: write scores to memory-mapped files <directory>/<measure>.npy
+    :param str dtype: type of arrays
+
+    Further keyword arguments will be passed to `score_arrays()`; the
+    size of the vocabulary defaults to the number of grid points.
+
+    :return: f1 (values of rows), f2 (values of columns), scores (measure: 2-D array)
+    :rtype: tuple
+    """
+
+    exact1 = exact if exact1 is None else exact1
+    exact2 = exact if exact2 is None else exact2
+    length1 = length if length1 is None else length1
+    length2 = length if length2 is None else length2
+
+    f1 = log_axis(N1, length1, exact1)
+    f2 = log_axis(N2, length2, exact2)
+    shape = (len(f1), len(f2))
+    kwargs = dict(kwargs, measures=measures, freq=False)
+    if kwargs.get('vocab') is None:
+        kwargs['vocab'] = shape[0] * shape[1]
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    scores = dict()
+    rows = max(1, chunksize // shape[1])
+    for start in range(0, shape[0], rows):
+        stop = min(start + rows, shape[0])
+        O11 = np.repeat(f1[start:stop], shape[1])
+        O21 = np.tile(f2, stop - start)
+        for name, s in score_arrays(O11, O21=O21, R1=N1, R2=N2, **kwargs).items():
+            if name not in scores:
+                if directory is None:
+                    scores[name] = np.empty(shape, dtype=dtype)
+                else:
+                    path = os.path.join(directory, f'{name}.npy')
+                    scores[name] = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+            scores[name][start:stop] = s.reshape(stop - start, shape[1])
+
+    for s in scores.values():
+        if isinstance(s, np.memmap):
+            s.flush()
+
+    return f1, f2, scores
+
+
+def _crosses(values, level):
+    """Which cells (columns of corner values) does an iso-line cross,
+    i.e. which have corners on both sides of (or on) the level? NaNs
+    are ignored.
+
+    """
+
+    valid = ~np.isnan(values)
+    above, below = values > level, values < level
+
+    return (above.any(axis=0) & (valid & ~above).any(axis=0)) | (below.any(axis=0) & (valid & ~below).any(axis=0))
+
+
+def _coarse(n, initial):
+    """Indices of a coarse axis: every (2**depth)-th of n points (and
+    the last one), such that there are about `initial` points.
+
+    """
+
+    step = 2 ** max(0, int(np.ceil(np.log2(max(1, (n - 1) / max(1, initial - 1))))))
+
+    return np.unique(np.append(np.arange(0, n, step), n - 1))
+
+
+def _split(lo, hi, *others):
+    """Split index ranges [lo, hi] in halves (ranges of one step are
+    kept); other ranges (e.g. of the other axis) of split ones are
+    duplicated.
+
+    """
+
+    mid = (lo + hi) // 2
+    split = hi - lo > 1
+
+    return (np.concatenate([lo, mid[split]]), np.concatenate([np.where(split, mid, hi), hi[split]]),
+            *(np.concatenate([other, other[split]]) for other in others))
+
+
+def topography_adaptive(N1=10e6, N2=10e6, length=2000, length1=None, length2=None, exact=50, exact1=None,
+                        exact2=None, initial=50, measures=None, levels=None, tolerance=None, **kwargs):
+    """Calculate scores on an adaptively refined logarithmically scaled
+    grid: starting from a coarse grid, cells are split in halves (in both
+    directions) as long as an iso-line of a measure crosses the cell or
+    the scores at its corners differ by more than a tolerance, until
+    cells are cells of the full grid (as created by `log_grid()` with the
+    given length). Sampled points thus concentrate where iso-lines run
+    (e.g. for `plt.tricontour(f2, f1, scores)`), and their scores are
+    identical to the scores on the full grid.
+
+    Features smaller than a cell of the coarse grid that do not touch
+    its corners (e.g. an iso-line entering and leaving the cell through
+    the same edge) are not detected; increase `initial` if necessary.
+
+    :param int length: length of axes of the full grid
+    :param int initial: (approximate) length of axes of the coarse grid
+    :param list measures: names of measures (default: measures in LEVELS)
+    :param dict levels: iso-lines to refine (measure: values; default: LEVELS)
+    :param tolerance: refine cells whose scores differ by more than this (number or dict measure: number)
+
+    Further keyword arguments will be passed to `score_arrays()`; the
+    size of the vocabulary defaults to the number of points of the full
+    grid (as in `topography()`).
+
+    :return: scores of sampled points (f1, f2, measures)
+    :rtype: DataFrame
+    """
+
+    exact1 = exact if exact1 is None else exact1
+    exact2 = exact if exact2 is None else exact2
+    length1 = length if length1 is None else length1
+    length2 = length if length2 is None else length2
+    measures = list(LEVELS) if measures is None else measures
+    levels = LEVELS if levels is None else levels
+
+    f1 = log_axis(N1, length1, exact1)
+    f2 = log_axis(N2, length2, exact2)
+    n2 = len(f2)
+    kwargs = dict(kwargs, measures=measures, freq=False)
+    if kwargs.get('vocab') is None:
+        kwargs['vocab'] = len(f1) * n2
+
+    # cells of coarse grid (index ranges on full axes)
+    i, j = _coarse(len(f1), initial), _coarse(n2, initial)
+    i0, j0 = np.meshgrid(i[:-1], j[:-1], indexing='ij')
+    i1, j1 = np.meshgrid(i[1:], j[1:], indexing='ij')
+    i0, i1, j0, j1 = i0.ravel(), i1.ravel(), j0.ravel(), j1.ravel()
+
+    # scores of sampled points (sorted by key = i * n2 + j)
+    keys = np.empty(0, dtype='int64')
+    scores = None
+
+    while len(i0) > 0:
+
+        # score new corners
+        corners = np.stack([i0 * n2 + j0, i0 * n2 + j1, i1 * n2 + j0, i1 * n2 + j1])
+        new = np.setdiff1d(corners, keys)
+        if len(new) > 0:
+            s = score_arrays(f1[new // n2], O21=f2[new % n2], R1=N1, R2=N2, **kwargs)
+            keys = np.concatenate([keys, new])
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            scores = {
+                name: np.concatenate([scores[name], s[name]])[order] if scores is not None else s[name][order]
+                for name in s
+            }
+
+        # refine cells crossed by iso-lines or with steep gradients
+        positions = np.searchsorted(keys, corners)
+        refine = np.zeros(len(i0), dtype=bool)
+        for name, s in scores.items():
+            values = s[positions].astype('float64')
+            for level in levels.get(name, []):
+                refine |= _crosses(values, level)
+            tol = tolerance.get(name) if isinstance(tolerance, dict) else tolerance
+            if tol is not None:
+                with np.errstate(invalid='ignore'):
+                    refine |= np.nan_to_num(np.fmax.reduce(values) - np.fmin.reduce(values), nan=0) > tol
+        refine &= (i1 - i0 > 1) | (j1 - j0 > 1)
+
+        # split in both directions (quarters, or halves of narrow cells)
+        i0, i1, j0, j1 = _split(i0[refine], i1[refine], j0[refine], j1[refine])
+        j0, j1, i0, i1 = _split(j0, j1, i0, i1)
+
+    return DataFrame(dict({'f1': f1[keys // n2], 'f2': f2[keys % n2]}, **scores))
@@ -0,0 +1,150 @@
+"""
+incremental scoring
+
+Keeps frequency signatures (f, f2 per item; f1 and N for the whole
+corpus) and their scores, and recalculates scores on demand for those
+rows only that changed since the last calculation.
+
+"""
+
+import numpy as np
+from pandas import DataFrame, Index
+
+from .measures import _select_measures, score_arrays
+
+
+class IncrementalScorer:
+    """Scores of items in frequency signature notation (co-occurrence
+    frequency f and marginal frequency f2 per item, marginal frequency
+    f1 of the node and sample size N) under continuous count updates.
+
+    Updates only touch the counts; scores are calculated lazily by
+    `scores()`. If only item counts changed, only the affected rows are
+    rescored. If f1 or N changed, expected frequencies of all rows
+    change, and all rows are rescored (vectorised, on unique contingency
+    tables). If the vocabulary grows while f1 and N stay fixed, only the
+    conservative log-ratio (whose significance level is corrected for
+    the size of the vocabulary) is recalculated on unchanged rows.
+
+    """
+
+    def __init__(self, df=None, f1=0, N=0, measures=None, **kwargs):
+        """
+        :param DataFrame df: DataFrame with columns f and f2 (index: items)
+        :param int f1: marginal frequency of node
+        :param int N: sample size
+        :param list measures: names of measures (or measures)
+
+        Further keyword arguments will be passed to `score()`.
+        """
+
+        self.f1 = f1
+        self.N = N
+        self.measures = _select_measures(measures)
+        self.kwargs = kwargs
+
+        self._items = dict()
+        self._f = np.zeros(0, dtype='int64')
+        self._f2 = np.zeros(0, dtype='int64')
+        self._scores = None
+        self._dirty = np.zeros(0, dtype=bool)
+        self._scored = None        # (f1, N, vocab) of last calculation
+        self.name = None if df is None else df.index.name
+        self._index = None         # index of items (rebuilt when items are added)
+
+        if df is not None:
+            self.update(df.index, df['f'].to_numpy(), df['f2'].to_numpy())
+
+    def __len__(self):
+        return len(self._items)
+
+    def _positions(self, items):
+        """positions of items (appending new ones)"""
+
+        positions = np.empty(len(items), dtype='int64')
+        for i, item in enumerate(items):
+            position = self._items.get(item)
+            if position is None:
+                position = self._items[item] = len(self._items)
+                self._index = None
+            positions[i] = position
+
+        # grow arrays (amortised)
+        n = len(self._items)
+        if n > len(self._f):
+            capacity = max(n, 2 * len(self._f))
+            self._f = np.concatenate([self._f, np.zeros(capacity - len(self._f), dtype='int64')])
+            self._f2 = np.concatenate([self._f2, np.zeros(capacity - len(self._f2), dtype='int64')])
+            self._dirty = np.concatenate([self._dirty, np.ones(capacity - len(self._dirty), dtype=bool)])
+            if self._scores is not None:
+                self._scores = {name: np.concatenate([s, np.zeros(capacity - len(s), dtype=s.dtype)])
+                                for name, s in self._scores.items()}
+
+        return positions
+
+    def update(self, items, delta_f=0, delta_f2=0, delta_f1=0, delta_N=0):
+        """Add counts. Items not seen before are added; items may occur
+        several times.
+
+        :param list items: items
+        :param array delta_f: changes of co-occurrence frequencies f (or scalar)
+        :param array delta_f2: changes of marginal frequencies f2 (or scalar)
+        :param int delta_f1: change of marginal frequency f1 of node
+        :param int delta_N: change of sample size N
+        """
+
+        positions = self._positions(list(items))
+        np.add.at(self._f, positions, np.broadcast_to(delta_f, positions.shape))
+        np.add.at(self._f2, positions, np.broadcast_to(delta_f2, positions.shape))
+        self._dirty[positions] = True
+        self.f1 += delta_f1
+        self.N += delta_N
+
+    def scores(self):
+        """Calculate scores of all changed rows.
+
+        :return: association measures (index: items)
+        :rtype: DataFrame
+        """
+
+        n = len(self._items)
+        if n == 0:
+            return DataFrame()
+        f, f2 = self._f[:n], self._f2[:n]
+        vocab = self.kwargs.get('vocab')
+        vocab = n if vocab is None else vocab
+
+        def calculate(rows, measures, **kwargs):
+            O11 = f[rows]
+            O21 = f2[rows] - O11
+            return score_arrays(O11, O21=O21, R1=self.f1, R2=self.N - self.f1, measures=measures,
+                                **dict(self.kwargs, vocab=vocab, **kwargs))
+
+        if self._scored is None or self._scored[:2] != (self.f1, self.N):
+            # marginals changed: rescore everything
+            rows = np.arange(n)
+            self._scores = {name: np.concatenate([s, np.zeros(len(self._f) - n, dtype=s.dtype)])
+                            for name, s in calculate(rows, self.measures).items()}
+        else:
+            rows = np.flatnonzero(self._dirty[:n])
+            if len(rows) > 0:
+                for name, s in calculate(rows, self.measures).items():
+                    if s.dtype != self._scores[name].dtype:
+                        # e.g. compact counts that outgrew their type
+                        self._scores[name] = self._scores[name].astype(np.promote_types(self._scores[name].dtype, s.dtype))
+                    self._scores[name][rows] = s
+            # vocabulary changed: rescore CLR on all other rows
+            clr = [measure for measure in self.measures if measure.__name__ == 'conservative_log_ratio']
+            if clr and self._scored[2] != vocab and self.kwargs.get('correct', 'Bonferroni') is not None:
+                others = np.flatnonzero(~self._dirty[:n])
+                # (several columns if parameters are swept)
+                for name, s in calculate(others, clr, freq=False).items():
+                    self._scores[name][others] = s
+
+        self._dirty[:] = False
+        self._scored = (self.f1, self.N, vocab)
+
+        if self._index is None:
+            self._index = Index(list(self._items), name=self.name, tupleize_cols=False)
+
+        return DataFrame(index=self._index, data={name: s[:n] for name, s in self._scores.items()})
@@ -0,0 +1,245 @@
+#cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+single-pass kernels of association measures
+
+Each kernel reads observed frequencies O11, O12, O21, O22 (either all
+int64 or all float64) and writes scores to `out`. Marginals and expected
+frequencies are calculated on the fly (in the same order of operations as
+in frequencies.FORMULAS), i.e. without any temporary arrays. The GIL is
+released during the loop, so kernels can run on several threads.
+
+"""
+
+from libc.math cimport NAN, fmin, isnan, log, log2, log10, sqrt
+from scipy.special.cython_special cimport betainc, betaincinv
+
+
+ctypedef fused count_t:
+    long long
+    double
+
+
+cdef inline double _sign(double x) noexcept nogil:
+    if x > 0:
+        return 1
+    if x < 0:
+        return -1
+    if x == 0:
+        return 0
+    return NAN
+
+
+cdef inline double _xlog(count_t O, double E) noexcept nogil:
+    # NB: Oij = 0 is replaced by 1, the term will be multiplied by original Oij = 0
+    if O == 0:
+        return O * log(1 / E)
+    return O * log(O / E)
+
+
+def z_score(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+            const count_t[::1] O22, double[::1] out, **kwargs):
+    """Calculate z-score"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, C1, N
+    cdef double E11
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            C1 = O11[i] + O21[i]
+            N = R1 + (O21[i] + O22[i])
+            E11 = (<double> R1) * C1 / N
+            out[i] = (O11[i] - E11) / sqrt(E11)
+
+
+def t_score(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+            const count_t[::1] O22, double[::1] out, double disc=.001, **kwargs):
+    """Calculate t-score"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, C1, N
+    cdef double E11
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            C1 = O11[i] + O21[i]
+            N = R1 + (O21[i] + O22[i])
+            E11 = (<double> R1) * C1 / N
+            out[i] = (O11[i] - E11) / sqrt(O11[i] if O11[i] != 0 else disc)
+
+
+def log_likelihood(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+                   const count_t[::1] O22, double[::1] out, bint signed=True, **kwargs):
+    """Calculate log-likelihood"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, R2, C1, C2, N
+    cdef double E11, E12, E21, E22, am
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            R2 = O21[i] + O22[i]
+            C1 = O11[i] + O21[i]
+            C2 = O12[i] + O22[i]
+            N = R1 + R2
+            E11 = (<double> R1) * C1 / N
+            E12 = (<double> R1) * C2 / N
+            E21 = (<double> R2) * C1 / N
+            E22 = (<double> R2) * C2 / N
+            am = 2 * (_xlog(O11[i], E11) + _xlog(O12[i], E12) + _xlog(O21[i], E21) + _xlog(O22[i], E22))
+            if signed:
+                am = _sign(O11[i] - E11) * am
+            out[i] = am
+
+
+def simple_ll(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+              const count_t[::1] O22, double[::1] out, bint signed=True, **kwargs):
+    """Calculate simple log-likelihood"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, C1, N
+    cdef double E11, am
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            C1 = O11[i] + O21[i]
+            N = R1 + (O21[i] + O22[i])
+            E11 = (<double> R1) * C1 / N
+            am = 2 * (_xlog(O11[i], E11) - (O11[i] - E11))
+            if signed:
+                am = _sign(O11[i] - E11) * am
+            out[i] = am
+
+
+def min_sensitivity(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+                    const count_t[::1] O22, double[::1] out, **kwargs):
+    """Calculate Minimum Sensitivity"""
+
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(O11.shape[0]):
+            out[i] = fmin(<double> O11[i] / (O11[i] + O12[i]), <double> O11[i] / (O11[i] + O21[i]))
+
+
+def log_ratio(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+              const count_t[::1] O22, double[::1] out, double disc=.5,
+              str discounting='Walter1975', **kwargs):
+    """Calculate log-ratio"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, R2
+    cdef bint walter
+    if discounting == 'Walter1975':
+        walter = True
+    elif discounting == 'Hardie2014':
+        walter = False
+    else:
+        raise ValueError('parameter "discounting" should either be "Walter1975" or "Hardie2014".')
+
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            R2 = O21[i] + O22[i]
+            if walter:
+                out[i] = log2(((O11[i] + disc) / (R1 + disc)) / ((O21[i] + disc) / (R2 + disc)))
+            else:
+                out[i] = log2(
+                    ((O11[i] if O11[i] != 0 else disc) / (O21[i] if O21[i] != 0 else disc)) /
+                    (<double> R1 / R2)
+                )
+
+
+def mutual_information(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+                       const count_t[::1] O22, double[::1] out, double disc=.001, **kwargs):
+    """Calculate Mutual Information"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, C1, N
+    cdef double E11
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            C1 = O11[i] + O21[i]
+            N = R1 + (O21[i] + O22[i])
+            E11 = (<double> R1) * C1 / N
+            out[i] = log10((O11[i] if O11[i] != 0 else disc) / E11)
+
+
+def local_mutual_information(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+                             const count_t[::1] O22, double[::1] out, **kwargs):
+    """Calculate Local Mutual Information"""
+
+    cdef Py_ssize_t i
+    cdef count_t R1, C1, N
+    cdef double E11
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            C1 = O11[i] + O21[i]
+            N = R1 + (O21[i] + O22[i])
+            E11 = (<double> R1) * C1 / N
+            out[i] = O11[i] * log10((O11[i] if O11[i] != 0 else 1) / E11)
+
+
+def conservative_log_ratio_poisson(const count_t[::1] O11, const count_t[::1] O12, const count_t[::1] O21,
+                                   const count_t[::1] O22, double[::1] out, double alpha):
+    """Calculate conservative log-ratio with Poisson boundary for
+    (corrected) significance level alpha.
+
+    Only the boundary of the confidence interval that is actually used
+    is calculated (the lower one if O11 / R1 >= O21 / R2, the upper one
+    otherwise). Before inverting the incomplete beta function, a single
+    evaluation at the point where the boundary crosses zero determines
+    whether the boundary would be clipped to zero anyway, which is the
+    case for most rows in practice.
+
+    """
+
+    cdef Py_ssize_t i
+    cdef count_t R1, R2
+    cdef double a, b, ratio, x0, x, am
+    cdef bint lower
+    with nogil:
+        for i in range(O11.shape[0]):
+            R1 = O11[i] + O12[i]
+            R2 = O21[i] + O22[i]
+
+            # zero if O11 == O12 == 0
+            if O11[i] == 0 and O12[i] == 0:
+                out[i] = 0
+                continue
+
+            lower = (<double> O11[i] / R1) >= (<double> O21[i] / R2)
+            if lower:
+                a, b = O11[i], O21[i] + 1
+            else:
+                a, b = O11[i] + 1, O21[i]
+            if not (a > 0 and b > 0):
+                # undefined
+                out[i] = 0
+                continue
+
+            # boundary is zero iff quantile x is (at most | at least) x0
+            ratio = <double> R2 / R1
+            if R1 > 0 and R2 > 0:
+                x0 = 1 / (1 + ratio)
+                if lower and betainc(a, b, x0) >= alpha:
+                    out[i] = 0
+                    continue
+                if not lower and betainc(a, b, x0) <= 1 - alpha:
+                    out[i] = 0
+                    continue
+
+            # inverse of regularized incomplete beta function
+            if lower:
+                x = betaincinv(a, b, alpha)
+            else:
+                x = betaincinv(a, b, 1 - alpha)
+            am = log2(ratio * x / (1 - x))
+            if isnan(am):
+                am = 0
+            elif lower and am < 0:
+                am = 0
+            elif not lower and am > 0:
+                am = 0
+            out[i] = am
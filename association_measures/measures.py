@@ -3,26 +3,165 @@ association measures
 
 """
 
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import wraps
+from inspect import signature
+from itertools import product
+from multiprocessing.shared_memory import SharedMemory
 from warnings import warn
 
 import numpy as np
-from pandas import concat, merge
-from scipy.stats import beta, norm
+from pandas import DataFrame, Series
+from scipy.special import gammaln, xlogy
+from scipy.stats import norm
 
-from .binomial import choose
-from .frequencies import expected_frequencies, observed_frequencies
+from . import kernels
+from .frequencies import (FORMULAS, Frequencies, _multiply, _table,
+                          compact_observed, factorize_tables, observed_arrays)
+from .frequencies import expected_frequencies, observed_frequencies  # noqa: F401 (re-exported)
+from .profiling import Profile, _profiled, _stage
 
-CHOOSE = np.vectorize(choose)
+FREQUENCIES = ['O11', 'O12', 'O21', 'O22', 'R1', 'R2', 'C1', 'C2', 'N', 'E11', 'E12', 'E21', 'E22']
+OBSERVED = FREQUENCIES[:9]
 
+# parameters passed on to measures (see `score()`)
+PARAMETERS = ['disc', 'discounting', 'signed', 'alpha', 'correct', 'boundary', 'vocab', 'one_sided', 'log']
 
-def list_measures():
+# only reduce to unique contingency tables if at least DEDUP_RATIO of
+# all rows are duplicates
+DEDUP_RATIO = .05
+
+# range of float32 (scores outside, or not representable to the number of
+# digits they are rounded to, are kept in float64 with dtype="compact";
+# observed frequencies and marginals are never converted to float32)
+FLOAT32 = np.finfo('float32')
+
+# number of rows scored for estimating the memory needed per row (see `max_memory`)
+MEMORY_SAMPLE = 10000
+UNITS = {'': 1, 'K': 2**10, 'M': 2**20, 'G': 2**30, 'T': 2**40}
+
+
+def _ratio(observed, expected):
+    # NB: Oij = 0 is replaced by 1, the term will be multiplied by original Oij = 0
+    return np.where(observed != 0, observed, 1) / expected
+
+
+def _xlog(observed, ratio):
+    return observed * np.log(ratio)
+
+
+def _contiguous(*arrays):
+    """Convert arrays to contiguous int64 arrays (if all of them are
+    integer arrays) or float64 arrays (otherwise) as expected by kernels.
+
+    """
+
+    arrays = [np.asarray(array) for array in arrays]
+    dtype = 'int64' if all(array.dtype.kind in 'iu' for array in arrays) else 'float64'
+
+    return [np.ascontiguousarray(array, dtype=dtype) for array in arrays]
+
+
+# intermediate terms shared between measures (name: (dependencies, formula))
+TERMS = dict(FORMULAS, **{
+    'O11-E11': (('O11', 'E11'), np.subtract),
+    'sign(O11-E11)': (('O11-E11', ), np.sign),
+    'O11/E11': (('O11', 'E11'), _ratio),
+    'O12/E12': (('O12', 'E12'), _ratio),
+    'O21/E21': (('O21', 'E21'), _ratio),
+    'O22/E22': (('O22', 'E22'), _ratio),
+    'O11*ln(O11/E11)': (('O11', 'O11/E11'), _xlog),
+    # input of compiled kernels
+    'contiguous': (('O11', 'O12', 'O21', 'O22'), _contiguous),
+})
+
+
+def _measure(*requires, kernel=None, bound=None):
+    """Declare the frequencies and intermediate terms (see TERMS) a
+    measure requires (and its compiled kernel and a cheap upper bound of
+    its scores, if any), and make it work on DataFrames as well as on
+    plain mappings of NumPy arrays (column name: array).
+
+    Measures are written in terms of NumPy operations only. DataFrame
+    input is converted to arrays and the scores are returned as a
+    Series with the same index; otherwise the array is returned as is.
+
+    """
+
+    def decorator(func):
+
+        @wraps(func)
+        def wrapper(df, **kwargs):
+            with np.errstate(all='ignore'):
+                if isinstance(df, DataFrame):
+                    frequencies = Frequencies({column: df[column].to_numpy() for column in df.columns}, TERMS)
+                    return Series(func(frequencies, **kwargs), index=df.index)
+                if not isinstance(df, Frequencies):
+                    df = Frequencies(df, TERMS)
+                return func(df, **kwargs)
+
+        wrapper.requires = requires
+        wrapper.kernel = kernel
+        wrapper.bound = bound
+        return wrapper
+
+    return decorator
+
+
+def _plan(measures, frequencies, keep=()):
+    """Plan the calculation of measures on lazily evaluated frequencies:
+    for each measure, determine the cached columns that are not needed
+    by any of the following measures and can thus be released after
+    calculating it.
+
+    :param list measures: measures
+    :param Frequencies frequencies: frequencies
+    :param iterable keep: columns that must not be released
+    :return: list of (measure, columns to release)
+    :rtype: list
+    """
+
+    plan = list()
+    later = set(keep)
+    for measure in reversed(measures):
+        requires = getattr(measure, 'requires', None)
+        if requires is None:
+            # no declaration: measure might need anything
+            required = set(frequencies.formulas)
+        else:
+            required = set().union(*(frequencies.closure(r) for r in requires))
+        plan.append((measure, required - later - set(frequencies.given)))
+        later |= required
+
+    return list(reversed(plan))
+
+
+def _frame(frequencies):
+    """Materialise frequencies (observed, marginal and expected) as a
+    DataFrame for measures that do not declare the terms they require,
+    since these are written for DataFrames and may use pandas methods.
+
+    :param Frequencies frequencies: frequencies
+    :return: frequencies (one column per term, scalars broadcast)
+    :rtype: DataFrame
+    """
+
+    n = len(frequencies)
+    return DataFrame({name: np.broadcast_to(frequencies[name], n) for name in FREQUENCIES})
+
+
+def list_measures(optional=False):
     """Return a dictionary of implemented measures (name: measure)
 
+    :param bool optional: include measures that are only calculated on
+                          request (Fisher's exact test, which is expensive)
     :return: dictionary of measures
     :rtype: dict
     """
 
-    return {
+    measures = {
         # asymptotic hypothesis tests
         'z_score': z_score,
         't_score': t_score,
@@ -34,21 +173,403 @@ def list_measures():
         'dice': dice,
         'log_ratio': log_ratio,
         # likelihood measures
-        # 'hypergeometric_likelihood': hypergeometric_likelihood,
-        # 'binomial_likelihood': binomial_likelihood,
+        'hypergeometric_likelihood': hypergeometric_likelihood,
+        'binomial_likelihood': binomial_likelihood,
         # conservative estimates
         'conservative_log_ratio': conservative_log_ratio,
         # information theory
         'mutual_information': mutual_information,
         'local_mutual_information': local_mutual_information,
     }
+    if optional:
+        # exact hypothesis tests
+        measures['fisher_exact'] = fisher_exact
+
+    return measures
+
+
+def _reduce(*columns):
+    """Factorize contingency tables (given by the columns that vary
+    between rows) for scoring each unique table only once. Skipped if
+    there are hardly any duplicates, since gathering unique tables and
+    scattering their scores back would cost more than it saves.
+
+    NB: the ratio of duplicates cannot be estimated from a sample of
+    rows (duplicates of sampled rows are mostly not sampled themselves),
+    so the whole table is factorized; this takes a fraction of the time
+    needed for scoring.
+
+    :return: codes (index of unique table for each row) and positions of unique tables, or None
+    :rtype: tuple
+    """
+
+    n = len(columns[0])
+    codes, first = factorize_tables(*columns)
+    if len(first) == n or 1 - len(first) / n < DEDUP_RATIO:
+        return None
+
+    return codes, first
+
+
+def _compact(s, digits=None):
+    """Convert float scores to float32 unless (finite, non-zero) scores
+    would overflow or underflow, or (if scores are rounded to digits)
+    float32 cannot represent them to the given number of digits; other
+    arrays are returned as is.
+
+    """
+
+    s = np.asarray(s)
+    if s.dtype != 'float64':
+        return s
+
+    compact = s.astype('float32')
+    with np.errstate(invalid='ignore', over='ignore'):
+        magnitude = np.abs(compact)
+        lost = np.isfinite(s) & (s != 0) & ~((magnitude >= FLOAT32.tiny) & (magnitude <= FLOAT32.max))
+        if digits is not None and not lost.any():
+            lost = np.isfinite(s) & (np.round(compact.astype('float64'), digits) != s)
+    if lost.any():
+        return s
+
+    return compact
+
+
+def _memory(value):
+    """Number of bytes given as integer or string with unit (e.g. "512MB",
+    "4G"; units are powers of 1024).
+
+    """
+
+    if isinstance(value, str):
+        match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)\s*([KMGT]?)(?:i?B)?\s*', value, re.IGNORECASE)
+        if match is None:
+            raise ValueError(f'cannot parse memory "{value}" (e.g. "512MB", "4G")')
+        value = float(match.group(1)) * UNITS[match.group(2).upper()]
+
+    return int(value)
+
+
+def _chunksize(observed, max_memory, settings, profile=None):
+    """Number of rows per chunk for scoring within a memory budget.
+
+    Memory needed per row (peak of all allocations while scoring, and
+    the returned scores) is measured on an evenly spaced sample of rows;
+    the scores of all rows have to fit into the budget, the remaining
+    memory determines the size of the chunks.
+
+    :param dict observed: observed frequencies (name: array or scalar marginal)
+    :param int max_memory: memory budget (bytes)
+    :param dict settings: keyword arguments of `score_arrays()`
+    :param Profile profile: record the sample
+    :return: number of rows per chunk (None if all rows fit)
+    :rtype: int
+    """
+
+    n = len(observed['O11'])
+    step = max(1, n // MEMORY_SAMPLE)
+    sample = {name: O[::step] if O.ndim > 0 else O for name, O in observed.items()}
+    m = len(sample['O11'])
+
+    profile = Profile() if profile is None else profile
+    with profile.tracing(), profile.stage('sample', rows=m) as record:
+        scores = score_arrays(**sample, **settings)
+    output = sum(s.itemsize for s in scores.values())
+    peak = record['peak_bytes'] / max(m, 1)
+
+    available = max_memory - n * output
+    if available < peak:
+        raise ValueError(
+            f'scores of {n} rows need about {n * output} bytes (more than max_memory={max_memory}): '
+            'use score_iter() or score_file() instead'
+        )
+    if n * peak <= available:
+        return None
+
+    # leave some slack for allocations that do not scale with the number of rows
+    return max(1, int(.9 * available / peak))
+
+
+def _calculate(frequencies, measures, params, keep=(), profile=None):
+    """Calculate measures on lazily evaluated frequencies, releasing
+    intermediate terms as soon as possible.
+
+    :param Frequencies frequencies: frequencies
+    :param list measures: measures
+    :param dict params: keyword arguments passed to the measures
+    :param iterable keep: columns that must not be released
+    :param Profile profile: record each measure
+    :return: association measures (name: array)
+    :rtype: dict
+    """
+
+    scores = dict()
+    with np.errstate(all='ignore'):
+        for measure, release in _plan(measures, frequencies, keep):
+            with _stage(profile, 'measure', measure.__name__, len(frequencies)):
+                if getattr(measure, 'requires', None) is None:
+                    score = measure(_frame(frequencies), **params)
+                    scores[measure.__name__] = score.to_numpy() if isinstance(score, Series) else score
+                else:
+                    scores[measure.__name__] = measure(frequencies, **params)
+            frequencies.release(release)
+
+    return scores
+
+
+def _n_jobs(n_jobs):
+    """Return number of parallel jobs (negative: number of CPUs + 1 + n_jobs)."""
+
+    if n_jobs is None:
+        return 1
+
+    return max(1, os.cpu_count() + 1 + n_jobs) if n_jobs < 0 else n_jobs
+
+
+def _calculate_kernels(frequencies, measures, params, n_jobs, keep=(), profile=None):
+    """Calculate measures with their compiled kernels on several threads
+    (kernels release the GIL). Measures without kernel are calculated
+    as usual.
+
+    :param Frequencies frequencies: frequencies (observed frequencies O11..O22 given)
+    :param list measures: measures
+    :param dict params: keyword arguments passed to the measures
+    :param int n_jobs: number of threads
+    :param iterable keep: columns that must not be released
+    :param Profile profile: record each measure
+    :return: association measures (name: array)
+    :rtype: dict
+    """
+
+    # all kernels share one set of contiguous arrays
+    observed = frequencies['contiguous']
+
+    n = len(observed[0])
+    n_jobs = _n_jobs(n_jobs)
+    bounds = np.unique(np.linspace(0, n, n_jobs + 1).astype(int))
+
+    scores = dict()
+    compiled = [measure for measure in measures if getattr(measure, 'kernel', None) is not None]
+    with ThreadPoolExecutor(n_jobs) as executor:
+        for measure in compiled:
+            with _stage(profile, 'measure', measure.__name__, n):
+                out = np.empty(n, dtype='float64')
+                futures = [
+                    executor.submit(measure.kernel, *(array[start:stop] for array in observed), out[start:stop], **params)
+                    for start, stop in zip(bounds[:-1], bounds[1:])
+                ]
+                for future in futures:
+                    future.result()
+            scores[measure.__name__] = out
+    del observed
+    frequencies.release(['contiguous'])
+
+    scores.update(_calculate(frequencies, [m for m in measures if m not in compiled], params, keep, profile))
+
+    return {measure.__name__: scores[measure.__name__] for measure in measures}
+
+
+def _calculate_partition(inputs, scalars, output, start, stop, measures, params):
+    """Calculate measures on rows [start, stop) of observed frequencies
+    in shared memory (and scalar marginals) and write scores to shared
+    memory (worker of _calculate_parallel).
+
+    """
+
+    n = next(iter(inputs.values()))[2]
+    segments = [SharedMemory(name) for name, _, _ in inputs.values()] + [SharedMemory(output)]
+    try:
+        observed = {
+            column: np.ndarray(n, dtype, buffer=segment.buf)[start:stop]
+            for (column, (_, dtype, n)), segment in zip(inputs.items(), segments)
+        }
+        scores = _calculate(Frequencies(dict(observed, **scalars), TERMS), measures, params)
+        out = np.ndarray((len(measures), n), 'float64', buffer=segments[-1].buf)
+        for i, measure in enumerate(measures):
+            out[i, start:stop] = scores[measure.__name__]
+        # NB: views have to be deleted before shared memory can be closed
+        del observed, out
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+def _calculate_parallel(observed, measures, params, n_jobs):
+    """Calculate measures on partitions of observed frequencies in a
+    process pool. Observed frequencies and scores are exchanged via
+    shared memory instead of being pickled.
+
+    :param dict observed: observed frequencies (name: array or scalar marginal)
+    :param list measures: measures (must be picklable)
+    :param dict params: keyword arguments passed to the measures
+    :param int n_jobs: number of processes (negative: number of CPUs + 1 + n_jobs)
+    :return: association measures (name: array)
+    :rtype: dict
+    """
+
+    n = len(observed['O11'])
+    n_jobs = _n_jobs(n_jobs)
+    scalars = {column: O for column, O in observed.items() if np.ndim(O) == 0}
+
+    segments = list()
+    try:
+        # observed frequencies and scores in shared memory
+        inputs = dict()
+        for column, array in observed.items():
+            if column in scalars:
+                continue
+            array = np.ascontiguousarray(array)
+            segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(n, array.dtype, buffer=segment.buf)[:] = array
+            inputs[column] = (segment.name, array.dtype.str, n)
+        segment = SharedMemory(create=True, size=max(8 * len(measures) * n, 1))
+        segments.append(segment)
+
+        # several partitions per process for balancing load
+        bounds = np.unique(np.linspace(0, n, 4 * n_jobs + 1).astype(int))
+        with ProcessPoolExecutor(n_jobs) as executor:
+            futures = [
+                executor.submit(_calculate_partition, inputs, scalars, segment.name, start, stop, measures, params)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+
+        out = np.ndarray((len(measures), n), 'float64', buffer=segment.buf)
+        scores = {measure.__name__: out[i].copy() for i, measure in enumerate(measures)}
+        del out
+
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    return scores
+
+
+def _calculate_tables(frequencies, measures, params, tables, calculate, keep=(), profile=None):
+    """Look up scores of contingency tables covered by precomputed score
+    tables, calculate all other scores.
+
+    :param Frequencies frequencies: frequencies (observed frequencies O11..O22 given)
+    :param list measures: measures
+    :param dict params: keyword arguments passed to the measures
+    :param list tables: precomputed score tables (see tables.ScoreTable)
+    :param callable calculate: calculate(frequencies, measures, keep) for calculating scores
+    :param iterable keep: columns that must not be released
+    :param Profile profile: record look-ups (and calculated measures)
+    :return: association measures (name: array)
+    :rtype: dict
+    """
+
+    observed = {c: frequencies[c] for c in ['O11', 'O12', 'O21', 'O22']}
+    n = len(frequencies)
+
+    scores = dict()
+    remaining = list(measures)
+    for table in tables:
+        looked_up = [measure for measure in remaining if table.matches(measure, params)]
+        if not looked_up:
+            continue
+        with _stage(profile, 'lookup', ', '.join(measure.__name__ for measure in looked_up), n):
+            covered = table.covered(**observed)
+            rest = calculate(
+                Frequencies({c: O[~covered] for c, O in observed.items()}, TERMS), looked_up
+            )
+            for measure in looked_up:
+                am = np.empty(n, dtype='float64')
+                am[covered] = table.lookup(measure.__name__, observed['O11'][covered], observed['O21'][covered])
+                am[~covered] = rest[measure.__name__]
+                scores[measure.__name__] = am
+        remaining = [measure for measure in remaining if measure not in looked_up]
+
+    scores.update(calculate(frequencies, remaining, keep))
+
+    return {measure.__name__: scores[measure.__name__] for measure in measures}
+
+
+def _select_measures(measures=None):
+    """Return list of measures given their names (or the measures
+    themselves). Defaults to all measures that are not optional.
+
+    """
+
+    ams_all = list_measures(optional=True)
+    if measures is not None:
+        if isinstance(measures[0], str):
+            # TODO issue warning if measure not in list
+            measures = [ams_all[k] for k in measures if k in ams_all.keys()]
+    else:
+        measures = list(list_measures().values())
+
+    return measures
+
+
+class _Variant:
+    """Measure with fixed parameters (one combination of a parameter
+    sweep), named after the measure and these parameters, e.g.
+    "conservative_log_ratio_alpha=0.01". Declarations of the measure
+    (required terms, kernel, bound) are passed on, so that variants
+    share all intermediate terms with each other and can be calculated
+    in parallel (variants are picklable).
+
+    :param callable measure: measure
+    :param dict params: fixed keyword arguments
+    """
+
+    def __init__(self, measure, params):
+        self.measure = measure
+        self.params = params
+        self.__name__ = '_'.join([measure.__name__] + [f'{p}={v}' for p, v in params.items()])
+        self.requires = getattr(measure, 'requires', None)
+        self.kernel = None if getattr(measure, 'kernel', None) is None else self._kernel
+        self.bound = None if getattr(measure, 'bound', None) is None else self._bound
+
+    def __call__(self, df, **kwargs):
+        return self.measure(df, **dict(kwargs, **self.params))
+
+    def _kernel(self, *arrays, **kwargs):
+        return self.measure.kernel(*arrays, **dict(kwargs, **self.params))
 
+    def _bound(self, df, **kwargs):
+        return self.measure.bound(df, **dict(kwargs, **self.params))
 
+
+def _sweep(measures, params):
+    """Expand measures for parameters given as lists of values: each
+    measure that accepts swept parameters is replaced by one variant
+    per combination of their values (in order of PARAMETERS).
+
+    :param list measures: measures
+    :param dict params: keyword arguments passed to the measures (lists: values to sweep)
+    :return: measures (and variants), parameters without swept ones
+    :rtype: tuple
+    """
+
+    swept = {p: list(v) for p, v in params.items() if isinstance(v, (list, tuple))}
+    if not swept:
+        return measures, params
+
+    variants = list()
+    for measure in measures:
+        accepted = [p for p in swept if p in signature(measure).parameters]
+        if not accepted:
+            variants.append(measure)
+            continue
+        for values in product(*(swept[p] for p in accepted)):
+            variants.append(_Variant(measure, dict(zip(accepted, values))))
+
+    return variants, {p: v for p, v in params.items() if p not in swept}
+
+
+@_profiled
 def score(df, measures=None, f1=None, N=None, N1=None, N2=None,
           freq=True, per_million=True, digits=6, disc=.001,
           discounting='Walter1975', signed=True, alpha=.001,
           correct='Bonferroni', boundary='poisson', vocab=None,
-          one_sided=False):
+          one_sided=False, log=False, n_jobs=None, engine='numpy', tables=None,
+          dtype=None, max_memory=None, profile=None):
     """Calculate a list of association measures on columns of df. Defaults
     to all available (and numerically stable) measures.
 
@@ -59,11 +580,23 @@ def score(df, measures=None, f1=None, N=None, N1=None, N2=None,
     Integers (f1, N, N1, N2) can also be passed as scalar arguments. See
     frequencies.observed_frequencies for further info on notation.
 
+    df can also be a pyarrow Table (or RecordBatch) or a Polars
+    DataFrame: frequency columns are then read without copying, and
+    scores are returned in a table of the same type (in the order of
+    the input rows, since these have no index).
+
     :param DataFrame df: Dataframe with reasonably-named frequency columns
     :param list measures: names of measures (or measures)
     :param bool freq: also return observed and expected frequencies (incl. marginals)?
     :param bool per_million: return instances per million? (only if freq is True)
     :param int digits: round scores
+    :param int n_jobs: number of processes ("numpy") or threads ("cython") (negative: number of CPUs + 1 + n_jobs)
+    :param str engine: calculate measures via NumPy ("numpy") or compiled kernels where available ("cython")
+    :param list tables: precomputed score tables to look up scores in (see tables.ScoreTable)
+    :param str dtype: return integer frequencies in the smallest safe integer type and scores in float32 where their range and digits allow ("compact")
+    :param max_memory: score in chunks of rows so that allocations stay below this many bytes (int or e.g. "4GB")
+    :param profile: record wall time, rows and allocated memory of each stage: True (return a profiling.Profile
+        alongside the scores), a callback (called with the record of each stage) or a Profile
 
     Further keyword arguments will be passed to the respective measures:
     :param float disc: discounting (or smoothing) parameter for O11 == 0 (and O21 == 0)
@@ -73,57 +606,342 @@ def score(df, measures=None, f1=None, N=None, N1=None, N2=None,
     :param str boundary: CLR: exact CI boundary of [poisson] distribution or [normal] approximation?
     :param str correct: CLR: correction type repeated tests (None|"Bonferroni"|"Sidak")
     :param int vocab: CLR: size of vocabulary (number of comparisons for correcting alpha)
-    :param bool one_sided: CLR: calculate one- or two-sided confidence interval
+    :param bool one_sided: CLR/Fisher: calculate one- or two-sided confidence interval (p-value)
+    :param bool log: HL/BL: return natural logarithm of likelihood? Fisher: return -log10 of p-value?
 
-    :return: association measures
+    Each of these parameters can also be given as a list of values
+    (e.g. alpha=[.01, .001]): measures accepting it are then calculated
+    for each value (for each combination of values of several such
+    parameters) in one pass and returned in columns suffixed by the
+    parameters (e.g. "conservative_log_ratio_alpha=0.01").
+
+    :return: association measures (and profile if profile is True)
     :rtype: DataFrame
 
     """
 
-    # convert input to contingency notation and calculate expected frequencies
-    df = observed_frequencies(df, f1=f1, N=N, N1=N1, N2=N2)
-    df = expected_frequencies(df, observed=True)
-    freq_columns = df.columns
+    # convert input to contingency notation (constant marginals as scalars)
+    with _stage(profile, 'notation', rows=len(df)):
+        observed = observed_arrays(df, f1=f1, N=N, N1=N1, N2=N2)
+
+    # arrays allocated by the conversion (rather than views of df) count against the memory budget
+    if max_memory is not None:
+        max_memory = _memory(max_memory) - sum(array.nbytes for array in observed.values() if array.ndim > 0 and array.base is None)
+
+    # calculate (only required) frequencies and measures on unique contingency tables
+    scores = score_arrays(
+        **observed, measures=measures,
+        freq=freq, per_million=per_million, digits=digits, disc=disc,
+        discounting=discounting, signed=signed, alpha=alpha, correct=correct,
+        boundary=boundary, vocab=vocab, one_sided=one_sided, log=log, n_jobs=n_jobs, engine=engine,
+        tables=tables, dtype=dtype, max_memory=max_memory, profile=profile
+    )
 
-    # select measures
-    ams_all = list_measures()
-    if measures is not None:
-        if isinstance(measures[0], str):
-            # TODO issue warning if measure not in list
-            measures = [ams_all[k] for k in measures if k in ams_all.keys()]
-    else:
-        measures = [ams_all[k] for k in ams_all]
+    with _stage(profile, 'output', rows=len(df)):
+        # columns are not copied (again), unless they are frequency columns of df
+        given = [array for array in observed.values() if array.ndim > 0]
+        scores = {
+            name: s.copy() if any(np.may_share_memory(s, array) for array in given) else s for name, s in scores.items()
+        }
+        return _table(scores, df, copy=False)
 
-    # reduce df to unique frequency signatures
-    vocab = len(df) if vocab is None else vocab
-    df_reduced = df.drop_duplicates(subset=list(freq_columns)).copy()
 
-    # calculate measures
-    for measure in measures:
-        df_reduced[measure.__name__] = measure(
-            df_reduced, disc=disc, discounting=discounting, signed=signed, alpha=alpha,
-            correct=correct, boundary=boundary, vocab=vocab, one_sided=one_sided
-        )
+def score_iter(chunks, measures=None, vocab=None, correct='Bonferroni', **kwargs):
+    """Calculate association measures chunk by chunk, e.g. on tables that
+    do not fit into memory. Yields one scored DataFrame per chunk.
+
+    Scoring each chunk separately is not sufficient for the conservative
+    log-ratio, since alpha is corrected for the size of the vocabulary,
+    which must not be the size of the chunk. If `vocab` is not given, a
+    first pass over all chunks counts the rows (as `score()` does for a
+    single DataFrame). `chunks` thus must be re-iterable (e.g. a list of
+    DataFrames), or a function returning a fresh iterator (e.g. `lambda:
+    pd.read_csv(path, chunksize=10**6)`).
+
+    :param iterable chunks: DataFrames with reasonably-named frequency columns (or function returning them)
+    :param list measures: names of measures (or measures)
+    :param int vocab: CLR: size of vocabulary (number of comparisons for correcting alpha)
+    :param str correct: CLR: correction type repeated tests (None|"Bonferroni"|"Sidak")
+
+    Further keyword arguments will be passed to `score()`.
+
+    :return: association measures of each chunk
+    :rtype: generator
+    """
+
+    def iterate():
+        return iter(chunks()) if callable(chunks) else iter(chunks)
+
+    # global vocabulary size (only needed for correction of CLR)
+    needs_vocab = correct is not None and any(
+        measure.__name__ == 'conservative_log_ratio' for measure in _select_measures(measures)
+    )
+    if vocab is None and needs_vocab:
+        if not callable(chunks) and iter(chunks) is chunks:
+            raise ValueError(
+                'chunks can only be iterated once: pass vocab or a function returning the chunks'
+            )
+        vocab = sum(len(chunk) for chunk in iterate())
+
+    for chunk in iterate():
+        yield score(chunk, measures=measures, vocab=vocab, correct=correct, **kwargs)
+
+
+@_profiled
+def score_topk(df, measure, k=100, f1=None, N=None, N1=None, N2=None,
+               ascending=False, profile=None, **kwargs):
+    """Calculate the k highest (or lowest) scoring rows of df according
+    to one association measure, sorted by score.
+
+    Rows are selected via partial selection instead of sorting all
+    scores. For measures that declare a cheap upper bound of their
+    scores (conservative log-ratio, -log10 p of Fisher's exact test),
+    the measure is only calculated on rows whose bound is not below the
+    k-th best score among the rows with the highest bounds, i.e. on rows
+    that can enter the top k at all.
+
+    :param DataFrame df: DataFrame with reasonably-named frequency columns
+    :param str measure: name of measure (or measure)
+    :param int k: number of rows
+    :param bool ascending: select the lowest scoring rows instead?
+    :param profile: record stages (see `score()`)
+
+    Integers f1, N, N1, N2 and further keyword arguments will be passed
+    to `score()`.
+
+    :return: association measures of top k rows (and profile if profile is True)
+    :rtype: DataFrame
+    """
+
+    # convert input to contingency notation (constant marginals as scalars)
+    index = df.index
+    with _stage(profile, 'notation', rows=len(df)):
+        observed = observed_arrays(df, f1=f1, N=N, N1=N1, N2=N2)
+    measure = _select_measures([measure])[0]
+    name = measure.__name__
+    n = len(index)
+
+    # vocabulary of the whole table (not of the calculated rows)
+    if kwargs.get('vocab') is None:
+        kwargs['vocab'] = n
+
+    def calculate(rows, **settings):
+        return score_arrays(**{c: O[rows] if O.ndim > 0 else O for c, O in observed.items()},
+                            measures=[measure], profile=profile, **dict(kwargs, **settings))
+
+    # only calculate rows whose upper bound reaches the k-th best score
+    # among the (2k) rows with the highest bounds
+    candidates = np.arange(n)
+    bound = getattr(measure, 'bound', None)
+    if not ascending and bound is not None and 2 * k < n:
+        defaults = signature(score_arrays).parameters
+        params = {p: kwargs.get(p, defaults[p].default) for p in PARAMETERS}
+        with np.errstate(all='ignore'), _stage(profile, 'bound', name, n):
+            upper = bound(Frequencies(observed, TERMS), **params)
+        if upper is not None:
+            sample = np.argpartition(-upper, 2 * k)[:2 * k]
+            scores = calculate(sample, freq=False, digits=None)[name]
+            scores = scores[~np.isnan(scores)]
+            if len(scores) >= k:
+                threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                # slack for rounding errors of tight bounds and for ties after rounding scores
+                digits = kwargs.get('digits', defaults['digits'].default)
+                slack = max(1e-9 * abs(threshold), 0 if digits is None else 10 ** -digits)
+                candidates = np.flatnonzero(upper >= threshold - slack)
+
+    # partial selection of top k rows (NaN last, ties in order of rows)
+    scores = calculate(candidates, freq=False)[name]
+    with _stage(profile, 'select', name, len(candidates)):
+        key = scores if ascending else -scores
+        key = np.where(np.isnan(key), np.inf, key)
+        if k < len(key):
+            kth = np.partition(key, k - 1)[k - 1]
+            top = np.concatenate([np.flatnonzero(key < kth), np.flatnonzero(key == kth)])[:k]
+        else:
+            top = np.arange(len(key))
+        top = candidates[top[np.lexsort((top, key[top]))]]
+
+    # frequencies (if requested) of top k rows only
+    return DataFrame(index=index[top], data=calculate(top))
+
+
+@_profiled
+def score_arrays(O11, O12=None, O21=None, O22=None, measures=None,
+                 freq=True, per_million=True, digits=6, disc=.001,
+                 discounting='Walter1975', signed=True, alpha=.001,
+                 correct='Bonferroni', boundary='poisson', vocab=None,
+                 one_sided=False, log=False, n_jobs=None, engine='numpy', tables=None,
+                 R1=None, R2=None, dtype=None, max_memory=None, profile=None):
+    """Calculate a list of association measures on plain NumPy arrays
+    in contingency notation. Same semantics as `score()`, but without
+    any pandas overhead (no index alignment, no Series construction).
+
+    Observed frequencies can be passed as four separate arrays or as
+    one array of shape (n, 4) with columns O11, O12, O21, O22. If the
+    row marginals are constant (e.g. sizes of two corpora), pass O11,
+    O21 and scalars R1, R2 instead; marginals are then broadcast rather
+    than materialised.
+
+    :param array O11: observed frequencies O11 (or (n, 4) array of O11..O22)
+    :param array O12: observed frequencies O12
+    :param array O21: observed frequencies O21
+    :param array O22: observed frequencies O22
+    :param int R1: constant row marginal R1 = O11 + O12 (instead of O12)
+    :param int R2: constant row marginal R2 = O21 + O22 (instead of O22)
+    :param list measures: names of measures (or measures)
+    :param bool freq: also return observed and expected frequencies (incl. marginals)?
+    :param bool per_million: return instances per million? (only if freq is True)
+    :param int digits: round scores
+    :param int n_jobs: number of processes ("numpy") or threads ("cython") (negative: number of CPUs + 1 + n_jobs)
+    :param str engine: calculate measures via NumPy ("numpy") or compiled kernels where available ("cython")
+    :param list tables: precomputed score tables to look up scores in (see tables.ScoreTable)
+    :param str dtype: return integer frequencies in the smallest safe integer type and scores in float32 where their range and digits allow ("compact")
+    :param max_memory: score in chunks of rows so that allocations stay below this many bytes (int or e.g. "4GB")
+    :param profile: record stages (see `score()`)
 
-    # join on frequency columns (NB: thanks to pandas API, we have to take care of index names ourselves)
-    index_names = ['index'] if df.index.names == [None] else df.index.names
-    df = merge(df.reset_index(), df_reduced, how='left', on=list(freq_columns)).set_index(index_names)
+    Further keyword arguments will be passed to the respective measures
+    (see `score()`).
 
-    # keep frequency columns?
-    if not freq:
-        df = df.drop(freq_columns, axis=1)
+    :return: association measures (name: array) (and profile if profile is True)
+    :rtype: dict
+
+    """
+
+    # (n, 4) block of observed frequencies
+    if R1 is not None and R2 is not None:
+        if O21 is None or O12 is not None or O22 is not None:
+            raise ValueError('constant marginals (R1, R2) have to be given with (O11, O21) only')
+        observed = {'O11': np.asarray(O11), 'O21': np.asarray(O21), 'R1': np.asarray(R1), 'R2': np.asarray(R2)}
+    else:
+        if O12 is None and O21 is None and O22 is None:
+            block = np.asarray(O11)
+            if block.ndim != 2 or block.shape[1] != 4:
+                raise ValueError(f'expected four arrays or one array of shape (n, 4), got shape {block.shape}')
+            O11, O12, O21, O22 = block.T
+        elif O12 is None or O21 is None or O22 is None:
+            raise ValueError('either all of (O11, O12, O21, O22) or one array of shape (n, 4) have to be given')
+        observed = dict(zip(['O11', 'O12', 'O21', 'O22'], (np.asarray(array) for array in (O11, O12, O21, O22))))
+    n = len(observed['O11'])
+    vocab = n if vocab is None else vocab
+
+    # smallest integer type that cannot overflow
+    if dtype not in [None, 'compact']:
+        raise ValueError('parameter "dtype" should either be None or "compact".')
+    if dtype == 'compact':
+        with _stage(profile, 'compact', rows=n):
+            observed = compact_observed(observed)
+
+    # score chunks of rows within memory budget (with global vocabulary)
+    if max_memory is not None:
+        settings = dict(
+            measures=measures, freq=freq, per_million=per_million, digits=digits, disc=disc,
+            discounting=discounting, signed=signed, alpha=alpha, correct=correct, boundary=boundary,
+            vocab=vocab, one_sided=one_sided, log=log, n_jobs=n_jobs, engine=engine, tables=tables, dtype=dtype
+        )
+        chunksize = _chunksize(observed, _memory(max_memory), settings, profile)
+        if chunksize is not None:
+            return _score_chunks(observed, chunksize, dict(settings, profile=profile))
+
+    # reduce to unique contingency tables (scalar marginals are the same for all rows)
+    with _stage(profile, 'dedup', rows=n):
+        reduced = _reduce(*(array for array in observed.values() if array.ndim > 0))
+        if reduced is not None:
+            codes, first = reduced
+            observed_reduced = {name: O[first] if O.ndim > 0 else O for name, O in observed.items()}
+
+    # marginals, expected frequencies and intermediate terms are only
+    # calculated when needed (and only once)
+    frequencies = Frequencies(observed if reduced is None else observed_reduced, TERMS, profile)
+
+    # calculate measures (on several processes or threads)
+    measures = _select_measures(measures)
+    params = dict(disc=disc, discounting=discounting, signed=signed, alpha=alpha,
+                  correct=correct, boundary=boundary, vocab=vocab, one_sided=one_sided, log=log)
+    measures, params = _sweep(measures, params)
+    if engine not in ['numpy', 'cython']:
+        raise ValueError('parameter "engine" should either be "numpy" or "cython".')
+
+    def calculate(frequencies, measures, keep=()):
+        if engine == 'cython':
+            return _calculate_kernels(frequencies, measures, params, n_jobs, keep, profile)
+        if _n_jobs(n_jobs) == 1:
+            return _calculate(frequencies, measures, params, keep, profile)
+        with _stage(profile, 'parallel', ', '.join(measure.__name__ for measure in measures), len(frequencies)):
+            return _calculate_parallel(frequencies.given, measures, params, n_jobs)
+
+    if tables:
+        scores = _calculate_tables(frequencies, measures, params, tables, calculate,
+                                   keep=FREQUENCIES if freq else (), profile=profile)
     else:
-        # add instances (per million)
-        fac = 10**6 if per_million else 1
-        name = 'ipm' if per_million else 'instances'
-        df[name] = df['O11'] / df['R1'] * fac
-        df[name + '_reference'] = df['O21'] / df['R2'] * fac
-        df[name + '_expected'] = df['E11'] / df['R1'] * fac
+        scores = calculate(frequencies, measures, keep=FREQUENCIES if freq else ())
+
+    m = len(frequencies)
+    with np.errstate(all='ignore'):
+        # add frequencies and instances (per million)
+        if freq:
+            with _stage(profile, 'frequencies', rows=m):
+                scores = dict({c: frequencies[c] for c in FREQUENCIES}, **scores)
+                fac = 10**6 if per_million else 1
+                name = 'ipm' if per_million else 'instances'
+                scores[name] = frequencies['O11'] / frequencies['R1'] * fac
+                scores[name + '_reference'] = frequencies['O21'] / frequencies['R2'] * fac
+                scores[name + '_expected'] = frequencies['E11'] / frequencies['R1'] * fac
 
     # rounding
-    df = round(df, digits) if digits is not None else df
+    if digits is not None:
+        with _stage(profile, 'round', rows=m):
+            scores = {name: np.round(s, digits) for name, s in scores.items()}
+
+    # float32 where the range of scores allows
+    if dtype == 'compact':
+        with _stage(profile, 'downcast', rows=m):
+            scores = {name: s if name in OBSERVED else _compact(s, digits) for name, s in scores.items()}
+
+    with _stage(profile, 'scatter', rows=n):
+        # scatter scores of unique contingency tables back to all rows
+        if reduced is not None:
+            scores = {name: s[codes] if np.ndim(s) > 0 else s for name, s in scores.items()}
+
+        # constant marginals (only materialised for output)
+        scores = {name: np.full(n, s) if np.ndim(s) == 0 else s for name, s in scores.items()}
+
+    return scores
 
-    return df
+
+def _score_chunks(observed, chunksize, settings):
+    """Score chunks of rows one after another and collect their scores
+    (promoting columns to wider types if needed, e.g. float64 instead
+    of float32 for scores of later chunks with dtype="compact").
+
+    :param dict observed: observed frequencies (name: array or scalar marginal)
+    :param int chunksize: number of rows per chunk
+    :param dict settings: keyword arguments of `score_arrays()`
+    :return: association measures (name: array)
+    :rtype: dict
+    """
+
+    def widen(s):
+        # float32 scores represent scores rounded to digits (see `_compact()`)
+        if s.dtype == 'float32' and settings.get('digits') is not None:
+            return np.round(s.astype('float64'), settings['digits'])
+        return s
+
+    n = len(observed['O11'])
+    scores = dict()
+    for start in range(0, n, chunksize):
+        chunk = {name: O[start:start + chunksize] if O.ndim > 0 else O for name, O in observed.items()}
+        for name, s in score_arrays(**chunk, **settings).items():
+            if name not in scores:
+                scores[name] = np.empty(n, dtype=s.dtype)
+            elif np.result_type(scores[name], s) != scores[name].dtype:
+                widened = np.empty(n, dtype=np.result_type(scores[name], s))
+                widened[:start] = widen(scores[name][:start])
+                scores[name] = widened
+            if s.dtype != scores[name].dtype:
+                s = widen(s)
+            scores[name][start:start + chunksize] = s
+
+    return scores
 
 
 def calculate_measures(df, measures=None, freq=False, per_million=True, digits=None, **kwargs):
@@ -142,6 +960,7 @@ def calculate_measures(df, measures=None, freq=False, per_million=True, digits=N
 # ASYMPTOTIC HYPOTHESIS TESTS #
 ###############################
 
+@_measure('O11-E11', 'E11', kernel=kernels.z_score)
 def z_score(df, **kwargs):
     """Calculate z-score
 
@@ -150,11 +969,12 @@ def z_score(df, **kwargs):
     :rtype: pd.Series
     """
 
-    am = (df['O11'] - df['E11']) / np.sqrt(df['E11'])
+    am = df['O11-E11'] / np.sqrt(df['E11'])
 
     return am
 
 
+@_measure('O11', 'O11-E11', kernel=kernels.t_score)
 def t_score(df, disc=.001, **kwargs):
     """Calculate t-score
 
@@ -164,12 +984,13 @@ def t_score(df, disc=.001, **kwargs):
     :rtype: pd.Series
     """
 
-    O11_disc = df['O11'].where(df['O11'] != 0, disc)
-    am = (df['O11'] - df['E11']) / np.sqrt(O11_disc)
+    O11_disc = np.where(df['O11'] != 0, df['O11'], disc)
+    am = df['O11-E11'] / np.sqrt(O11_disc)
 
     return am
 
 
+@_measure('O11*ln(O11/E11)', 'O12', 'O12/E12', 'O21', 'O21/E21', 'O22', 'O22/E22', 'sign(O11-E11)', kernel=kernels.log_likelihood)
 def log_likelihood(df, signed=True, **kwargs):
     """Calculate log-likelihood
 
@@ -180,25 +1001,21 @@ def log_likelihood(df, signed=True, **kwargs):
     """
 
     # NB: discounting will not have any effect:
-    #     term will be multiplied by original Oij = 0
-    O11_disc = df['O11'].where(df['O11'] != 0, 1)
-    O12_disc = df['O12'].where(df['O12'] != 0, 1)
-    O21_disc = df['O21'].where(df['O21'] != 0, 1)
-    O22_disc = df['O22'].where(df['O22'] != 0, 1)
-
-    ii = df['O11'] * np.log(O11_disc / df['E11'])
-    ij = df['O12'] * np.log(O12_disc / df['E12'])
-    ji = df['O21'] * np.log(O21_disc / df['E21'])
-    jj = df['O22'] * np.log(O22_disc / df['E22'])
+    #     term will be multiplied by original Oij = 0 (see TERMS)
+    ii = df['O11*ln(O11/E11)']
+    ij = df['O12'] * np.log(df['O12/E12'])
+    ji = df['O21'] * np.log(df['O21/E21'])
+    jj = df['O22'] * np.log(df['O22/E22'])
 
     am = 2 * (ii + ij + ji + jj)
 
     if signed:
-        am = np.sign(df['O11'] - df['E11']) * am
+        am = df['sign(O11-E11)'] * am
 
     return am
 
 
+@_measure('O11*ln(O11/E11)', 'O11-E11', 'sign(O11-E11)', kernel=kernels.simple_ll)
 def simple_ll(df, signed=True, **kwargs):
     """Calculate simple log-likelihood
 
@@ -209,14 +1026,12 @@ def simple_ll(df, signed=True, **kwargs):
     """
 
     # NB: discounting will not have any effect: term will be multiplied by original Oij = 0
-    O11_disc = df['O11'].where(df['O11'] != 0, 1)
-
-    log_term = df['O11'] * np.log(O11_disc / df['E11'])
+    log_term = df['O11*ln(O11/E11)']
 
-    am = 2 * (log_term - (df['O11'] - df['E11']))
+    am = 2 * (log_term - df['O11-E11'])
 
     if signed:
-        am = np.sign(df['O11'] - df['E11']) * am
+        am = df['sign(O11-E11)'] * am
 
     return am
 
@@ -225,6 +1040,7 @@ def simple_ll(df, signed=True, **kwargs):
 # POINT ESTIMATES OF ASSOCIATION STRENGTH #
 ###########################################
 
+@_measure('O11', 'R1', 'C1', kernel=kernels.min_sensitivity)
 def min_sensitivity(df, **kwargs):
     """Calculate Minimum Sensitivity.
 
@@ -235,11 +1051,12 @@ def min_sensitivity(df, **kwargs):
 
     am1 = df['O11'] / df['R1']
     am2 = df['O11'] / df['C1']
-    am = concat([am1, am2], axis=1).min(axis=1)
+    am = np.fmin(am1, am2)
 
     return am
 
 
+@_measure('O11', 'O12', 'O21', 'O22', 'C1', 'C2')
 def liddell(df, **kwargs):
     """Calculate Liddell
 
@@ -248,11 +1065,12 @@ def liddell(df, **kwargs):
     :rtype: pd.Series
     """
 
-    am = (df['O11'] * df['O22'] - df['O12'] * df['O21']) / df['C1'] / df['C2']
+    am = (_multiply(df['O11'], df['O22']) - _multiply(df['O12'], df['O21'])) / df['C1'] / df['C2']
 
     return am
 
 
+@_measure('O11', 'O12', 'O21')
 def dice(df, **kwargs):
     """Calculate Dice coefficient
 
@@ -266,6 +1084,7 @@ def dice(df, **kwargs):
     return am
 
 
+@_measure('O11', 'O21', 'R1', 'R2', kernel=kernels.log_ratio)
 def log_ratio(df, disc=.5, discounting='Walter1975', **kwargs):
     """Calculate log-ratio, i.e. binary logarithm of relative risk
 
@@ -282,57 +1101,324 @@ def log_ratio(df, disc=.5, discounting='Walter1975', **kwargs):
 
     elif discounting == 'Hardie2014':
         # questionable discounting according to Hardie (2014)
-        O11_disc = df['O11'].where(df['O11'] != 0, disc)
-        O21_disc = df['O21'].where(df['O21'] != 0, disc)
+        O11_disc = np.where(df['O11'] != 0, df['O11'], disc)
+        O21_disc = np.where(df['O21'] != 0, df['O21'], disc)
         am = np.log2((O11_disc / O21_disc) / (df['R1'] / df['R2']))
 
     return am
 
 
+##########################
+# EXACT HYPOTHESIS TESTS #
+##########################
+
+# coefficients of Stirling's series of log(n!) (see `_stirling_error()`)
+STIRLING = [1 / 12, 1 / 360, 1 / 1260, 1 / 1680, 1 / 1188]
+LOG_SQRT_2PI = .5 * np.log(2 * np.pi)
+
+
+def _stirling_error(n):
+    """log(n!) - log(sqrt(2 pi n) (n / e)^n), via Stirling's series for
+    n > 15 (Loader 2000)
+
+    """
+
+    n = np.array(n, dtype='float64')
+    with np.errstate(all='ignore'):
+        nn = n * n
+        S0, S1, S2, S3, S4 = STIRLING
+        am = (S0 - (S1 - (S2 - (S3 - S4 / nn) / nn) / nn) / nn) / n
+        small = n <= 15
+        if small.any():
+            m = n[small]
+            am[small] = np.where(m == 0, 0, gammaln(m + 1) - (m + .5) * np.log(m) + m - LOG_SQRT_2PI)
+
+    return am
+
+
+def _deviance(x, m):
+    """x log(x / m) + m - x without cancellation for x close to m, via
+    its series in v = (x - m) / (x + m) (Loader 2000)
+
+    """
+
+    with np.errstate(all='ignore'):
+        am = np.array(xlogy(x, x / m) + m - x, dtype='float64')
+        close = np.abs(x - m) < .1 * (x + m)
+        if close.any():
+            x, m = np.broadcast_to(x, am.shape)[close], np.broadcast_to(m, am.shape)[close]
+            v = (x - m) / (x + m)
+            total = (x - m) * v
+            term = 2 * x * v
+            j = 1
+            while True:
+                term = term * v * v
+                update = total + term / (2 * j + 1)
+                if np.array_equal(update, total):
+                    break
+                total, j = update, j + 1
+            am[close] = total
+
+    return am
+
+
+def _binomial_log_pmf(k, n, p, q):
+    """natural logarithm of P(X = k) for X ~ Binomial(n, p) with q = 1 - p,
+    in the saddle point form of Loader (2000), which keeps full precision
+    for n in the hundreds of millions (differences of log-gamma values
+    do not)
+
+    """
+
+    k, n, p, q = (np.asarray(a, dtype='float64') for a in (k, n, p, q))
+    with np.errstate(all='ignore'):
+        am = np.array(
+            _stirling_error(n) - _stirling_error(k) - _stirling_error(n - k)
+            - _deviance(k, n * p) - _deviance(n - k, n * q)
+            - .5 * (2 * LOG_SQRT_2PI + np.log(k) + np.log1p(-k / n))
+        )
+        # boundaries of the support
+        shape = am.shape
+        edge = (k == 0) | (k == n)
+        if edge.any():
+            ke, ne, pe, qe = (np.broadcast_to(a, shape)[edge] for a in (k, n, p, q))
+            zero = np.where(pe < .1, -_deviance(ne, ne * qe) - ne * pe, ne * np.log(qe))
+            full = np.where(qe < .1, -_deviance(ne, ne * pe) - ne * qe, ne * np.log(pe))
+            am[edge] = np.where(ke == 0, np.where(ne == 0, 0, zero), full)
+        am[(k < 0) | (k > n) | (p == 0) & (k > 0) | (q == 0) & (k < n)] = -np.inf
+
+    return am
+
+
+def _hypergeometric_log_norm(R1, N):
+    """normalisation of `_hypergeometric_log_pmf()` (shared by all
+    evaluations of a row)
+
+    """
+
+    with np.errstate(all='ignore'):
+        p = np.asarray(R1, dtype='float64') / N
+    return _binomial_log_pmf(R1, N, p, 1 - p)
+
+
+# tail sums are cut short once the remaining terms cannot change them in
+# double precision any more
+TAIL_EPS = np.finfo('float64').eps / 2
+
+
+def _hypergeometric_log_pmf(k, R1, C1, C2, log_norm):
+    """natural logarithm of P(X = k) for X ~ Hypergeometric(N, C1, R1) as
+    a ratio of binomial probabilities with p = R1 / N (as in R's dhyper);
+    log_norm = `_hypergeometric_log_norm(R1, N)`
+
+    """
+
+    with np.errstate(all='ignore'):
+        N = np.add(C1, C2, dtype='float64')
+        p = R1 / N
+        q = (N - R1) / N
+
+    return _binomial_log_pmf(k, C1, p, q) + _binomial_log_pmf(np.subtract(R1, k), C2, p, q) - log_norm
+
+
+def _hypergeometric_log_tail(k, step, R1, C1, C2, log_pk):
+    """natural logarithm of the tail sum P(X = k) + P(X = k + step) + ...
+    (step = 1: upper tail, step = -1: lower tail).
+
+    Terms are calculated from the first term log_pk via the ratio of
+    consecutive hypergeometric probabilities, i.e. without evaluating
+    any further factorials. Since the distribution is log-concave,
+    ratios decrease once they are below 1, and the remaining terms are
+    bounded by a geometric series; rows are dropped from the iteration
+    once that bound falls below precision.
+
+    """
+
+    k = k.copy()
+    term = np.ones(len(k))
+    total = np.ones(len(k))
+    active = np.flatnonzero(np.isfinite(log_pk))
+    while active.size:
+        kk, r1, c1, c2 = k[active], R1[active], C1[active], C2[active]
+        if step > 0:
+            ratio = (c1 - kk) * (r1 - kk) / ((kk + 1) * (c2 - r1 + kk + 1))
+        else:
+            ratio = kk * (c2 - r1 + kk) / ((c1 - kk + 1) * (r1 - kk + 1))
+        ratio = np.fmax(ratio, 0)
+        t = term[active] * ratio
+        total[active] += t
+        term[active] = t
+        k[active] = kk + step
+        converged = (ratio == 0) | ((ratio < 1) & (t * ratio / (1 - ratio) < TAIL_EPS * total[active]))
+        active = active[~converged]
+
+    return log_pk + np.log(total)
+
+
+def _hypergeometric_search(lo, hi, R1, C1, C2, log_norm, threshold, increasing):
+    """vectorised bisection on a monotonic part [lo, hi] of the
+    hypergeometric distribution: last k with log P(X = k) <= threshold
+    if P is increasing on [lo, hi], first such k if it is decreasing.
+    Returns NaN if there is no such k.
+
+    """
+
+    lo, hi = lo.copy(), hi.copy()
+    # probabilities at the boundary: is there any such k?
+    edge = np.where(increasing, lo, hi)
+    found = (lo <= hi) & (_hypergeometric_log_pmf(edge, R1, C1, C2, log_norm) <= threshold)
+    lo, hi = np.where(found, lo, 0), np.where(found, hi, 0)
+    # only rows whose interval is not narrowed down yet are evaluated
+    active = np.flatnonzero(lo < hi)
+    while active.size:
+        low, high, up = lo[active], hi[active], increasing[active]
+        # increasing: invariant P(lo) <= threshold; decreasing: P(hi) <= threshold
+        mid = np.where(up, np.ceil((low + high) / 2), np.floor((low + high) / 2))
+        below = _hypergeometric_log_pmf(
+            mid, R1[active], C1[active], C2[active], log_norm[active]
+        ) <= threshold[active]
+        lo[active] = np.where(up & below, mid, np.where(~up & ~below, mid + 1, low))
+        hi[active] = np.where(up & ~below, mid - 1, np.where(~up & below, mid, high))
+        active = active[lo[active] < hi[active]]
+
+    return np.where(found, lo, np.nan)
+
+
+def _fisher_exact_bound(df, log=False, signed=True, **kwargs):
+    """Upper bound of -log10 p of Fisher's exact test: both tails
+    include P(X = O11).
+
+    """
+
+    if not log:
+        return None
+
+    log_p11 = _hypergeometric_log_pmf(df['O11'], df['R1'], df['C1'], df['C2'], _hypergeometric_log_norm(df['R1'], df['N']))
+    am = np.abs(np.minimum(log_p11, 0)) / np.log(10)
+    if signed:
+        am = np.where(df['sign(O11-E11)'] < 0, 0, am)
+    am = np.where(np.isnan(am), np.inf, am)
+
+    return am
+
+
+@_measure('O11', 'R1', 'C1', 'C2', 'N', 'sign(O11-E11)', bound=_fisher_exact_bound)
+def fisher_exact(df, one_sided=False, log=False, signed=True, **kwargs):
+    """Calculate Fisher's exact test (hypergeometric distribution of O11
+    given all marginals).
+
+    The one-sided p-value is the upper tail P(X >= O11) (as in UCS); the
+    two-sided p-value sums all probabilities not exceeding P(X = O11)
+    (as in scipy.stats.fisher_exact). Tails are summed in log-space, so
+    that -log10 p does not underflow.
+
+    :param DataFrame df: pd.DataFrame with columns O11, R1, C1, C2, N
+    :param bool one_sided: calculate one- or two-sided p-value
+    :param bool log: return -log10 of p-value?
+    :param bool signed: return negative values for rows with O11 < E11? (only if log is True)
+    :return: p-value (or -log10 p-value)
+    :rtype: pd.Series
+    """
+
+    O11 = np.asarray(df['O11'], dtype='float64')
+    # (constant marginals are broadcast since tails are summed row-wise)
+    R1, C1, C2, N = (np.broadcast_to(np.asarray(df[c], dtype='float64'), O11.shape) for c in ['R1', 'C1', 'C2', 'N'])
+
+    # support and mode
+    lo = np.fmax(0, R1 - C2)
+    hi = np.fmin(R1, C1)
+    mode = np.floor((R1 + 1) * (C1 + 1) / (N + 2))
+
+    log_norm = _hypergeometric_log_norm(R1, N)
+    log_p11 = _hypergeometric_log_pmf(O11, R1, C1, C2, log_norm)
+
+    # tail starting at O11 away from the mode (upper tail if O11 is at or above the mode)
+    away = O11 >= mode
+    log_p = np.zeros(len(O11))
+    log_p[away] = _hypergeometric_log_tail(O11[away], 1, R1[away], C1[away], C2[away], log_p11[away])
+
+    if one_sided:
+        # below the mode, the upper tail is 1 - P(X <= O11 - 1), whose
+        # terms decrease right away (instead of increasing up to the mode)
+        below = ~away
+        log_p[below] = np.where(np.isfinite(log_p11[below]), 0, log_p11[below])
+        rows = np.flatnonzero(below & (O11 > lo) & np.isfinite(log_p11))
+        k = O11[rows] - 1
+        log_pk = _hypergeometric_log_pmf(k, R1[rows], C1[rows], C2[rows], log_norm[rows])
+        log_lower = _hypergeometric_log_tail(k, -1, R1[rows], C1[rows], C2[rows], log_pk)
+        log_p[rows] = np.log1p(-np.exp(np.minimum(log_lower, 0)))
+    else:
+        rows = ~away
+        log_p[rows] = _hypergeometric_log_tail(O11[rows], -1, R1[rows], C1[rows], C2[rows], log_p11[rows])
+
+    if not one_sided:
+        # two-sided: add tail on the other side of the mode, starting at
+        # the first k with P(X = k) <= P(X = O11)
+        threshold = log_p11 + np.log1p(1e-7)
+        k = _hypergeometric_search(
+            np.where(away, lo, mode), np.where(away, mode - 1, hi),
+            R1, C1, C2, log_norm, threshold, increasing=away
+        )
+        other = ~np.isnan(k)
+        for step, rows in [(-1, other & away), (1, other & ~away)]:
+            log_pk = _hypergeometric_log_pmf(k[rows], R1[rows], C1[rows], C2[rows], log_norm[rows])
+            log_other = _hypergeometric_log_tail(k[rows], step, R1[rows], C1[rows], C2[rows], log_pk)
+            log_p[rows] = np.logaddexp(log_p[rows], log_other)
+
+    # p <= 1
+    log_p = np.minimum(log_p, 0)
+
+    if not log:
+        return np.exp(log_p)
+
+    am = np.abs(log_p) / np.log(10)
+    if signed:
+        am = df['sign(O11-E11)'] * am
+
+    return am
+
+
 #######################
 # LIKELIHOOD MEASURES #
 #######################
 
-def hypergeometric_likelihood(df, **kwargs):
-    """Calculate hypergeometric-likelihood
+@_measure('O11', 'O12', 'C1', 'C2', 'R1', 'N')
+def hypergeometric_likelihood(df, log=False, **kwargs):
+    """Calculate hypergeometric-likelihood (in log-space, so that it
+    neither overflows nor underflows for realistic corpus sizes)
 
-    :param DataFrame df: pd.DataFrame with columns O11, O12, O21, O22
+    :param DataFrame df: pd.DataFrame with columns O11, O12, C1, C2, R1, N
+    :param bool log: return natural logarithm of likelihood?
     :return: hypergeometric-likelihood
     :rtype: pd.Series
     """
 
-    df = df.astype(
-        {'O11': 'int32', 'O12': 'int32', 'O21': 'int32', 'O22': 'int32'}
-    )
+    am = _hypergeometric_log_pmf(df['O11'], df['R1'], df['C1'], df['C2'], _hypergeometric_log_norm(df['R1'], df['N']))
 
-    np.seterr(all='ignore')
-    c1 = CHOOSE(df['O11'] + df['O21'], df['O11'])
-    c2 = CHOOSE(df['O12'] + df['O22'], df['O12'])
-    c3 = CHOOSE(df['O11'] + df['O12'] + df['O21'] + df['O22'], df['O11'] + df['O12'])
-    am = c1 / c3 * c2
-    np.seterr(all='warn')
+    if not log:
+        am = np.exp(am)
 
     return am
 
 
-def binomial_likelihood(df, **kwargs):
-    """Calculate binomial-likelihood
+@_measure('O11', 'E11', 'N')
+def binomial_likelihood(df, log=False, **kwargs):
+    """Calculate binomial-likelihood (in log-space, so that it neither
+    overflows nor underflows for realistic corpus sizes)
 
-    :param DataFrame df: pd.DataFrame with columns O11, O12, O21, O22, E11, N
+    :param DataFrame df: pd.DataFrame with columns O11, E11, N
+    :param bool log: return natural logarithm of likelihood?
     :return: binomial-likelihood
     :rtype: pd.Series
     """
 
-    df = df.astype(
-        {'O11': 'int32', 'O12': 'int32', 'O21': 'int32', 'O22': 'int32', 'E11': 'int32'}
-    )
+    O11, N = df['O11'], df['N']
+    p = df['E11'] / N
+
+    am = _binomial_log_pmf(O11, N, p, 1 - p)
 
-    np.seterr(all='ignore')
-    c1 = CHOOSE(df['N'], df['O11'])
-    c2 = (df['E11'] / df['N']) ** df['O11']
-    c3 = (1 - df['E11'] / df['N']) ** (df['N'] - df['O11'])
-    am = c1 * c2 * c3
-    np.seterr(all='warn')
+    if not log:
+        am = np.exp(am)
 
     return am
 
@@ -341,23 +1427,10 @@ def binomial_likelihood(df, **kwargs):
 # CONSERVATIVE ESTIMATES #
 ##########################
 
-def conservative_log_ratio(df, disc=.5, alpha=.001, boundary='poisson',
-                           correct='Bonferroni', vocab=None,
-                           one_sided=False, **kwargs):
-    """Calculate conservative log-ratio, i.e. the binary logarithm of the
-    lower bound of the confidence interval of relative risk at the
-    (Bonferroni-corrected) significance level.
+def _correct_alpha(df, alpha, correct, vocab, one_sided):
+    """Significance level of conservative log-ratio, corrected for
+    two-sided tests and for repeated tests.
 
-    :param DataFrame df: pd.DataFrame with columns O11, O12, O21, O22
-    :param float disc: discounting (or smoothing) parameter for O11 == 0 and O21 == 0
-    :param float alpha: significance level
-    :param str boundary: exact CI boundary of [poisson] distribution or [normal] approximation?
-    :param str correct: correction type for several tests (None | "Bonferroni" | "Sidak")
-    :param int vocab: size of vocabulary (number of comparisons for correcting alpha)
-    :param bool one_sided: calculate one- or two-sided confidence interval
-
-    :return: conservative log-ratio
-    :rtype: pd.Series
     """
 
     # correction of alpha for two-sided tests
@@ -379,37 +1452,91 @@ def conservative_log_ratio(df, disc=.5, alpha=.001, boundary='poisson',
         else:
             raise ValueError('parameter "correct" should either be None or a string.')
 
+    return alpha
+
+
+def _conservative_log_ratio_bound(df, disc=.5, alpha=.001, boundary='poisson',
+                                  correct='Bonferroni', vocab=None, one_sided=False, **kwargs):
+    """Upper bound of conservative log-ratio: the lower boundary of the
+    confidence interval does not exceed the point estimate (for alpha <
+    .5), and boundaries are clipped to zero. For the Poisson boundary and
+    O21 == 0, the lower boundary of Beta(O11, 1) is alpha ** (1 / O11).
+
+    """
+
+    alpha = _correct_alpha(df, alpha, correct, vocab, one_sided)
+    if alpha >= .5:
+        return None
+
+    if boundary == 'normal':
+        O11_disc = np.where(df['O11'] != 0, df['O11'], disc)
+        O21_disc = np.where(df['O21'] != 0, df['O21'], disc)
+        lrr = np.log2((O11_disc / O21_disc) / (df['R1'] / df['R2']))
+    else:
+        lrr = np.log2((df['O11'] / df['O21']) / (df['R1'] / df['R2']))
+        x = alpha ** (1 / df['O11'])
+        lrr = np.where(df['O21'] == 0, np.log2(df['R2'] / df['R1'] * x / (1 - x)), lrr)
+    am = np.where(np.isnan(lrr), np.inf, np.fmax(lrr, 0))
+
+    return am
+
+
+def _conservative_log_ratio_kernel(O11, O12, O21, O22, out, **kwargs):
+    """Kernel of conservative log-ratio for running it on several threads
+    (the Poisson boundary is compiled and releases the GIL).
+
+    """
+
+    out[:] = conservative_log_ratio({'O11': O11, 'O12': O12, 'O21': O21, 'O22': O22}, **kwargs)
+
+
+@_measure('O11', 'O12', 'O21', 'O22', 'R1', 'R2', 'contiguous', kernel=_conservative_log_ratio_kernel,
+          bound=_conservative_log_ratio_bound)
+def conservative_log_ratio(df, disc=.5, alpha=.001, boundary='poisson',
+                           correct='Bonferroni', vocab=None,
+                           one_sided=False, **kwargs):
+    """Calculate conservative log-ratio, i.e. the binary logarithm of the
+    lower bound of the confidence interval of relative risk at the
+    (Bonferroni-corrected) significance level.
+
+    :param DataFrame df: pd.DataFrame with columns O11, O12, O21, O22
+    :param float disc: discounting (or smoothing) parameter for O11 == 0 and O21 == 0
+    :param float alpha: significance level
+    :param str boundary: exact CI boundary of [poisson] distribution or [normal] approximation?
+    :param str correct: correction type for several tests (None | "Bonferroni" | "Sidak")
+    :param int vocab: size of vocabulary (number of comparisons for correcting alpha)
+    :param bool one_sided: calculate one- or two-sided confidence interval
+
+    :return: conservative log-ratio
+    :rtype: pd.Series
+    """
+
+    alpha = _correct_alpha(df, alpha, correct, vocab, one_sided)
+
     # CONFIDENCE INTERVAL
 
     # Poisson approximation (Evert 2022)
     if boundary == 'poisson':
-        # only calculate where_lower
-        lower = beta.ppf(alpha, df['O11'], df['O21'] + 1)
-        lower_boundary = np.log2((df['R2'] / df['R1']) * lower / (1 - lower)).clip(lower=0)
-        # only calculate where_upper
-        upper = beta.ppf(1 - alpha, df['O11'] + 1, df['O21'])
-        upper_boundary = np.log2((df['R2'] / df['R1']) * upper / (1 - upper)).clip(upper=0)
-        # combine, set to 0 where (df['O11'] == 0) & (df['O12'] == 0)
-        clrr = lower_boundary.where(
-            (df['O11'] / df['R1']) >= (df['O21'] / df['R2']),
-            upper_boundary
-        )
-        clrr = clrr.where(~((df['O11'] == 0) & (df['O12'] == 0)), 0).fillna(0)
+        # compiled: lower boundary of Beta(O11, O21 + 1) where O11 / R1 >= O21 / R2,
+        # upper boundary of Beta(O11 + 1, O21) otherwise; 0 where O11 == O12 == 0
+        observed = df['contiguous']
+        clrr = np.empty(len(observed[0]), dtype='float64')
+        kernels.conservative_log_ratio_poisson(*observed, clrr, alpha)
 
     # Normal approximation (Hardie 2014)
     elif boundary == 'normal':
         # - questionable discounting according to Hardie (2014)
-        O11_disc = df['O11'].where(df['O11'] != 0, disc)
-        O21_disc = df['O21'].where(df['O21'] != 0, disc)
+        O11_disc = np.where(df['O11'] != 0, df['O11'], disc)
+        O21_disc = np.where(df['O21'] != 0, df['O21'], disc)
         # - compute natural logarithm of relative risk so we can use estimate for standard error of log(RR)
         lrr = np.log((O11_disc / O21_disc) / (df['R1'] / df['R2']))
         # - asymptotic standard deviation of log(RR) according to Wikipedia
         lrr_sd = np.sqrt(1/O11_disc + 1/O21_disc - 1/df['R1'] - 1/df['R2'])
         # - calculate and apply appropriate boundary
         z_factor = norm.ppf(1 - alpha)
-        ci_min = (lrr - lrr_sd * z_factor).clip(lower=0)
-        ci_max = (lrr + lrr_sd * z_factor).clip(upper=0)
-        clrr = ci_min.where(lrr >= 0, ci_max)
+        ci_min = np.clip(lrr - lrr_sd * z_factor, 0, None)
+        ci_max = np.clip(lrr + lrr_sd * z_factor, None, 0)
+        clrr = np.where(lrr >= 0, ci_min, ci_max)
         clrr /= np.log(2)           # adjust to binary logarithm
 
     return clrr
@@ -419,6 +1546,7 @@ def conservative_log_ratio(df, disc=.5, alpha=.001, boundary='poisson',
 # INFORMATION THEORY #
 ######################
 
+@_measure('O11', 'E11', kernel=kernels.mutual_information)
 def mutual_information(df, disc=.001, **kwargs):
     """Calculate Mutual Information
 
@@ -428,12 +1556,13 @@ def mutual_information(df, disc=.001, **kwargs):
     :rtype: pd.Series
     """
 
-    O11_disc = df['O11'].where(df['O11'] != 0, disc)
+    O11_disc = np.where(df['O11'] != 0, df['O11'], disc)
     am = np.log10(O11_disc / df['E11'])
 
     return am
 
 
+@_measure('O11', 'O11/E11', kernel=kernels.local_mutual_information)
 def local_mutual_information(df, **kwargs):
     """Calculate Local Mutual Information
 
@@ -443,7 +1572,6 @@ def local_mutual_information(df, **kwargs):
     """
 
     # NB: discounting will not have any effect: term will be multiplied by original Oij = 0
-    O11_disc = df['O11'].where(df['O11'] != 0, 1)
-    am = df['O11'] * np.log10(O11_disc / df['E11'])
+    am = df['O11'] * np.log10(df['O11/E11'])
 
     return am
@@ -0,0 +1,133 @@
+"""
+profiling of scoring stages
+
+Records wall time, number of rows and memory allocated (via
+tracemalloc, which NumPy reports its allocations to) for each stage of
+`score()`: notation conversion, deduplication, frequencies calculated
+on demand, each measure, rounding, scattering scores back to all rows,
+and output.
+
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from pandas import DataFrame
+
+
+class Profile:
+    """Report of stages (list of records with keys stage, name, level,
+    rows, seconds, bytes, peak_bytes).
+
+    Stages may be nested (level > 0), e.g. expected frequencies that are
+    calculated on demand while calculating a measure; their times and
+    allocations are included in the enclosing stage. `bytes` is the
+    memory still allocated at the end of the stage (e.g. the scores),
+    `peak_bytes` the maximum allocated during the stage (both relative
+    to its start).
+
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callable callback: called with each record once its stage is finished
+        """
+
+        self.records = list()
+        self.callback = callback
+        self._stack = list()
+
+    @contextmanager
+    def tracing(self):
+        """Trace allocations (unless tracemalloc is already running)."""
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, stage, name=None, rows=None):
+        """Record a stage.
+
+        :param str stage: type of stage (e.g. "measure")
+        :param str name: name (e.g. of measure)
+        :param int rows: number of rows processed
+        """
+
+        record = {'stage': stage, 'name': name, 'level': len(self._stack), 'rows': rows}
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # peak of enclosing stage so far (before resetting it)
+                self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+            tracemalloc.reset_peak()
+            record['_start'], record['_peak'] = current, current
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self._stack.pop()
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, record.pop('_peak'))
+                begin = record.pop('_start')
+                record['bytes'] = current - begin
+                record['peak_bytes'] = peak - begin
+                if self._stack:
+                    self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+            else:
+                record['bytes'] = record['peak_bytes'] = None
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def to_frame(self):
+        """Records as DataFrame (in order of completion, i.e. nested stages
+        before their enclosing stage).
+
+        :rtype: DataFrame
+        """
+
+        return DataFrame(self.records, columns=['stage', 'name', 'level', 'rows', 'seconds', 'bytes', 'peak_bytes'])
+
+    def total(self):
+        """Total time of all top-level stages (seconds)."""
+
+        return sum(record['seconds'] for record in self.records if record['level'] == 0)
+
+
+def _stage(profile, stage, name=None, rows=None):
+    """Record a stage if profiling (context manager)."""
+
+    return nullcontext() if profile is None else profile.stage(stage, name, rows)
+
+
+def _profiled(func):
+    """Decorator for functions with a `profile` parameter, which may be
+    True (return a Profile alongside the result), a callback (called
+    with each record), or a Profile (to add records to). The decorated
+    function receives a Profile (or None) and runs with allocations
+    being traced.
+
+    """
+
+    @wraps(func)
+    def wrapper(*args, profile=None, **kwargs):
+        if profile is None or profile is False:
+            return func(*args, profile=None, **kwargs)
+        report = profile if isinstance(profile, Profile) else Profile(None if profile is True else profile)
+        with report.tracing():
+            result = func(*args, profile=report, **kwargs)
+        return (result, report) if profile is True else result
+
+    return wrapper
@@ -0,0 +1,173 @@
+"""
+precomputed score tables
+
+For fixed marginals R1 and R2 (i.e. fixed sizes of target and reference
+corpus, or fixed f1 and N), scores only depend on O11 and O21. A score
+table holds the scores of all contingency tables with O11, O21 <= K as
+dense (K + 1) x (K + 1) arrays, which can be saved as .npy files and
+memory-mapped, so that `score(..., tables=[table])` looks up scores of
+covered rows instead of calculating them.
+
+"""
+
+import json
+import os
+from inspect import signature
+
+import numpy as np
+
+from .measures import PARAMETERS, _select_measures, _Variant, score_arrays
+
+
+class ScoreTable:
+    """Scores of all contingency tables with marginals R1, R2 and
+    0 <= O11, O21 <= K (name of measure: array of shape (K + 1, K + 1),
+    indexed by [O11, O21]).
+
+    """
+
+    def __init__(self, R1, R2, K, scores, params):
+
+        self.R1 = int(R1)
+        self.R2 = int(R2)
+        self.K = int(K)
+        self.scores = scores
+        self.params = params
+
+    @classmethod
+    def build(cls, K, N1=None, N2=None, f1=None, N=None, measures=None, **kwargs):
+        """Calculate scores of all contingency tables with O11, O21 <= K
+        for corpus sizes N1 and N2 (or for marginal f1 and sample size N).
+
+        NB: the conservative log-ratio is corrected for the size of the
+        vocabulary, which thus has to be given explicitly (unless
+        correct=None).
+
+        :param int K: maximum O11 and O21
+        :param int N1: size of target corpus (R1)
+        :param int N2: size of reference corpus (R2)
+        :param int f1: marginal frequency of node (R1)
+        :param int N: sample size (R1 + R2)
+        :param list measures: names of measures (or measures)
+
+        Further keyword arguments will be passed to the respective
+        measures (see `score()`).
+
+        :return: score table
+        :rtype: ScoreTable
+        """
+
+        if N1 is not None and N2 is not None:
+            R1, R2 = N1, N2
+        elif f1 is not None and N is not None:
+            R1, R2 = f1, N - f1
+        else:
+            raise ValueError('either N1 and N2 or f1 and N have to be given')
+        if K > min(R1, R2):
+            raise ValueError(f'K must not exceed R1 = {R1} or R2 = {R2}')
+
+        defaults = signature(score_arrays).parameters
+        params = {p: kwargs.get(p, defaults[p].default) for p in PARAMETERS}
+        measures = _select_measures(measures)
+        names = [measure.__name__ for measure in measures]
+        if 'conservative_log_ratio' in names and params['correct'] is not None and params['vocab'] is None:
+            raise ValueError('conservative log-ratio is corrected for the size of the vocabulary: pass vocab')
+
+        O11, O21 = np.meshgrid(np.arange(K + 1), np.arange(K + 1), indexing='ij')
+        O11, O21 = O11.ravel(), O21.ravel()
+        scores = score_arrays(
+            O11, O21=O21, R1=R1, R2=R2, measures=measures, freq=False, digits=None, **params
+        )
+        scores = {name: s.reshape(K + 1, K + 1) for name, s in scores.items()}
+
+        return cls(R1, R2, K, scores, params)
+
+    def save(self, path):
+        """Save table to directory (one .npy file per measure).
+
+        :param str path: path to directory
+        """
+
+        os.makedirs(path, exist_ok=True)
+        for name, s in self.scores.items():
+            np.save(os.path.join(path, name + '.npy'), s)
+        with open(os.path.join(path, 'table.json'), 'wt') as f:
+            json.dump({'R1': self.R1, 'R2': self.R2, 'K': self.K,
+                       'measures': list(self.scores), 'params': self.params}, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Load table from directory; scores are memory-mapped by default.
+
+        :param str path: path to directory
+        :param str mmap_mode: see `numpy.load()` (None: read into memory)
+        :return: score table
+        :rtype: ScoreTable
+        """
+
+        with open(os.path.join(path, 'table.json'), 'rt') as f:
+            meta = json.load(f)
+        scores = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+                  for name in meta['measures']}
+
+        return cls(meta['R1'], meta['R2'], meta['K'], scores, meta['params'])
+
+    def matches(self, measure, params):
+        """Does the table hold scores of measure calculated with the
+        given parameters? Only parameters the measure accepts are
+        compared (the size of the vocabulary only if alpha is corrected).
+        Swept parameters of variants are part of their name; all other
+        parameters are compared to those of the underlying measure.
+
+        :param callable measure: measure (or variant)
+        :param dict params: keyword arguments passed to the measure
+        :return: whether the table can be used for the measure
+        :rtype: bool
+        """
+
+        if measure.__name__ not in self.scores:
+            return False
+        swept = set()
+        if isinstance(measure, _Variant):
+            swept = set(measure.params)
+            params = dict(params, **measure.params)
+            measure = measure.measure
+        for p in signature(measure).parameters:
+            if p in swept or p not in params or p not in self.params:
+                continue
+            if p == 'vocab' and params.get('correct') is None:
+                continue
+            if params[p] != self.params[p]:
+                return False
+
+        return True
+
+    def covered(self, O11, O12, O21, O22):
+        """Which contingency tables are covered by the table?
+
+        :param array O11: observed frequencies O11
+        :param array O12: observed frequencies O12
+        :param array O21: observed frequencies O21
+        :param array O22: observed frequencies O22
+        :return: boolean mask
+        :rtype: array
+        """
+
+        with np.errstate(invalid='ignore'):
+            return (
+                (O11 + O12 == self.R1) & (O21 + O22 == self.R2) &
+                (O11 >= 0) & (O11 <= self.K) & (O21 >= 0) & (O21 <= self.K) &
+                (O11 == np.floor(O11)) & (O21 == np.floor(O21))
+            )
+
+    def lookup(self, name, O11, O21):
+        """Look up scores of covered contingency tables.
+
+        :param str name: name of measure
+        :param array O11: observed frequencies O11
+        :param array O21: observed frequencies O21
+        :return: scores
+        :rtype: array
+        """
+
+        return np.asarray(self.scores[name][O11.astype('int64'), O21.astype('int64')])
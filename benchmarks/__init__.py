@@ -0,0 +1,3 @@
+"""
+benchmark suite (see suite.py)
+"""
@@ -0,0 +1,173 @@
+"""
+memory benchmarks
+
+Measures the peak resident set size (RSS) of `score()` on synthetic
+frequency tables of increasing size (see suite.py), and the memory
+allocated in each stage of scoring (see association_measures.profiling).
+Each configuration runs in a fresh process, since the peak RSS of a
+process cannot be reset portably:
+
+    python3 -m benchmarks.memory --sizes 1e5 1e6 --max-memory 2GB --output memory.json
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .suite import DUPLICATES, frequencies, metadata, notations
+
+SIZES = [10**4, 10**5, 10**6, 10**7]
+
+# ru_maxrss is given in kilobytes on Linux, in bytes on macOS
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _rss_peak():
+    """Peak resident set size of this process (bytes)."""
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+def _reset_rss_peak():
+    """Reset peak resident set size to current one (Linux only).
+
+    :return: success
+    :rtype: bool
+    """
+
+    try:
+        with open('/proc/self/clear_refs', 'wt') as f:
+            f.write('5')
+    except OSError:
+        return False
+
+    return True
+
+
+def _rss_hwm():
+    """Peak resident set size since last reset (Linux; bytes)."""
+
+    with open('/proc/self/status', 'rt') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+
+
+def _measure(path, notation, max_memory):
+    """Score the frequency table stored at path (worker process)."""
+
+    import association_measures.measures as am
+    from association_measures.profiling import Profile
+
+    f1, f2 = np.load(path)
+    df = notations(f1, f2)[notation]
+    del f1, f2
+    kwargs = dict(max_memory=max_memory)
+
+    # peak RSS of scoring itself
+    reset = _reset_rss_peak()
+    before = _rss_hwm() if reset else _rss_peak()
+    scores = am.score(df, **kwargs)
+    after = _rss_hwm() if reset else _rss_peak()
+    output = int(scores.memory_usage(index=False).sum())
+    del scores
+
+    # allocations per stage (second run)
+    profile = Profile()
+    with profile.tracing(), profile.stage('score') as total:
+        am.score(df, profile=profile, **kwargs)
+    stages = dict()
+    for record in profile.records[:-1]:
+        key = record['stage'] if record['name'] is None else f"{record['stage']}/{record['name']}"
+        stage = stages.setdefault(key, {'seconds': 0, 'bytes': 0, 'peak_bytes': 0})
+        stage['seconds'] += record['seconds']
+        stage['bytes'] += record['bytes']
+        stage['peak_bytes'] = max(stage['peak_bytes'], record['peak_bytes'])
+
+    return {
+        'input_bytes': int(df.memory_usage(index=False).sum()),
+        'output_bytes': output,
+        'rss_before': before,
+        'rss_peak': after,
+        'rss_exact': reset,
+        'peak_bytes': total['peak_bytes'],
+        'stages': stages,
+    }
+
+
+def measure(f1, f2, notation='corpus', max_memory=None):
+    """Peak RSS and allocations of scoring a frequency table (in a fresh
+    process).
+
+    :param array f1: frequencies in corpus 1
+    :param array f2: frequencies in corpus 2
+    :param str notation: notation of input ("contingency", "signature", "corpus")
+    :param max_memory: passed to `score()`
+    :return: input and output size, RSS before and at peak, peak allocations, allocations per stage (bytes)
+    :rtype: dict
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'frequencies.npy')
+        np.save(path, np.stack([f1, f2]))
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return executor.submit(_measure, path, notation, max_memory).result()
+
+
+def run(sizes=SIZES, duplicates=DUPLICATES, notation='corpus', max_memory=None, log=sys.stderr):
+    """Run memory benchmarks on all combinations of sizes and ratios of
+    duplicates.
+
+    :return: metadata and results
+    :rtype: dict
+    """
+
+    results = list()
+    for size in sizes:
+        for ratio in duplicates:
+            result = dict(name=f'score/{notation}', size=size, duplicates=ratio, max_memory=max_memory,
+                          **measure(*frequencies(size, ratio), notation, max_memory))
+            results.append(result)
+            if log is not None:
+                print(f"{result['name']:20} {size:>10} {ratio:>5} "
+                      f"input {result['input_bytes'] / 2**20:10.1f}MB "
+                      f"output {result['output_bytes'] / 2**20:10.1f}MB "
+                      f"allocated {result['peak_bytes'] / 2**20:10.1f}MB "
+                      f"RSS {result['rss_before'] / 2**20:10.1f}MB -> {result['rss_peak'] / 2**20:10.1f}MB", file=log)
+
+    return {'meta': metadata(), 'results': results}
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python3 -m benchmarks.memory', description='memory benchmarks')
+    parser.add_argument('--sizes', type=lambda s: int(float(s)), nargs='+', default=SIZES,
+                        help='numbers of rows (default: %(default)s)')
+    parser.add_argument('--duplicates', type=float, nargs='+', default=DUPLICATES,
+                        help='ratios of duplicated rows (default: %(default)s)')
+    parser.add_argument('--notation', choices=['contingency', 'signature', 'corpus'], default='corpus',
+                        help='notation of input (default: %(default)s)')
+    parser.add_argument('--max-memory', help='memory budget passed to score() (e.g. 2GB)')
+    parser.add_argument('--output', default='-', help='output file (default: standard output)')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.duplicates, args.notation, args.max_memory)
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=1)
+    else:
+        with open(args.output, 'wt') as f:
+            json.dump(results, f, indent=1)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
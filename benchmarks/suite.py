@@ -0,0 +1,265 @@
+"""
+benchmark suite
+
+Times every measure, `score()` end-to-end on the three input notations,
+and both boundaries of the conservative log-ratio on synthetic frequency
+tables of increasing size and with varying ratios of duplicated
+frequency signatures. Results are written as JSON; `compare` reports
+benchmarks that got slower than a baseline by more than a threshold
+(and exits with status 1), so that regressions can be detected
+automatically:
+
+    python3 -m benchmarks.suite run --output results.json
+    python3 -m benchmarks.suite compare baseline.json results.json
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import scipy
+
+import association_measures.measures as am
+from association_measures.version import __version__
+
+SIZES = [10**4, 10**5, 10**6, 10**7]
+DUPLICATES = [0, .5, .9]
+
+# corpus sizes of synthetic tables
+N1 = 10**7
+N2 = 10**8
+
+
+def frequencies(size, duplicates=0, seed=0):
+    """Synthetic frequency table (corpus frequencies f1, f2 in corpora
+    of sizes N1, N2) with Zipf-distributed frequencies, in which the
+    given ratio of rows duplicates the frequency signature of another
+    row.
+
+    :param int size: number of rows
+    :param float duplicates: ratio of duplicated rows
+    :param int seed: seed of random number generator
+    :return: f1, f2
+    :rtype: tuple
+    """
+
+    rng = np.random.default_rng(seed)
+    unique = max(1, int(round(size * (1 - duplicates))))
+
+    # unique signatures: f2 strictly increasing among rows with the same f1
+    f1 = np.minimum(rng.zipf(1.3, unique), N1 // 10) - 1
+    f2 = np.minimum(np.round(f1 * 10 * rng.lognormal(0, 1, unique)).astype('int64') + rng.zipf(1.3, unique), N2 // 10)
+    order = np.lexsort((f2, f1))
+    f1, f2 = f1[order], f2[order]
+    i = np.arange(unique)
+    offset = np.cumsum(np.concatenate([[0], f1[1:] != f1[:-1]])) * 2**40
+    f2 = np.maximum.accumulate(f2 - i + offset) - offset + i
+
+    # duplicated rows
+    rows = np.concatenate([np.arange(unique), rng.integers(0, unique, size - unique)])
+    rows = rng.permutation(rows)
+
+    return f1[rows], f2[rows]
+
+
+def notations(f1, f2):
+    """Frequency table in the three notations.
+
+    :rtype: dict
+    """
+
+    return {
+        'contingency': pd.DataFrame({'O11': f1, 'O12': N1 - f1, 'O21': f2, 'O22': N2 - f2}),
+        'signature': pd.DataFrame({'f': f1, 'f1': N1, 'f2': f1 + f2, 'N': N1 + N2}),
+        'corpus': pd.DataFrame({'f1': f1, 'N1': N1, 'f2': f2, 'N2': N2}),
+    }
+
+
+def benchmarks(tables):
+    """Benchmarks on a frequency table (name: function).
+
+    :param dict tables: frequency table in the three notations
+    :rtype: dict
+    """
+
+    observed = {c: tables['contingency'][c].to_numpy() for c in ['O11', 'O12', 'O21', 'O22']}
+
+    def measure(name, **kwargs):
+        return lambda: am.score_arrays(**observed, measures=[name], freq=False, **kwargs)
+
+    def score(notation):
+        return lambda: am.score(tables[notation])
+
+    suite = dict()
+    for name in am.list_measures(optional=True):
+        if name == 'conservative_log_ratio':
+            for boundary in ['poisson', 'normal']:
+                suite[f'measure/{name}[{boundary}]'] = measure(name, boundary=boundary)
+        else:
+            suite[f'measure/{name}'] = measure(name)
+    for notation in tables:
+        suite[f'score/{notation}'] = score(notation)
+
+    return suite
+
+
+def timeit(function, min_time=.5, max_time=10, max_repeat=100):
+    """Run function repeatedly: until min_time has passed (and at least
+    3 times unless max_time has passed), but at most max_repeat times.
+
+    :return: running times in seconds
+    :rtype: list
+    """
+
+    times = list()
+    while len(times) < max_repeat:
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+        total = sum(times)
+        if total >= min_time and (len(times) >= 3 or total >= max_time):
+            break
+
+    return times
+
+
+def metadata():
+    """Versions, commit and machine."""
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'version': __version__,
+        'commit': commit,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'machine': platform.platform(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run(sizes=SIZES, duplicates=DUPLICATES, pattern=None, min_time=.5, max_time=10, log=sys.stderr):
+    """Run benchmarks on all combinations of sizes and ratios of
+    duplicates.
+
+    :param list sizes: numbers of rows
+    :param list duplicates: ratios of duplicated rows
+    :param str pattern: only run benchmarks whose name matches this regular expression
+    :return: metadata and results
+    :rtype: dict
+    """
+
+    results = list()
+    for size in sizes:
+        for ratio in duplicates:
+            f1, f2 = frequencies(size, ratio)
+            suite = benchmarks(notations(f1, f2))
+            for name, function in suite.items():
+                if pattern is not None and not re.search(pattern, name):
+                    continue
+                times = timeit(function, min_time, max_time)
+                result = {
+                    'name': name,
+                    'size': size,
+                    'duplicates': ratio,
+                    'times': times,
+                    'min': min(times),
+                    'median': statistics.median(times),
+                }
+                results.append(result)
+                if log is not None:
+                    print(f'{name:50} {size:>10} {ratio:>5} {result["median"]:10.4f}s', file=log)
+
+    return {'meta': metadata(), 'results': results}
+
+
+def compare(baseline, current, threshold=1.2, noise=1e-3):
+    """Compare benchmarks (by fastest run) to a baseline.
+
+    :param dict baseline: results of `run()`
+    :param dict current: results of `run()`
+    :param float threshold: ratio of running times from which on benchmarks count as regressions
+    :param float noise: minimum slowdown (in seconds) of regressions
+    :return: (name, size, duplicates, baseline time, current time, ratio) of regressions and all comparisons
+    :rtype: tuple
+    """
+
+    def key(result):
+        return result['name'], result['size'], result['duplicates']
+
+    before = {key(result): result['min'] for result in baseline['results']}
+    comparisons = [
+        key(result) + (before[key(result)], result['min'], result['min'] / before[key(result)])
+        for result in current['results'] if key(result) in before
+    ]
+    regressions = [c for c in comparisons if c[-1] > threshold and c[-2] - c[-3] > noise]
+
+    return regressions, comparisons
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python3 -m benchmarks.suite', description='benchmark suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = commands.add_parser('run', help='run benchmarks and write results as JSON')
+    parser_run.add_argument('--sizes', type=lambda s: int(float(s)), nargs='+', default=SIZES,
+                            help='numbers of rows (default: %(default)s)')
+    parser_run.add_argument('--duplicates', type=float, nargs='+', default=DUPLICATES,
+                            help='ratios of duplicated rows (default: %(default)s)')
+    parser_run.add_argument('--filter', help='only run benchmarks matching this regular expression')
+    parser_run.add_argument('--min-time', type=float, default=.5, help='minimum time per benchmark (seconds)')
+    parser_run.add_argument('--output', default='-', help='output file (default: standard output)')
+
+    parser_compare = commands.add_parser('compare', help='report regressions compared to a baseline')
+    parser_compare.add_argument('baseline', help='results of baseline')
+    parser_compare.add_argument('current', help='current results')
+    parser_compare.add_argument('--threshold', type=float, default=1.2,
+                                help='slowdown factor counted as regression (default: %(default)s)')
+    parser_compare.add_argument('--noise', type=float, default=1e-3,
+                                help='minimum slowdown (seconds) counted as regression (default: %(default)s)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run(args.sizes, args.duplicates, args.filter, args.min_time)
+        if args.output == '-':
+            json.dump(results, sys.stdout, indent=1)
+        else:
+            with open(args.output, 'wt') as f:
+                json.dump(results, f, indent=1)
+        return 0
+
+    with open(args.baseline, 'rt') as f:
+        baseline = json.load(f)
+    with open(args.current, 'rt') as f:
+        current = json.load(f)
+    regressions, comparisons = compare(baseline, current, args.threshold, args.noise)
+    for comparison in comparisons:
+        name, size, duplicates, before, after, ratio = comparison
+        flag = ' REGRESSION' if comparison in regressions else ''
+        print(f'{name:50} {size:>10} {duplicates:>5} {before:10.4f}s {after:10.4f}s {ratio:6.2f}x{flag}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
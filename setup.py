@@ -2,6 +2,7 @@
 
 import os
 import sys
+from Cython.Build import cythonize
 from setuptools import find_packages, setup, Command, Extension
 
 # Package meta-data.
@@ -17,8 +18,15 @@ REQUIRED = [
     'pandas>=2.2.2,<3.0',
     'numpy>=2.0,<3.0',
     'scipy>=1.13.0,<2.0',
-    # 'rbo>=0.1.3,<0.2'
 ]
+EXTRAS = {
+    # Arrow tables, Parquet and Feather files
+    'arrow': ['pyarrow>=14.0'],
+    # Polars DataFrames
+    'polars': ['polars>=0.20'],
+    # Dask DataFrames
+    'dask': ['dask[dataframe]>=2024.1'],
+}
 
 here = os.path.abspath(os.path.dirname(__file__))
 
@@ -32,15 +40,9 @@ with open(os.path.join(here, 'association_measures', 'version.py'), encoding="ut
     exec(f.read(), version)
 
 
-# Import Cython if available
-try:
-    from Cython.Build import cythonize
-    CYTHON_INSTALLED = True
-    extensions = [Extension('association_measures.binomial', ['association_measures/binomial.pyx'])]
-except ImportError:
-    cythonize = lambda x, *args, **kwargs: x  # dummy func
-    CYTHON_INSTALLED = False
-    extensions = [Extension('association_measures.binomial', ['association_measures/binomial.c'])]
+# Cython extensions (C sources are generated at build time, see pyproject.toml)
+extensions = [Extension('association_measures.binomial', ['association_measures/binomial.pyx']),
+              Extension('association_measures.kernels', ['association_measures/kernels.pyx'])]
 
 
 class UploadCommand(Command):
@@ -90,9 +92,13 @@ setup(
     author_email=EMAIL,
     python_requires=REQUIRES_PYTHON,
     url=URL,
-    packages=find_packages(exclude=["tests", "test_*"]),
+    packages=find_packages(exclude=["tests", "test_*", "benchmarks"]),
     ext_modules=cythonize(extensions),
     install_requires=REQUIRED,
+    extras_require=EXTRAS,
+    entry_points={
+        'console_scripts': ['association-measures=association_measures.cli:main'],
+    },
     include_package_data=True,
     license='MIT',
     classifiers=[
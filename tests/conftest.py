@@ -41,6 +41,23 @@ def random_dataframe():
     return df
 
 
+@pytest.fixture(scope='function')
+def large_dataframe():
+    """ Sample DataFrame with large sample size (N = 3e8) and wide range
+    of marginals in contingency notation; O11 below and above E11 """
+
+    rng = np.random.default_rng(42)
+    N = 3 * 10**8
+    R1 = np.floor(10 ** rng.uniform(1, 4, 200)).astype('int64')
+    C1 = np.floor(10 ** rng.uniform(1, 7, 200)).astype('int64')
+    E11 = R1 * C1 / N
+    O11 = np.floor(E11 + rng.normal(0, 3, 200) * np.sqrt(E11 + 1)).astype('int64')
+    O11 = np.clip(O11, np.maximum(0, R1 + C1 - N), np.minimum(R1, C1))
+    df = pd.DataFrame({'O11': O11, 'O12': R1 - O11, 'O21': C1 - O11, 'O22': N - R1 - C1 + O11})
+
+    return df
+
+
 @pytest.fixture(scope='function')
 def zero_dataframe():
     """ Sample DataFrame with lots of zeros in contingency notation """
@@ -0,0 +1,37 @@
+import numpy as np
+
+from benchmarks import memory
+from benchmarks.suite import compare, frequencies, run
+
+
+def test_frequencies():
+
+    f1, f2 = frequencies(10000, duplicates=.5)
+    assert len(f1) == 10000
+    assert len(np.unique(f1 * 10**9 + f2)) == 5000
+    assert (f1 >= 0).all() and (f2 >= 0).all()
+
+
+def test_run_compare():
+
+    results = run(sizes=[1000], duplicates=[0, .5], pattern='z_score|conservative|score/corpus', min_time=0, log=None)
+    names = {result['name'] for result in results['results']}
+    assert names == {'measure/z_score', 'measure/conservative_log_ratio[poisson]',
+                     'measure/conservative_log_ratio[normal]', 'score/corpus'}
+    assert len(results['results']) == 8
+
+    regressions, comparisons = compare(results, results)
+    assert not regressions and len(comparisons) == 8
+
+    slower = {'results': [dict(result, min=result['min'] * 2 + 1) for result in results['results']]}
+    regressions, _ = compare(results, slower)
+    assert len(regressions) == 8
+
+
+def test_memory():
+
+    results = memory.run(sizes=[1000], duplicates=[0], notation='signature', log=None)
+    result = results['results'][0]
+    assert result['rss_peak'] >= result['rss_before'] > 0
+    assert result['peak_bytes'] >= result['output_bytes'] > 0
+    assert {'notation', 'dedup', 'measure/log_likelihood', 'output'} <= set(result['stages'])
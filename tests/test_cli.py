@@ -0,0 +1,49 @@
+import io
+import sys
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import association_measures.measures as am
+from association_measures.cli import main
+
+
+@pytest.mark.cli
+def test_cli(brown_dataframe, tmp_path):
+
+    path = tmp_path / 'scores.tsv'
+    assert main(['tests/data/brown.csv', str(path), '--index', 'item', '--chunksize', '5000',
+                 '-m', 'log_likelihood', 'conservative_log_ratio', '--alpha', '.01', '--correct', 'none']) == 0
+    scores = pd.read_csv(path, sep='\t', index_col=0)
+    expected = am.score(brown_dataframe, measures=['log_likelihood', 'conservative_log_ratio'],
+                        alpha=.01, correct=None)
+    assert scores.columns.tolist() == expected.columns.tolist()
+    for name in expected.columns:
+        assert np.allclose(scores[name], expected[name], rtol=1e-6, atol=1e-6)
+
+    # text output is not compact (i.e. all digits are correct)
+    path = tmp_path / 'scores.csv'
+    assert main(['tests/data/brown.csv', str(path), '--index', 'item', '-m', 'dice']) == 0
+    scores = pd.read_csv(path, index_col=0, float_precision='round_trip')
+    expected = am.score(brown_dataframe, measures=['dice'])
+    for name in ['E11', 'E12', 'ipm', 'ipm_expected', 'dice']:
+        assert scores[name].tolist() == expected[name].tolist()
+
+    with pytest.raises(SystemExit):
+        main(['tests/data/brown.csv', '-m', 'log_likelihood', 'unknown'])
+
+
+@pytest.mark.cli
+def test_cli_pipe(brown_dataframe, monkeypatch, capsys):
+
+    df = brown_dataframe.head(100)
+    monkeypatch.setattr(sys, 'stdin', io.StringIO(df.to_csv()))
+    assert main(['--index', 'item', '--no-freq', '-m', 'dice', 'conservative_log_ratio', '--vocab', '100']) == 0
+    scores = pd.read_csv(io.StringIO(capsys.readouterr().out), index_col=0)
+    assert scores.equals(am.score(df, measures=['dice', 'conservative_log_ratio'], freq=False))
+
+    # vocabulary has to be passed for standard input
+    monkeypatch.setattr(sys, 'stdin', io.StringIO(df.to_csv()))
+    with pytest.raises(SystemExit):
+        main(['--index', 'item'])
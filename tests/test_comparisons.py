@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import association_measures.measures as am
+from association_measures import comparisons
+
+
+def rbo_loop(S, T, p):
+    """RBO_ext (Webber et al. 2010: equation 32) with sets of prefixes"""
+
+    if len(S) > len(T):
+        S, T = T, S
+    s, L = len(S), len(T)
+    X = [len(set(S[:d]) & set(T[:d])) for d in range(1, L + 1)]
+    sum1 = sum(X[d - 1] / d * p ** d for d in range(1, L + 1))
+    sum2 = sum(X[s - 1] * (d - s) / (s * d) * p ** d for d in range(s + 1, L + 1))
+
+    return (1 - p) / p * (sum1 + sum2) + ((X[L - 1] - X[s - 1]) / L + X[s - 1] / s) * p ** L
+
+
+@pytest.mark.comparisons
+def test_rbo():
+
+    assert comparisons.rbo(list('abcde'), list('abcde')) == pytest.approx(1)
+    assert comparisons.rbo(list('abc'), list('xyz')) == 0
+    assert comparisons.rbo(list('abc'), list('abcde')) == pytest.approx(1)
+    assert comparisons.rbo(list('abc'), list('abcde'), extrapolate=False) < 1
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        a = list(rng.permutation(50)[:rng.integers(1, 50)])
+        b = list(rng.permutation(50)[:rng.integers(1, 50)])
+        assert comparisons.rbo(a, b, p=.9) == pytest.approx(rbo_loop(a, b, .9))
+        assert comparisons.rbo(a, b, p=.9, depth=10) == pytest.approx(rbo_loop(a[:10], b[:10], .9))
+
+    with pytest.raises(ValueError):
+        comparisons.rbo(list('abc'), list('abc'), p=1)
+    with pytest.raises(ValueError):
+        comparisons.rbo(list('abc'), list('aab'))
+
+
+@pytest.mark.comparisons
+def test_topk():
+
+    reference = list('abcd')
+    candidates = {'x': list('bacd'), 'y': list('dcbae')}
+
+    overlap = comparisons.topk_overlap(reference, candidates)
+    assert overlap['x'].tolist() == [0, 2, 3, 4, 4]
+    assert overlap['y'].tolist() == [0, 0, 2, 4, 4]
+    assert comparisons.topk_overlap(reference, candidates['x'], relative=True).tolist() == [0, 1, 1, 1]
+
+    jaccard = comparisons.topk_jaccard(reference, candidates)
+    assert jaccard['y'].tolist() == [0, 0, .5, 1, .8]
+
+
+@pytest.mark.comparisons
+def test_gwets_ac1():
+
+    reference = list('abcdefgh')
+    assert comparisons.gwets_ac1(reference, reference, k=2) == pytest.approx(1)
+    ac1 = comparisons.gwets_ac1(reference, [reference[::-1]], k=[2, 4])
+    assert ac1[0].tolist() == pytest.approx([.2, -1])
+
+
+@pytest.mark.comparisons
+def test_rankings(brown_dataframe):
+
+    scores = am.score(brown_dataframe, ['log_likelihood', 'conservative_log_ratio', 'dice'], freq=False)
+    ranked = comparisons.rankings(scores)
+    assert ranked['dice'].equals(scores.sort_values('dice', ascending=False, kind='stable').index)
+
+    # one reference against many candidates
+    values = comparisons.rbo(ranked['log_likelihood'], ranked, p=.99, depth=1000)
+    assert isinstance(values, pd.Series) and list(values.index) == list(ranked)
+    assert values['log_likelihood'] == pytest.approx(1)
+    assert (values < 1).sum() == 2
+    for name in ranked:
+        assert values[name] == pytest.approx(
+            rbo_loop(list(ranked['log_likelihood'][:1000]), list(ranked[name][:1000]), .99)
+        )
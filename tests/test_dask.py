@@ -0,0 +1,30 @@
+import pytest
+
+import association_measures.measures as am
+from association_measures.dask import score
+
+
+@pytest.mark.dask
+@pytest.mark.parametrize('dedup', [True, False])
+def test_score_dask(brown_dataframe, dedup):
+
+    dd = pytest.importorskip('dask.dataframe')
+
+    ddf = dd.from_pandas(brown_dataframe, npartitions=4)
+    scores = score(ddf, measures=['log_likelihood', 'conservative_log_ratio'], dedup=dedup)
+    assert scores.npartitions == 4
+
+    # vocabulary of the whole table, not of partitions
+    expected = am.score(brown_dataframe, measures=['log_likelihood', 'conservative_log_ratio'])
+    assert scores.compute().equals(expected)
+
+
+@pytest.mark.dask
+def test_score_dask_marginals(brown_dataframe):
+
+    dd = pytest.importorskip('dask.dataframe')
+
+    df = brown_dataframe[['f', 'f2']]
+    ddf = dd.from_pandas(df, npartitions=3)
+    scores = score(ddf, f1=1000, N=909768, measures=['z_score', 'dice'], freq=False)
+    assert scores.compute().equals(am.score(df, f1=1000, N=909768, measures=['z_score', 'dice'], freq=False))
@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import association_measures.measures as am
+from association_measures.files import read_chunks, score_file, write_chunks
+
+
+@pytest.mark.files
+def test_score_file_csv(brown_dataframe, tmp_path):
+
+    path = tmp_path / 'scores.csv.gz'
+    rows = score_file('tests/data/brown.csv', path, index='item', chunksize=5000)
+    scores = pd.read_csv(path, index_col=0)
+    expected = am.score(brown_dataframe)
+
+    assert rows == len(brown_dataframe)
+    assert scores.columns.tolist() == expected.columns.tolist()
+    assert scores.index.equals(expected.index)
+    for name in ['O11', 'O12', 'O21', 'O22', 'N']:
+        assert scores[name].tolist() == expected[name].tolist()
+    for name in expected.columns:
+        assert np.allclose(scores[name], expected[name], rtol=1e-6, atol=1e-6, equal_nan=True)
+
+
+@pytest.mark.files
+def test_score_file_types(brown_dataframe, tmp_path):
+
+    path = tmp_path / 'scores.tsv'
+    df = brown_dataframe[['f', 'f2']].rename({'f': 'f1'}, axis=1)
+    df.to_csv(tmp_path / 'brown.tsv', sep='\t')
+    score_file(tmp_path / 'brown.tsv', path, index='item', chunksize=100, N1=100000, N2=900000,
+               measures=['log_likelihood', 'conservative_log_ratio'])
+
+    # one integer type for all chunks, vocabulary of the whole table
+    chunks = list(read_chunks(path, chunksize=100, index='item'))
+    assert len(chunks) == -(-len(df) // 100)
+    scores = pd.concat(chunks)
+    expected = am.score(df, N1=100000, N2=900000, measures=['log_likelihood', 'conservative_log_ratio'])
+    assert scores['conservative_log_ratio'].tolist() == expected['conservative_log_ratio'].tolist()
+
+    with pytest.raises(ValueError):
+        score_file(tmp_path / 'brown.tsv', tmp_path / 'scores.xlsx', N1=100000, N2=900000)
+
+
+@pytest.mark.files
+def test_score_file_arrow(brown_dataframe, tmp_path):
+
+    pytest.importorskip('pyarrow')
+
+    brown_dataframe.to_parquet(tmp_path / 'brown.parquet')
+    for output in ['scores.parquet', 'scores.feather']:
+        rows = score_file(tmp_path / 'brown.parquet', tmp_path / output, chunksize=5000)
+        scores = pd.concat(read_chunks(tmp_path / output))
+        assert rows == len(brown_dataframe)
+        assert scores.index.equals(brown_dataframe.index)
+        assert (scores[['O11', 'O12', 'O21', 'O22']].dtypes == 'int32').all()
+        assert (scores[['z_score', 'E11', 'ipm']].dtypes == 'float32').all()
+
+    # writing chunks with different (range) indices
+    write_chunks([brown_dataframe.iloc[:10].reset_index(), brown_dataframe.iloc[10:20].reset_index()],
+                 tmp_path / 'chunks.parquet')
+    assert len(pd.read_parquet(tmp_path / 'chunks.parquet')) == 20
@@ -1,4 +1,8 @@
+import numpy as np
+import pytest
+
 import association_measures.frequencies as fq
+import association_measures.measures as am
 
 
 def test_observed_frequencies(fixed_dataframe):
@@ -78,3 +82,100 @@ def test_ucs(ucs_dataframe):
     assert exp['E12'].equals(df['E12'])
     assert exp['E21'].equals(df['E21'])
     assert exp['E22'].equals(df['E22'])
+
+
+def test_frequencies_lazy(fixed_dataframe):
+
+    obs = fq.observed_frequencies(fixed_dataframe)
+    frequencies = fq.Frequencies({c: obs[c].to_numpy() for c in obs.columns})
+    assert len(frequencies) == 10
+    assert not frequencies.cache
+
+    # only required columns are calculated
+    assert frequencies['E11'][0] == 1.0
+    assert set(frequencies.cache) == {'R1', 'R2', 'C1', 'N', 'E11'}
+    assert frequencies.closure('E11') == {'E11', 'R1', 'R2', 'C1', 'N', 'O11', 'O12', 'O21', 'O22'}
+
+    # given columns are never released
+    frequencies.release(['O11', 'R1', 'E11'])
+    assert set(frequencies.cache) == {'R2', 'C1', 'N'}
+    assert 'O11' in frequencies.given
+
+
+def test_frequencies_scalar_marginals(fixed_dataframe):
+
+    df = fixed_dataframe[['f', 'f2']]
+    observed = fq.observed_arrays(df, f1=10, N=100)
+    assert set(observed) == {'O11', 'O21', 'R1', 'R2'}
+    assert observed['R1'].ndim == 0 and observed['R2'] == 90
+
+    # O12, O22 and N are derived (and broadcast) on demand
+    frequencies = fq.Frequencies(observed)
+    assert len(frequencies) == 10
+    assert frequencies['N'] == 100
+    assert frequencies['O12'].tolist() == (10 - df['f']).tolist()
+    assert frequencies['E11'].tolist() == fq.expected_frequencies(fixed_dataframe)['E11'].tolist()
+
+    obs = fq.observed_frequencies(df, f1=10, N=100)
+    assert obs.equals(fq.observed_frequencies(fixed_dataframe))
+
+
+def test_observed_frequencies_arrow(fixed_dataframe):
+
+    pa = pytest.importorskip('pyarrow')
+
+    expected = fq.observed_frequencies(fixed_dataframe, marginals=True)
+    table = pa.Table.from_pandas(fixed_dataframe, preserve_index=False)
+    obs = fq.observed_frequencies(table, marginals=True)
+    assert isinstance(obs, pa.Table)
+    assert obs.to_pandas().equals(expected)
+
+    # numeric columns are not copied
+    assert np.shares_memory(fq.observed_arrays(table)['O11'], table.column('f').chunk(0).to_numpy())
+
+
+def test_observed_frequencies_polars(fixed_dataframe):
+
+    pl = pytest.importorskip('polars')
+
+    expected = fq.observed_frequencies(fixed_dataframe)
+    obs = fq.observed_frequencies(pl.from_pandas(fixed_dataframe))
+    assert isinstance(obs, pl.DataFrame)
+    assert obs.to_pandas().equals(expected)
+
+
+def test_compact_observed(fixed_dataframe):
+
+    observed = fq.observed_arrays(fixed_dataframe[['f', 'f2']], f1=10, N=100)
+    compact = fq.compact_observed(observed)
+    assert all(array.dtype == 'int16' for array in compact.values())
+    assert compact['R2'] == 90
+
+    # integral float frequencies are converted, others are kept
+    observed['O11'] = observed['O11'].astype('float64')
+    assert fq.compact_observed(observed)['O11'].dtype == 'int16'
+    observed['O11'] = observed['O11'] + .5
+    assert fq.compact_observed(observed)['O11'].dtype == 'float64'
+
+    # products are widened
+    assert fq._multiply(np.array([2**20], dtype='int32'), np.array([2**20], dtype='int32')).item() == 2**40
+    assert fq._multiply(np.array([2**40]), np.array(2**40)).item() == 2.**80
+
+
+def test_factorize_tables(brown_dataframe):
+
+    obs = fq.observed_frequencies(brown_dataframe)
+    columns = [obs[c].to_numpy() for c in ['O11', 'O12', 'O21', 'O22']]
+    codes, first = fq.factorize_tables(*columns)
+
+    assert len(first) == len(obs.drop_duplicates())
+    assert codes.max() == len(first) - 1
+    for column in columns:
+        assert (column[first][codes] == column).all()
+
+
+def test_reexports():
+
+    # frequency functions are also available from measures
+    assert am.observed_frequencies is fq.observed_frequencies
+    assert am.expected_frequencies is fq.expected_frequencies
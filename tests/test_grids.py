@@ -1,6 +1,59 @@
-from association_measures.grids import topography
+import numpy as np
+from association_measures.grids import (log_grid, topography, topography_adaptive,
+                                        topography_arrays)
 from pandas import DataFrame
 
 
 def test_map():
     assert isinstance(topography(), DataFrame)
+
+
+def test_log_grid():
+
+    g = log_grid(N1=1000, N2=50, length1=80, length2=60, exact1=30, exact2=10)
+    assert not g.duplicated().any()
+    assert g.equals(g.sort_values(['f1', 'f2']).reset_index(drop=True))
+    assert g['f1'].max() <= 1000 and g['f2'].max() <= 50
+
+
+def test_topography_arrays(tmp_path):
+
+    df = topography(length=60, exact=20)
+    f1, f2, scores = topography_arrays(length=60, exact=20, chunksize=1000)
+    assert (df['O11'].to_numpy().reshape(len(f1), len(f2)) == f1[:, None]).all()
+    for name, s in scores.items():
+        assert s.shape == (len(f1), len(f2))
+        assert np.array_equal(df[name].to_numpy().reshape(s.shape), s, equal_nan=True)
+
+    # memory-mapped
+    _, _, mapped = topography_arrays(length=60, exact=20, measures=['conservative_log_ratio'],
+                                     boundary=['poisson', 'normal'], directory=tmp_path, dtype='float32')
+    assert set(mapped) == {'conservative_log_ratio_boundary=poisson', 'conservative_log_ratio_boundary=normal'}
+    s = np.load(tmp_path / 'conservative_log_ratio_boundary=normal.npy', mmap_mode='r')
+    assert s.dtype == 'float32'
+    assert np.allclose(s, df['clr_normal'].to_numpy().reshape(s.shape), equal_nan=True)
+
+
+def test_topography_adaptive():
+
+    df = topography_adaptive(length=200, initial=20)
+    f1, f2, scores = topography_arrays(length=200, measures=['log_likelihood', 'conservative_log_ratio'])
+    assert len(df) < len(f1) * len(f2) / 5
+    assert not df[['f1', 'f2']].duplicated().any()
+
+    # sampled points are points of the full grid (with the same scores)
+    i, j = np.searchsorted(f1, df['f1']), np.searchsorted(f2, df['f2'])
+    assert (f1[i] == df['f1']).all() and (f2[j] == df['f2']).all()
+    for name, s in scores.items():
+        assert np.array_equal(s[i, j], df[name].to_numpy(), equal_nan=True)
+
+    # all cells of the full grid crossed by an iso-line are sampled
+    sampled = np.zeros((len(f1), len(f2)), dtype=bool)
+    sampled[i, j] = True
+    s = scores['log_likelihood']
+    crossed = ((s[:-1, :-1] < 10.83) | (s[1:, 1:] < 10.83)) & ((s[:-1, :-1] > 10.83) | (s[1:, 1:] > 10.83))
+    assert sampled[:-1, :-1][crossed].all() and sampled[1:, 1:][crossed].all()
+
+    # gradients
+    df_tol = topography_adaptive(length=200, initial=20, measures=['dice'], tolerance=.01)
+    assert len(df_tol) > len(topography_adaptive(length=200, initial=20, measures=['dice']))
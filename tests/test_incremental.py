@@ -0,0 +1,54 @@
+import pytest
+
+import association_measures.measures as am
+from association_measures.incremental import IncrementalScorer
+
+
+@pytest.mark.incremental
+def test_incremental(ucs_dataframe):
+
+    df = ucs_dataframe.set_index('l2')
+    f1, N = int(df['f1'].iloc[0]), int(df['N'].iloc[0])
+    df = df[['f', 'f2']]
+
+    scorer = IncrementalScorer(df.iloc[:50], f1=f1, N=N)
+    assert scorer.scores().equals(am.score(df.iloc[:50], f1=f1, N=N))
+
+    # new items (vocabulary grows)
+    rest = df.iloc[50:]
+    scorer.update(rest.index, rest['f'].to_numpy(), rest['f2'].to_numpy())
+    assert scorer.scores().equals(am.score(df, f1=f1, N=N))
+
+    # items only
+    scorer.update([df.index[3], df.index[3], df.index[7]], 1, [1, 2, 1])
+    df.loc[df.index[3]] += [2, 3]
+    df.loc[df.index[7]] += [1, 1]
+    assert scorer.scores().equals(am.score(df, f1=f1, N=N))
+
+    # global marginals
+    scorer.update(['circular'], 2, 5, delta_f1=3, delta_N=10)
+    df.loc['circular'] = [2, 5]
+    assert scorer.scores().equals(am.score(df, f1=f1 + 3, N=N + 10))
+
+
+@pytest.mark.incremental
+def test_incremental_measures(ucs_dataframe):
+
+    df = ucs_dataframe.set_index('l2')[['f', 'f2']]
+    scorer = IncrementalScorer(df.iloc[:10], f1=15334, N=191998, measures=['dice', 'conservative_log_ratio'],
+                               freq=False, alpha=.1)
+    scorer.scores()
+    scorer.update(df.index[10:], df['f'].iloc[10:].to_numpy(), df['f2'].iloc[10:].to_numpy())
+    scores = am.score(df, f1=15334, N=191998, measures=['dice', 'conservative_log_ratio'], freq=False, alpha=.1)
+    assert scorer.scores().equals(scores)
+
+
+@pytest.mark.incremental
+def test_incremental_sweep(ucs_dataframe):
+
+    df = ucs_dataframe.set_index('l2')[['f', 'f2']]
+    kwargs = dict(measures=['conservative_log_ratio'], freq=False, alpha=[.1, .001])
+    scorer = IncrementalScorer(df.iloc[:10], f1=15334, N=191998, **kwargs)
+    scorer.scores()
+    scorer.update(df.index[10:], df['f'].iloc[10:].to_numpy(), df['f2'].iloc[10:].to_numpy())
+    assert scorer.scores().equals(am.score(df, f1=15334, N=191998, **kwargs))
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import beta
+
+import association_measures.measures as am
+import association_measures.frequencies as fq
+from association_measures import kernels
+
+
+@pytest.mark.kernels
+def test_kernels(ucs_dataframe):
+
+    obs = fq.observed_frequencies(ucs_dataframe)
+    df = fq.expected_frequencies(obs, observed=True)
+    observed = [obs[c].to_numpy(dtype='int64') for c in ['O11', 'O12', 'O21', 'O22']]
+
+    for name in ['z_score', 't_score', 'log_likelihood', 'simple_ll', 'min_sensitivity',
+                 'log_ratio', 'mutual_information', 'local_mutual_information']:
+        out = np.empty(len(df))
+        getattr(kernels, name)(*observed, out)
+        assert np.allclose(out, getattr(am, name)(df), rtol=1e-12, equal_nan=True)
+        getattr(kernels, name)(*(array.astype('float64') for array in observed), out)
+        assert np.allclose(out, getattr(am, name)(df), rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.kernels
+@pytest.mark.zero
+def test_kernels_score(zero_dataframe, brown_dataframe):
+
+    for df in [zero_dataframe, brown_dataframe]:
+        df1 = am.score(df, discounting='Hardie2014')
+        df2 = am.score(df, discounting='Hardie2014', engine='cython', n_jobs=3)
+        assert df1.equals(df2)
+
+    with pytest.raises(ValueError):
+        am.score(zero_dataframe, engine='fortran')
+
+
+@pytest.mark.kernels
+@pytest.mark.conservative_log_ratio
+def test_conservative_log_ratio_poisson(log_ratio_dataframe, brown_dataframe):
+
+    for df in [log_ratio_dataframe, brown_dataframe]:
+        df = fq.expected_frequencies(df, observed=True)
+        for alpha in [.1, .001, 1e-9]:
+            # reference: both boundaries via scipy.stats.beta
+            lower = beta.ppf(alpha, df['O11'], df['O21'] + 1)
+            lower = np.log2((df['R2'] / df['R1']) * lower / (1 - lower)).clip(lower=0)
+            upper = beta.ppf(1 - alpha, df['O11'] + 1, df['O21'])
+            upper = np.log2((df['R2'] / df['R1']) * upper / (1 - upper)).clip(upper=0)
+            clrr = lower.where((df['O11'] / df['R1']) >= (df['O21'] / df['R2']), upper)
+            clrr = clrr.where(~((df['O11'] == 0) & (df['O12'] == 0)), 0).fillna(0)
+
+            observed = [df[c].to_numpy(dtype='float64') for c in ['O11', 'O12', 'O21', 'O22']]
+            out = np.empty(len(df))
+            kernels.conservative_log_ratio_poisson(*observed, out, alpha)
+            assert np.allclose(out, clrr, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.kernels
+def test_kernels_large_counts():
+
+    # R1 * C1 exceeds the range of int64
+    df = pd.DataFrame({'O11': [3 * 10**9, 10], 'O12': [7 * 10**9, 10**10],
+                       'O21': [2 * 10**9, 10**9], 'O22': [2 * 10**10, 10**11]})
+    df1 = am.score(df)
+    df2 = am.score(df, engine='cython')
+    assert not df2.isna().any().any()
+    assert df1.equals(df2)
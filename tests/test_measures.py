@@ -1,9 +1,55 @@
+import math
+
 import pytest
-from numpy import isnan
+import numpy as np
+import pandas as pd
+from scipy.stats import binom, fisher_exact, hypergeom
 
 
 import association_measures.measures as am
 import association_measures.frequencies as fq
+from association_measures.grids import log_grid
+
+
+def hypergeometric_exact(O11, R1, C1, N):
+    """exact log P(X = O11) and one- and two-sided p-values of Fisher's
+    exact test via integer arithmetic (neglecting terms below 1e-30 of
+    both the mode and P(X = O11))
+
+    """
+
+    lo, hi = max(0, R1 + C1 - N), min(R1, C1)
+    mode = (R1 + 1) * (C1 + 1) // (N + 2)
+    terms = {x: math.comb(C1, x) * math.comb(N - C1, R1 - x) for x in [mode, O11]}
+    smallest = min(terms.values())
+    for step in [1, -1]:
+        x, a, b = mode, math.comb(C1, mode), math.comb(N - C1, R1 - mode)
+        while lo <= x + step <= hi:
+            if step > 0:
+                a, b = a * (C1 - x) // (x + 1), b * (R1 - x) // (N - C1 - R1 + x + 1)
+            else:
+                a, b = a * x // (C1 - x + 1), b * (N - C1 - R1 + x) // (R1 - x + 1)
+            x += step
+            terms[x] = a * b
+            if (x - O11) * step > 0 and terms[x] * 10**30 < smallest:
+                break
+
+    # (true division of integers is correctly rounded)
+    norm = math.comb(N, R1)
+    t = terms[O11]
+    one_sided = sum(s for x, s in terms.items() if x >= O11)
+    two_sided = sum(s for s in terms.values() if s * 10**7 <= t * (10**7 + 1))
+
+    return math.log(t / norm), one_sided / norm, two_sided / norm
+
+
+def large_exact(df):
+    """exact references for large_dataframe (see `hypergeometric_exact()`)"""
+
+    df = fq.expected_frequencies(df, observed=True)
+    exact = [hypergeometric_exact(*(int(v) for v in row)) for row in df[['O11', 'R1', 'C1', 'N']].to_numpy()]
+
+    return df, pd.DataFrame(exact, columns=['log_pmf', 'one_sided', 'two_sided'], index=df.index)
 
 
 ######
@@ -227,7 +273,6 @@ def test_simple_ll_zero(zero_dataframe):
 #############################
 # hypergeometric likelihood #
 #############################
-# Not available via score due to numerical instability
 
 @pytest.mark.choose
 @pytest.mark.hypergeometric_likelihood
@@ -239,10 +284,23 @@ def test_hypergeometric_likelihood(fixed_dataframe):
 
 @pytest.mark.choose
 @pytest.mark.hypergeometric_likelihood
-def test_hypergeometric_likelihood_brown_overflow(brown_dataframe):
-    df = fq.expected_frequencies(brown_dataframe, observed=True).head(10)
+def test_hypergeometric_likelihood_brown(brown_dataframe):
+    df = fq.expected_frequencies(brown_dataframe, observed=True)
     df['hypergeometric_likelihood'] = am.hypergeometric_likelihood(df)
-    assert df['hypergeometric_likelihood'].isnull().any()
+    assert not df['hypergeometric_likelihood'].isnull().any()
+    R1, C1 = df['O11'] + df['O12'], df['O11'] + df['O21']
+    assert np.allclose(df['hypergeometric_likelihood'], hypergeom.pmf(df['O11'], df['N'], C1, R1), rtol=1e-6)
+    ams = am.hypergeometric_likelihood(df, log=True)
+    assert np.allclose(ams, hypergeom.logpmf(df['O11'], df['N'], C1, R1), rtol=1e-9)
+
+
+@pytest.mark.choose
+@pytest.mark.hypergeometric_likelihood
+def test_hypergeometric_likelihood_large(large_dataframe):
+    df, exact = large_exact(large_dataframe)
+    ams = am.hypergeometric_likelihood(df, log=True)
+    assert np.allclose(ams, exact['log_pmf'], rtol=1e-9, atol=0)
+    assert np.allclose(am.hypergeometric_likelihood(df), np.exp(exact['log_pmf']), rtol=1e-9, atol=0)
 
 
 @pytest.mark.choose
@@ -251,13 +309,67 @@ def test_hypergeometric_likelihood_brown_overflow(brown_dataframe):
 def test_hypergeometric_likelihood_zero(zero_dataframe):
     df = fq.expected_frequencies(zero_dataframe, observed=True)
     ams = am.hypergeometric_likelihood(df)
-    assert isnan(ams[0])
+    assert not ams.isnull().any()
+    assert ams.iloc[0] == 0
+
+
+################
+# fisher exact #
+################
+
+@pytest.mark.fisher_exact
+def test_fisher_exact(random_dataframe):
+    df = fq.expected_frequencies(random_dataframe, observed=True)
+    df = df.loc[(df['O11'] >= 0) & (df['O12'] >= 0) & (df['O21'] >= 0) & (df['O22'] >= 0)]
+    tables = df[['O11', 'O12', 'O21', 'O22']].to_numpy().reshape(-1, 2, 2)
+    p2 = [fisher_exact(t).pvalue for t in tables]
+    p1 = [fisher_exact(t, alternative='greater').pvalue for t in tables]
+    assert np.allclose(am.fisher_exact(df), p2, rtol=1e-9)
+    assert np.allclose(am.fisher_exact(df, one_sided=True), p1, rtol=1e-9)
+    ams = am.fisher_exact(df, log=True, signed=False)
+    assert np.allclose(ams, -np.log10(p2), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.fisher_exact
+def test_fisher_exact_brown(brown_dataframe):
+    df = fq.expected_frequencies(brown_dataframe, observed=True).head(100)
+    tables = df[['O11', 'O12', 'O21', 'O22']].to_numpy().reshape(-1, 2, 2)
+    p2 = [fisher_exact(t).pvalue for t in tables]
+    assert np.allclose(am.fisher_exact(df), p2, rtol=1e-6)
+    ams = am.fisher_exact(df, log=True)
+    assert (np.sign(ams) == np.sign(df['O11'] - df['E11'])).all()
+
+
+@pytest.mark.fisher_exact
+def test_fisher_exact_large(large_dataframe):
+    df, exact = large_exact(large_dataframe)
+    assert np.allclose(am.fisher_exact(df), exact['two_sided'], rtol=1e-9, atol=0)
+    assert np.allclose(am.fisher_exact(df, one_sided=True), exact['one_sided'], rtol=1e-9, atol=0)
+
+
+@pytest.mark.fisher_exact
+def test_fisher_exact_one_sided_grid():
+    # large corpora and a wide range of marginals, with most rows below the mode
+    g = log_grid(N1=10**7, N2=10**7, length1=60, length2=60, exact1=20, exact2=20)
+    df = fq.expected_frequencies(fq.observed_frequencies(g, N1=10**7, N2=10**7), observed=True)
+    df = df.loc[df['O11'] < df['E11']]
+    assert len(df) > 1000
+    p = am.fisher_exact(df, one_sided=True)
+    assert np.allclose(p, hypergeom.sf(df['O11'] - 1, df['N'], df['C1'], df['R1']), rtol=1e-5, atol=0)
+
+
+@pytest.mark.fisher_exact
+@pytest.mark.zero
+def test_fisher_exact_zero(zero_dataframe):
+    df = fq.expected_frequencies(zero_dataframe, observed=True)
+    ams = am.fisher_exact(df, log=True, signed=False)
+    assert not ams.isnull().any()
+    assert (ams >= 0).all()
 
 
 #######################
 # binomial likelihood #
 #######################
-# Not available via score due to numerical instability
 
 @pytest.mark.choose
 @pytest.mark.binomial_likelihood
@@ -275,18 +387,33 @@ def test_binomial_likelihood_brown(brown_dataframe):
     df = df.join(fq.expected_frequencies(df), rsuffix='_')
     df = df.head(100)
     df['binomial_likelihood'] = am.binomial_likelihood(df)
-    assert round(df['binomial_likelihood'][0], 6) == 0.008101
+    assert round(df['binomial_likelihood'].iloc[0], 6) == 0.022777
 
 
 @pytest.mark.choose
 @pytest.mark.binomial_likelihood
-def test_binomial_likelihood_brown_overflow(brown_dataframe):
+def test_binomial_likelihood_brown_all(brown_dataframe):
     df = brown_dataframe
     df = df.join(fq.observed_frequencies(df), rsuffix='_')
     df = df.join(fq.expected_frequencies(df), rsuffix='_')
-    df = df.head(1000)
     df['binomial_likelihood'] = am.binomial_likelihood(df)
-    assert df['binomial_likelihood'].isnull().any()
+    assert not df['binomial_likelihood'].isnull().any()
+    p = df['E11'] / df['N']
+    assert np.allclose(df['binomial_likelihood'], binom.pmf(df['O11'], df['N'], p), rtol=1e-6)
+    ams = am.binomial_likelihood(df, log=True)
+    assert np.allclose(ams, binom.logpmf(df['O11'], df['N'], p), rtol=1e-9)
+
+
+@pytest.mark.choose
+@pytest.mark.binomial_likelihood
+def test_binomial_likelihood_large(large_dataframe):
+    df = fq.expected_frequencies(large_dataframe, observed=True)
+    exact = [
+        math.log(math.comb(int(N), int(O11))) + O11 * math.log(E11 / N) + (N - O11) * math.log1p(-E11 / N)
+        for O11, E11, N in df[['O11', 'E11', 'N']].to_numpy()
+    ]
+    ams = am.binomial_likelihood(df, log=True)
+    assert np.allclose(ams, exact, rtol=1e-9, atol=0)
 
 
 @pytest.mark.choose
@@ -295,7 +422,8 @@ def test_binomial_likelihood_brown_overflow(brown_dataframe):
 def test_binomial_likelihood_zero(zero_dataframe):
     df = fq.expected_frequencies(zero_dataframe, observed=True)
     ams = am.binomial_likelihood(df)
-    assert isnan(ams.iloc[0])
+    assert not ams.isnull().any()
+    assert round(am.binomial_likelihood(df, log=True).iloc[0], 6) == -148.471127
 
 
 #############
@@ -419,6 +547,15 @@ def test_liddell_zero(zero_dataframe):
     assert df_ams['liddell'].iloc[0] == 0.143858
 
 
+@pytest.mark.liddell
+def test_liddell_overflow():
+
+    # products O11 * O22 exceed int64
+    df = pd.DataFrame({'O11': [3 * 10**9], 'O12': [4 * 10**9], 'O21': [5 * 10**9], 'O22': [6 * 10**9]})
+    df_ams = am.score(df, ['liddell'])
+    assert df_ams['liddell'].iloc[0] == -0.025
+
+
 ########
 # GOLD #
 ########
@@ -469,6 +606,15 @@ def test_measures_lrc_gold(log_ratio_dataframe):
     assert df['conservative_log_ratio'].equals(round(df['lrc'], 6))
 
 
+@pytest.mark.gold
+@pytest.mark.fisher_exact
+def test_fisher_exact_ucs_gold(ucs_dataframe):
+
+    df = ucs_dataframe
+    df = df.join(am.score(df, ['fisher_exact'], one_sided=True, log=True, signed=False, freq=False))
+    assert round(df['am.Fisher.pv'], 6).equals(df['fisher_exact'])
+
+
 #################
 # SCORE WRAPPER #
 #################
@@ -512,8 +658,322 @@ def test_score_invalid(ucs_dataframe):
         am.score(ucs_dataframe, f1=1, N2=1)
 
 
+@pytest.mark.score
+def test_score_optional(brown_dataframe):
+
+    # Fisher's exact test is only calculated on request
+    assert 'fisher_exact' not in am.list_measures()
+    assert 'fisher_exact' in am.list_measures(optional=True)
+    df = brown_dataframe.head(100)
+    assert 'fisher_exact' not in am.score(df, freq=False).columns
+    scores = am.score(df, ['fisher_exact', 'log_likelihood'], freq=False)
+    assert scores.columns.tolist() == ['fisher_exact', 'log_likelihood']
+
+
 def test_calculate_measures(zero_dataframe):
     df = zero_dataframe
     with pytest.deprecated_call():
         df_ams = am.calculate_measures(df, ['dice'])
     df_ams['dice'].iloc[0] == 0.16831229174945742
+
+
+################
+# ARRAY SCORES #
+################
+
+@pytest.mark.score
+def test_score_arrays(brown_dataframe):
+
+    df = am.score(brown_dataframe)
+    obs = fq.observed_frequencies(brown_dataframe)
+    scores = am.score_arrays(*(obs[c].to_numpy() for c in ['O11', 'O12', 'O21', 'O22']))
+
+    assert list(scores.keys()) == list(df.columns)
+    for name, values in scores.items():
+        assert isinstance(values, np.ndarray)
+        assert np.array_equal(values, df[name].to_numpy(), equal_nan=True)
+
+
+@pytest.mark.score
+def test_score_arrays_marginals(brown_dataframe):
+
+    df = brown_dataframe[['f', 'f2']].rename({'f': 'f1'}, axis=1)
+    obs = fq.observed_frequencies(df, N1=1000000, N2=2000000)
+    scores = am.score_arrays(obs['O11'].to_numpy(), O21=obs['O21'].to_numpy(), R1=1000000, R2=2000000)
+    expected = am.score_arrays(*(obs[c].to_numpy() for c in ['O11', 'O12', 'O21', 'O22']))
+
+    assert list(scores.keys()) == list(expected.keys())
+    for name, values in scores.items():
+        assert values.shape == (len(df), )
+        assert np.array_equal(values, expected[name], equal_nan=True)
+
+    with pytest.raises(ValueError):
+        am.score_arrays(obs['O11'].to_numpy(), R1=1000000, R2=2000000)
+
+
+@pytest.mark.score
+def test_score_compact(brown_dataframe):
+
+    df = brown_dataframe[['f', 'f2']].rename({'f': 'f1'}, axis=1)
+    expected = am.score(df, N1=1000000, N2=2000000)
+    scores = am.score(df, N1=1000000, N2=2000000, dtype='compact')
+
+    assert scores.columns.tolist() == expected.columns.tolist()
+    assert (scores[['O11', 'O12', 'R1', 'N']].dtypes == 'int32').all()
+    assert scores.memory_usage().sum() < .7 * expected.memory_usage().sum()
+    for name in scores.columns:
+        assert np.allclose(scores[name], expected[name], rtol=1e-6, equal_nan=True)
+
+    # float32 is not precise enough for large expected frequencies
+    df = pd.DataFrame({'f1': [3 * 10**8, 7], 'f2': [2 * 10**8, 11]})
+    expected = am.score(df, N1=10**9, N2=2 * 10**9)
+    scores = am.score(df, N1=10**9, N2=2 * 10**9, dtype='compact')
+    assert (scores[['E11', 'E12', 'E21', 'E22']].dtypes == 'float64').all()
+    for name in ['E11', 'E12', 'E21', 'E22', 'ipm', 'ipm_reference', 'ipm_expected']:
+        assert (np.round(scores[name].astype('float64'), 6) == expected[name]).all()
+
+    # without rounding, only the range of float32 is considered
+    scores = am.score(df, N1=10**9, N2=2 * 10**9, digits=None, dtype='compact')
+    assert (scores[['E11', 'E12', 'E21', 'E22']].dtypes == 'float32').all()
+
+    # products are widened instead of overflowing int32
+    df = pd.DataFrame({'f1': [100000, 0], 'f2': [900000, 1]})
+    scores = am.score(df, N1=1000000, N2=1000000, measures=['liddell'], dtype='compact')
+    assert scores['O11'].dtype == 'int32'
+    assert np.allclose(scores['liddell'], am.score(df, N1=1000000, N2=1000000, measures=['liddell'])['liddell'])
+
+    # likelihoods underflow float32
+    df = pd.DataFrame({'f1': [300, 0], 'f2': [10, 1]})
+    scores = am.score(df, N1=1000000, N2=1000000, measures=['hypergeometric_likelihood'], digits=None, dtype='compact')
+    assert scores['hypergeometric_likelihood'].dtype == 'float64'
+    assert scores['hypergeometric_likelihood'].iloc[0] > 0
+
+    with pytest.raises(ValueError):
+        am.score(df, N1=1000000, N2=1000000, dtype='float16')
+
+
+@pytest.mark.score
+def test_score_arrow(brown_dataframe):
+
+    pa = pytest.importorskip('pyarrow')
+
+    expected = am.score(brown_dataframe, measures=['log_likelihood', 'dice'])
+    for table in [pa.Table.from_pandas(brown_dataframe), pa.RecordBatch.from_pandas(brown_dataframe)]:
+        scores = am.score(table, measures=['log_likelihood', 'dice'])
+        assert type(scores) is type(table)
+        assert scores.schema.names == expected.columns.tolist()
+        for name in expected.columns:
+            assert np.array_equal(scores.column(name).to_numpy(), expected[name].to_numpy(), equal_nan=True)
+
+
+@pytest.mark.score
+def test_score_polars(brown_dataframe):
+
+    pl = pytest.importorskip('polars')
+
+    df = brown_dataframe[['f', 'f2']].rename({'f': 'f1'}, axis=1)
+    expected = am.score(df, N1=100000, N2=900000, measures=['log_ratio', 'z_score'])
+    scores = am.score(pl.from_pandas(df), N1=100000, N2=900000, measures=['log_ratio', 'z_score'])
+    assert isinstance(scores, pl.DataFrame)
+    assert scores.columns == expected.columns.tolist()
+    for name in expected.columns:
+        assert np.array_equal(scores.get_column(name).to_numpy(), expected[name].to_numpy(), equal_nan=True)
+
+
+@pytest.mark.score
+def test_score_arrays_block(zero_dataframe):
+
+    obs = fq.observed_frequencies(zero_dataframe)
+    block = obs[['O11', 'O12', 'O21', 'O22']].to_numpy(dtype='int64')
+    scores = am.score_arrays(block, measures=['z_score', 'dice', 'liddell'], freq=False)
+    df = am.score(zero_dataframe, measures=['z_score', 'dice', 'liddell'], freq=False)
+
+    assert list(scores.keys()) == ['z_score', 'dice', 'liddell']
+    for name, values in scores.items():
+        assert np.array_equal(values, df[name].to_numpy(), equal_nan=True)
+
+    with pytest.raises(ValueError):
+        am.score_arrays(block[:, :3])
+
+
+@pytest.mark.score
+def test_score_plan(fixed_dataframe):
+
+    obs = fq.observed_frequencies(fixed_dataframe)
+    frequencies = fq.Frequencies({c: obs[c].to_numpy() for c in obs.columns}, am.TERMS)
+
+    # z-score only requires O11 and E11
+    am.z_score(frequencies)
+    assert set(frequencies.cache) == {'R1', 'R2', 'C1', 'N', 'E11', 'O11-E11'}
+
+    # shared intermediate terms are released after the last measure requiring them
+    measures = [am.log_likelihood, am.simple_ll, am.dice]
+    plan = dict((m.__name__, release) for m, release in am._plan(measures, frequencies))
+    assert 'O11*ln(O11/E11)' not in plan['log_likelihood']
+    assert 'O11*ln(O11/E11)' in plan['simple_ll']
+    assert 'E22' in plan['log_likelihood']
+    assert not plan['dice']
+
+
+@pytest.mark.score
+def test_score_custom(brown_dataframe):
+
+    # measures without declaration of required terms get a DataFrame
+    def positive_difference(df, **kwargs):
+        return (df['O11'] - df['E11']).clip(lower=0)
+
+    df = brown_dataframe.head(1000)
+    scores = am.score(df, [positive_difference, am.z_score])
+    expected = am.score(df, ['z_score'])
+    assert scores['positive_difference'].equals(np.round((expected['O11'] - expected['E11']).clip(lower=0), 6))
+    assert scores['z_score'].equals(expected['z_score'])
+
+
+@pytest.mark.score
+def test_score_index(ucs_dataframe):
+
+    df = ucs_dataframe.set_index(['l1', 'l2'])
+    df_ams = am.score(df, ['log_likelihood'])
+    assert df_ams.index.equals(df.index)
+    assert df_ams['log_likelihood'].to_numpy().tolist() == am.score(ucs_dataframe, ['log_likelihood'])['log_likelihood'].to_numpy().tolist()
+
+
+@pytest.mark.score
+def test_score_dedup(brown_dataframe, monkeypatch):
+
+    df1 = am.score(brown_dataframe)
+    monkeypatch.setattr(am, 'DEDUP_RATIO', 1.01)
+    df2 = am.score(brown_dataframe)
+    assert df1.equals(df2)
+
+
+@pytest.mark.score
+def test_score_dedup_large():
+
+    # each table occurs twice, but far apart (never both in an evenly spaced sample)
+    O11 = np.concatenate([np.arange(50000), np.arange(50000)[::-1]])
+    df = pd.DataFrame({'O11': O11, 'O12': O11 % 7, 'O21': O11 % 11, 'O22': 10**6})
+    reduced = am._reduce(*(df[c].to_numpy() for c in ['O11', 'O12', 'O21']))
+    assert reduced is not None
+    assert len(reduced[1]) == 50000
+
+
+@pytest.mark.score
+def test_score_iter(brown_dataframe):
+
+    df = am.score(brown_dataframe)
+    chunks = [brown_dataframe.iloc[i: i + 5000] for i in range(0, len(brown_dataframe), 5000)]
+
+    # vocabulary is counted in a first pass
+    df_iter = pd.concat(am.score_iter(chunks))
+    assert df.equals(df_iter)
+
+    # single-pass iterators need vocab
+    with pytest.raises(ValueError):
+        next(am.score_iter(iter(chunks)))
+    df_iter = pd.concat(am.score_iter(iter(chunks), vocab=len(brown_dataframe)))
+    assert df.equals(df_iter)
+
+    # ... unless no correction is needed
+    df_iter = pd.concat(am.score_iter(iter(chunks), measures=['log_likelihood']))
+    assert df_iter['log_likelihood'].equals(df['log_likelihood'])
+
+
+@pytest.mark.score
+def test_score_iter_callable(tmp_path, brown_dataframe):
+
+    path = tmp_path / 'brown.csv'
+    brown_dataframe.to_csv(path)
+    df = am.score(brown_dataframe, ['conservative_log_ratio'], freq=False)
+    df_iter = pd.concat(am.score_iter(lambda: pd.read_csv(path, index_col=0, chunksize=10000),
+                                      ['conservative_log_ratio'], freq=False))
+    assert df['conservative_log_ratio'].equals(df_iter['conservative_log_ratio'])
+
+
+@pytest.mark.score
+def test_score_n_jobs(brown_dataframe):
+
+    df = am.score(brown_dataframe)
+    df_parallel = am.score(brown_dataframe, n_jobs=2)
+    assert df.equals(df_parallel)
+
+    scores = am.score_arrays(np.array([[10, 0, 0, 90], [1, 9, 9, 81]]), freq=False, n_jobs=-1)
+    assert scores['dice'].tolist() == [1.0, .1]
+
+
+@pytest.mark.score
+def test_score_topk(brown_dataframe):
+
+    df = brown_dataframe
+    for measure, kwargs in [('conservative_log_ratio', dict()),
+                            ('conservative_log_ratio', dict(boundary='normal', correct=None)),
+                            ('fisher_exact', dict(log=True)),
+                            ('mutual_information', dict())]:
+        scores = am.score(df, [measure], **kwargs)
+        top = am.score_topk(df, measure, 50, **kwargs)
+        assert top.equals(scores.sort_values(measure, ascending=False, kind='stable').head(50))
+
+    scores = am.score(df, ['dice'], freq=False)
+    bottom = am.score_topk(df, 'dice', 20, freq=False, ascending=True)
+    assert bottom.equals(scores.sort_values('dice', kind='stable').head(20))
+
+
+@pytest.mark.score
+def test_score_max_memory(brown_dataframe, monkeypatch):
+
+    df = am.score(brown_dataframe)
+    monkeypatch.setattr(am, 'MEMORY_SAMPLE', 1000)
+
+    # scores of all rows need about 240 bytes per row, chunks about as much
+    df_chunked, profile = am.score(brown_dataframe, max_memory=500 * len(brown_dataframe), profile=True)
+    assert df.equals(df_chunked)
+    assert len([r for r in profile.records if r['stage'] == 'output']) == 1
+    assert len([r for r in profile.records if r['stage'] == 'scatter']) > 1
+
+    df_compact = am.score(brown_dataframe, dtype='compact')
+    assert df_compact.equals(am.score(brown_dataframe, dtype='compact', max_memory='6M'))
+
+    # generous budget: no chunks
+    _, profile = am.score(brown_dataframe, max_memory='1GB', profile=True)
+    assert len([r for r in profile.records if r['stage'] == 'scatter']) == 1
+
+    with pytest.raises(ValueError):
+        am.score(brown_dataframe, max_memory='1MB')
+    with pytest.raises(ValueError):
+        am.score(brown_dataframe, max_memory='lots')
+
+
+@pytest.mark.score
+def test_score_no_copy(brown_dataframe):
+
+    # frequency columns of df are copied, scores are not
+    df = am.score(brown_dataframe, ['dice'])
+    assert not np.shares_memory(df['O11'].to_numpy(), brown_dataframe['f'].to_numpy())
+
+
+@pytest.mark.score
+def test_score_sweep(brown_dataframe):
+
+    df = am.score(brown_dataframe, alpha=[.05, .001], boundary=('poisson', 'normal'), discounting=['Hardie2014'])
+
+    # measures without swept parameters keep their names
+    assert df['dice'].equals(am.score(brown_dataframe)['dice'])
+    assert 'log_ratio' not in df.columns and 'conservative_log_ratio' not in df.columns
+    assert df['log_ratio_discounting=Hardie2014'].equals(
+        am.score(brown_dataframe, ['log_ratio'], discounting='Hardie2014')['log_ratio']
+    )
+    for alpha in [.05, .001]:
+        for boundary in ['poisson', 'normal']:
+            clr = am.score(brown_dataframe, ['conservative_log_ratio'], alpha=alpha, boundary=boundary)
+            assert df[f'conservative_log_ratio_alpha={alpha}_boundary={boundary}'].equals(clr['conservative_log_ratio'])
+
+    # ... on all engines, with intermediate terms shared between variants
+    kwargs = dict(measures=['conservative_log_ratio', 'log_likelihood'], signed=[True, False], alpha=[.05, .001], freq=False)
+    df = am.score(brown_dataframe, **kwargs)
+    assert list(df.columns) == ['conservative_log_ratio_alpha=0.05', 'conservative_log_ratio_alpha=0.001',
+                                'log_likelihood_signed=True', 'log_likelihood_signed=False']
+    assert df.equals(am.score(brown_dataframe, n_jobs=2, **kwargs))
+    assert np.allclose(df, am.score(brown_dataframe, engine='cython', **kwargs), equal_nan=True)
+
+    _, profile = am.score(brown_dataframe, profile=True, **kwargs)
+    assert [r['name'] for r in profile.records if r['stage'] == 'frequency'].count('E11') == 1
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import association_measures.measures as am
+from association_measures.profiling import Profile
+
+
+@pytest.mark.profiling
+def test_profile(brown_dataframe):
+
+    df = am.score(brown_dataframe)
+    df_profiled, profile = am.score(brown_dataframe, profile=True)
+    assert df.equals(df_profiled)
+    assert isinstance(profile, Profile)
+
+    report = profile.to_frame()
+    stages = report.loc[report['level'] == 0, 'stage'].tolist()
+    assert stages[:2] == ['notation', 'dedup']
+    assert stages[-4:] == ['frequencies', 'round', 'scatter', 'output']
+
+    # one record per measure (on unique contingency tables)
+    measures = report.loc[report['stage'] == 'measure']
+    assert measures['name'].tolist() == list(am.list_measures())
+    assert (measures['rows'] < len(brown_dataframe)).all()
+
+    # expected frequencies are calculated on demand within the first measure
+    e11 = report.loc[(report['stage'] == 'frequency') & (report['name'] == 'E11')]
+    assert len(e11) == 1 and e11['level'].item() == 1
+
+    assert (report['seconds'] >= 0).all()
+    assert (report['peak_bytes'] >= 0).all()
+    assert report.loc[report['stage'] == 'output', 'bytes'].item() > 0
+    assert profile.total() <= report['seconds'].sum()
+
+
+@pytest.mark.profiling
+def test_profile_callback(brown_dataframe):
+
+    records = list()
+    df = am.score(brown_dataframe, ['log_likelihood', 'dice'], freq=False, profile=records.append)
+    assert list(df.columns) == ['log_likelihood', 'dice']
+    assert [r['name'] for r in records if r['stage'] == 'measure'] == ['log_likelihood', 'dice']
+
+    # records can be collected across calls
+    profile = Profile()
+    am.score(brown_dataframe, ['dice'], freq=False, profile=profile)
+    am.score(brown_dataframe, ['z_score'], freq=False, profile=profile)
+    assert [r['name'] for r in profile.records if r['stage'] == 'measure'] == ['dice', 'z_score']
+
+
+@pytest.mark.profiling
+def test_profile_arrays():
+
+    observed = np.array([[10, 0, 0, 90], [1, 9, 9, 81]])
+    scores, profile = am.score_arrays(observed, freq=False, dtype='compact', engine='cython', profile=True)
+    assert scores['dice'].dtype == 'float32'
+    stages = [r['stage'] for r in profile.records]
+    assert 'compact' in stages and 'downcast' in stages
+    assert len([s for s in stages if s == 'measure']) == len(am.list_measures())
+
+
+@pytest.mark.profiling
+def test_profile_topk(brown_dataframe):
+
+    top = am.score_topk(brown_dataframe, 'conservative_log_ratio', 10)
+    top_profiled, profile = am.score_topk(brown_dataframe, 'conservative_log_ratio', 10, profile=True)
+    assert top.equals(top_profiled)
+    assert {'notation', 'bound', 'measure', 'select'} <= {r['stage'] for r in profile.records}
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import association_measures.measures as am
+import association_measures.frequencies as fq
+from association_measures.tables import ScoreTable
+
+
+@pytest.mark.tables
+def test_score_table(tmp_path):
+
+    N1, N2 = 1000, 2000
+    df = pd.DataFrame({'f1': [0, 1, 2, 5, 10, 50, 3, 20],
+                       'f2': [1, 0, 2, 3, 40, 10, 30, 20]})
+    measures = ['log_likelihood', 'log_ratio', 'conservative_log_ratio']
+
+    table = ScoreTable.build(20, N1=N1, N2=N2, measures=measures, vocab=len(df))
+    assert table.scores['log_ratio'].shape == (21, 21)
+    table.save(tmp_path / 'table')
+    table = ScoreTable.load(tmp_path / 'table')
+    assert isinstance(table.scores['log_ratio'], np.memmap)
+
+    # covered and uncovered rows
+    covered = table.covered(*(fq.observed_frequencies(df, N1=N1, N2=N2)[c].to_numpy()
+                              for c in ['O11', 'O12', 'O21', 'O22']))
+    assert covered.tolist() == [True, True, True, True, False, False, False, True]
+
+    df1 = am.score(df, N1=N1, N2=N2)
+    df2 = am.score(df, N1=N1, N2=N2, tables=[table])
+    pd.testing.assert_frame_equal(df1, df2)
+
+    # parameters differ: calculate
+    df1 = am.score(df, N1=N1, N2=N2, alpha=.05, discounting='Hardie2014')
+    df2 = am.score(df, N1=N1, N2=N2, alpha=.05, discounting='Hardie2014', tables=[table])
+    pd.testing.assert_frame_equal(df1, df2)
+
+
+@pytest.mark.tables
+def test_score_table_sweep():
+
+    N1, N2 = 1000, 2000
+    df = pd.DataFrame({'f1': [20, 15, 18, 10, 0, 3], 'f2': [1, 0, 2, 20, 20, 8]})
+    table = ScoreTable.build(20, N1=N1, N2=N2, measures=['conservative_log_ratio'], alpha=[.01, .001], vocab=500)
+    assert set(table.scores) == {'conservative_log_ratio_alpha=0.01', 'conservative_log_ratio_alpha=0.001'}
+
+    # same parameters: look up
+    kwargs = dict(N1=N1, N2=N2, measures=['conservative_log_ratio'], alpha=[.01, .001])
+    df1 = am.score(df, vocab=500, **kwargs)
+    df2 = am.score(df, vocab=500, tables=[table], **kwargs)
+    pd.testing.assert_frame_equal(df1, df2)
+
+    # parameters that are not swept differ: calculate
+    for params in [dict(vocab=10), dict(vocab=500, correct='Sidak'), dict(vocab=500, boundary='normal')]:
+        df1 = am.score(df, **params, **kwargs)
+        df2 = am.score(df, **params, tables=[table], **kwargs)
+        assert not df1.equals(am.score(df, vocab=500, **kwargs))
+        pd.testing.assert_frame_equal(df1, df2)
+
+
+@pytest.mark.tables
+def test_score_table_invalid():
+
+    with pytest.raises(ValueError):
+        ScoreTable.build(20, N1=10, N2=100, measures=['log_ratio'])
+
+    with pytest.raises(ValueError):
+        ScoreTable.build(5, N1=10, N2=100, measures=['conservative_log_ratio'])
+
+    table = ScoreTable.build(5, f1=10, N=100, measures=['conservative_log_ratio'], correct=None)
+    assert (table.R1, table.R2) == (10, 90)